@@ -0,0 +1,335 @@
+import signal
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Longest a blocking watcher.wait() runs in its thread (also the shutdown delay it can add)
+WATCH_TIMEOUT = 0.5
+# Re-read both files at least this often even without a change notification
+FALLBACK_POLL = 1.0
+
+
+class AsyncRuntime:
+    """Runs an FVGATITradingBot as independent asyncio tasks joined by bounded queues
+
+      watch   - file watcher (blocking wait in its own thread) wakes feed/bars
+      feed    - reads new LiveFeed ticks in the I/O executor -> events
+      bars    - re-reads HistoricalData in the I/O executor   -> events
+      clock   - closes the forming live bar once its hour is over -> events
+      zones   - the zone state machine; the only task that touches zones
+      signals - writes queued signals in a single-thread executor, in order
+      display - hands the latest status to the terminal renderer
+
+    The zone task never does file I/O: reads happen in executor threads and
+    signal and snapshot writes are handed off. When the zone task falls
+    behind, the events queue fills and the feed task stops reading - ticks
+    wait in LiveFeed.csv rather than piling up in memory, and the next read
+    picks them all up as one batch. A slow history re-read only delays the
+    bars task. With a socket_feed its connections take the place of the
+    watch, feed and bars tasks. Shutdown stops the readers, lets the zone task finish what
+    was queued, writes every pending signal, then restores the terminal.
+    """
+
+    def __init__(self, bot, event_queue_size=64, signal_queue_size=32, handle_signals=True, socket_feed=None):
+        self.bot = bot
+        # A SocketFeed replaces the feed, bars and watch tasks (the CSV files are only read at startup)
+        self.socket_feed = socket_feed
+        # Off when several runtimes share one event loop - their owner stops them
+        self.handle_signals = handle_signals
+        self.event_queue_size = event_queue_size
+        self.signal_queue_size = signal_queue_size
+
+        # drain() needs buffered ticks - per-tick mode still evaluates only the newest one
+        bot.live_feed.buffer_ticks = True
+        bot.signal_outbox = deque()
+
+        # Held while the bar store is refreshed, so the zone task never snapshots half-updated bars
+        self.bars_lock = threading.Lock()
+
+        self.io = ThreadPoolExecutor(max_workers=2, thread_name_prefix='fvg-io')
+        self.signal_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fvg-signal')
+        self.watch_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fvg-watch')
+
+        self.stopping = None
+        self.current_price = None
+        self.last_display_time = 0.0
+        self.snapshot_write = None
+
+    def run(self):
+        """Start the bot, run the tasks until Ctrl+C / SIGTERM, then shut down cleanly"""
+        self.bot.start()
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            logger.error(f"Error in async runtime: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            self.close()
+
+    def close(self):
+        """Restore the terminal, release the worker threads and shut the bot down"""
+        # Stop drawing (restores the cursor) before logging
+        self.bot.renderer.stop()
+        logger.info(f"Stopping FVG ATI Trading Bot ({self.bot.instrument})...")
+        logger.info(f"Final active FVGs: {len(self.bot.active_fvgs)}")
+        self.io.shutdown(wait=True)
+        self.signal_io.shutdown(wait=True)
+        self.watch_io.shutdown(wait=False)
+        self.bot.shutdown()
+
+    def stop(self):
+        """Ask the runtime to shut down (call from the event loop thread)"""
+        if self.stopping is not None:
+            self.stopping.set()
+
+    async def main(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.feed_changed = asyncio.Event()
+        self.bars_changed = asyncio.Event()
+        self.events = asyncio.Queue(maxsize=self.event_queue_size)
+        self.signals = asyncio.Queue(maxsize=self.signal_queue_size)
+        self.display = asyncio.Queue(maxsize=1)
+
+        # Read both files straight away
+        self.feed_changed.set()
+        self.bars_changed.set()
+
+        if self.handle_signals:
+            try:
+                self.loop.add_signal_handler(signal.SIGTERM, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows - Ctrl+C still works
+
+        if self.bot.metrics is not None:
+            self.bot.metrics.gauge('event_queue_depth', self.events.qsize)
+            self.bot.metrics.gauge('signal_queue_depth', self.signals.qsize)
+
+        if self.socket_feed is not None:
+            watch = None
+            producers = [asyncio.create_task(self.socket_feed.serve(self), name='socket')]
+        else:
+            watch = asyncio.create_task(self.watch_files(), name='watch')
+            producers = [asyncio.create_task(self.ingest_feed(), name='feed'),
+                         asyncio.create_task(self.ingest_bars(), name='bars')]
+        if self.bot.bar_aggregator is not None:
+            producers.append(asyncio.create_task(self.close_live_bars(), name='clock'))
+        zones = asyncio.create_task(self.evaluate_zones(), name='zones')
+        signals = asyncio.create_task(self.emit_signals(), name='signals')
+        display = asyncio.create_task(self.update_display(), name='display')
+        tasks = [task for task in (watch, *producers, zones, signals, display) if task is not None]
+
+        stopped = asyncio.create_task(self.stopping.wait())
+        try:
+            # Run until stop() or until any task fails
+            done, _ = await asyncio.wait([stopped, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not stopped and not task.cancelled() and task.exception() is not None:
+                    error = task.exception()
+                    logger.error(f"Task {task.get_name()} failed: {error}")
+                    logger.error(''.join(traceback.format_exception(error)))
+        finally:
+            stopped.cancel()
+            await self.drain(watch, producers, zones, signals, display)
+
+    async def drain(self, watch, producers, zones, signals, display):
+        """Stop reading, finish queued zone work and signal writes, then stop the display"""
+        self.stopping.set()
+        self.feed_changed.set()
+        self.bars_changed.set()
+        if watch is not None:
+            watch.cancel()
+
+        if zones.done():
+            # Nobody left to take their reads - don't wait on a full queue
+            for task in producers:
+                task.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+
+        if not zones.done():
+            await self.events.put(None)
+        await asyncio.gather(zones, return_exceptions=True)
+
+        if not signals.done():
+            await self.signals.put(None)
+        await asyncio.gather(signals, return_exceptions=True)
+
+        display.cancel()
+        if self.snapshot_write is not None:
+            await asyncio.gather(self.snapshot_write, return_exceptions=True)
+
+    async def watch_files(self):
+        """Turn file change notifications into feed/bars wake-ups"""
+        bot = self.bot
+        while True:
+            if bot.watcher is not None:
+                changed = await self.loop.run_in_executor(self.watch_io, bot.watcher.wait, WATCH_TIMEOUT)
+            else:
+                await asyncio.sleep(FALLBACK_POLL)
+                changed = set()
+
+            if bot.live_feed_path in changed:
+                self.feed_changed.set()
+            if bot.historical_path in changed:
+                self.bars_changed.set()
+
+    async def wake(self, event):
+        """Wait for a change notification, or the fallback poll interval"""
+        try:
+            await asyncio.wait_for(event.wait(), FALLBACK_POLL)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+    async def put_event(self, event):
+        """Queue work for the zone task - waits (backpressure) while the queue is full"""
+        if self.events.full() and self.bot.metrics is not None:
+            self.bot.metrics.count('backpressure_waits')
+        await self.events.put(event)
+
+    async def ingest_feed(self):
+        """Read new LiveFeed ticks off the event loop and queue them for the zone task"""
+        while not self.stopping.is_set():
+            await self.wake(self.feed_changed)
+            ticks = await self.loop.run_in_executor(self.io, self.bot.read_new_ticks)
+            if ticks:
+                await self.put_event(('ticks', ticks))
+
+    def read_bars(self):
+        """Runs in the I/O executor - the new bars if HistoricalData.csv changed, else None"""
+        with self.bars_lock:
+            if not self.bot.check_historical_updated():
+                return None
+            return self.bot.read_new_bars()
+
+    async def ingest_bars(self):
+        """Re-read HistoricalData off the event loop and queue new bars for the zone task"""
+        while not self.stopping.is_set():
+            await self.wake(self.bars_changed)
+            bars = await self.loop.run_in_executor(self.io, self.read_bars)
+            if bars is not None:
+                await self.put_event(('bars', bars))
+
+    async def close_live_bars(self):
+        """Ask the zone task to close the forming bar when its hour ends without a next tick"""
+        aggregator = self.bot.bar_aggregator
+        while not self.stopping.is_set():
+            await asyncio.sleep(FALLBACK_POLL)
+            if aggregator.is_due(pd.Timestamp.now().value):
+                await self.put_event(('clock', None))
+
+    async def evaluate_zones(self):
+        """The zone state machine - consumes events in order until the shutdown sentinel"""
+        bot = self.bot
+        while True:
+            event = await self.events.get()
+            if event is None:
+                break
+            kind, payload = event
+
+            if kind in ('bars', 'bar_rows', 'clock'):
+                if kind == 'bars':
+                    bot.process_bars(payload, self.current_price)
+                elif kind == 'bar_rows':
+                    bot.process_bar_rows(payload, self.current_price)
+                else:
+                    bot.close_due_live_bar(self.current_price)
+                if self.current_price is None:
+                    continue
+                # Re-check the last price (zones may have come off cooldown)
+                ticks = [(None, self.current_price)]
+            else:
+                ticks = payload
+                self.current_price = ticks[-1][1]
+
+            self.evaluate_ticks(ticks)
+
+            # Hand off signals, display state and zone snapshots - never write from here
+            while bot.signal_outbox:
+                await self.signals.put(bot.signal_outbox.popleft())
+            self.publish_status()
+            self.save_snapshot()
+
+    def evaluate_ticks(self, ticks):
+        """Fills, entries and cleanup for a batch of ticks (same steps as the synchronous loop)"""
+        bot = self.bot
+        if bot.batch_ticks:
+            # Close bars and check fills and trade signals for every tick in the batch
+            bot.process_live_ticks(ticks)
+        else:
+            bot.build_live_bars(ticks)
+            bot.check_live_fvg_fills(self.current_price)
+            bot.check_fvg_retest_signals(self.current_price)
+
+        # Clean FVGs based on distance from current price
+        if bot.bar_window.total > 0:
+            bot.clean_old_fvgs(bot.bar_window.total - 1, self.current_price)
+
+    def publish_status(self):
+        """Publish the shared state and replace the pending display state (at most once per display interval)"""
+        bot = self.bot
+        now = self.loop.time()
+        if now - self.last_display_time < bot.display_interval:
+            return
+        self.last_display_time = now
+        bot.publish_state(self.current_price)
+        if bot.headless:
+            return
+        if self.display.full():
+            self.display.get_nowait()  # the display only ever needs the newest state
+        self.display.put_nowait(bot.status_snapshot(self.current_price))
+
+    def save_snapshot(self):
+        """Copy zone state here and write it in the I/O executor (one write in flight at a time)"""
+        bot = self.bot
+        if not bot.snapshot_dirty or (self.snapshot_write is not None and not self.snapshot_write.done()):
+            return
+        # The bars task is mid-refresh - try again after the next event
+        if not self.bars_lock.acquire(blocking=False):
+            return
+        try:
+            state = bot.snapshot_state()
+        finally:
+            self.bars_lock.release()
+        if state is None:
+            return
+
+        bot.snapshot_dirty = False
+        self.snapshot_write = self.loop.run_in_executor(self.io, bot.write_zone_snapshot, *state)
+        self.snapshot_write.add_done_callback(self.snapshot_written)
+
+    def snapshot_written(self, future):
+        if future.cancelled() or future.exception() is not None or not future.result():
+            self.bot.snapshot_dirty = True  # retry on the next event
+
+    async def emit_signals(self):
+        """Write signals in order on the signal thread; run interval fsyncs while idle"""
+        writer = self.bot.signal_writer
+        while True:
+            try:
+                queued = await asyncio.wait_for(self.signals.get(), writer.fsync_interval)
+            except asyncio.TimeoutError:
+                await self.loop.run_in_executor(self.signal_io, writer.sync_if_due)
+                continue
+            if queued is None:
+                break
+            signal, zone = queued
+            written = await self.loop.run_in_executor(self.signal_io, self.bot.write_signal, *signal)
+            # Back on the event loop, which the zone task's ledger checks and zone state run on
+            self.bot.signal_ledger.settle(signal[-1], written)
+            if not written and zone is not None:
+                self.bot.release_zone(zone, signal[-1])
+
+    async def update_display(self):
+        """Pass the newest status to the renderer thread"""
+        while True:
+            self.bot.renderer.update(await self.display.get())
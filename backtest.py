@@ -0,0 +1,422 @@
+"""Offline backtest - replays hourly bars and ticks through the bot's zone logic
+
+Usage:
+    python backtest.py                                   # data/HistoricalData.csv, synthetic ticks
+    python backtest.py --ticks data/LiveFeed.csv         # replay recorded ticks
+    python backtest.py --stop 10 --target 5 --output data/backtest_trades.csv
+    python backtest.py --slippage 0.25                   # stop fills 1 tick worse than the stop
+    python backtest.py --signal-rules '{"repeat_seconds": 0}'   # live bot's suppression rules
+"""
+import json
+import heapq
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from fvg_detection import BEARISH, detect_fvgs, first_at_or_below
+from fvg_zone import zone_table
+from signal_ledger import SignalLedger
+from zone_index import scan_tick_batch
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_ticks(bars):
+    """Four ticks per bar (Open, High/Low, Low/High, Close) spread across the bar
+
+    Up bars are assumed to trade Open -> Low -> High -> Close and down bars
+    Open -> High -> Low -> Close. Tick k of bar i is stamped between the close
+    of bar i-1 and the close of bar i, so it replays after bar i-1's close.
+    """
+    times = bars['DateTime'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    opens = bars['Open'].to_numpy(dtype=np.float64)
+    highs = bars['High'].to_numpy(dtype=np.float64)
+    lows = bars['Low'].to_numpy(dtype=np.float64)
+    closes = bars['Close'].to_numpy(dtype=np.float64)
+
+    up = closes >= opens
+    prices = np.column_stack([opens, np.where(up, lows, highs), np.where(up, highs, lows), closes]).ravel()
+
+    # Spread the four ticks over the bar interval (first bar uses the next interval's length)
+    spacing = np.diff(times, prepend=times[0] - (times[1] - times[0] if len(times) > 1 else 0))
+    offsets = np.array([3, 2, 1, 0])
+    tick_times = (times[:, None] - (spacing[:, None] * offsets[None, :]) // 4).ravel()
+    return tick_times, prices
+
+
+def read_tick_file(path):
+    """Load a LiveFeed.csv style tick file as (int64 ns times, float64 prices)"""
+    df = pd.read_csv(path)
+    try:
+        times = pd.to_datetime(df['DateTime'], format='%m/%d/%Y %H:%M:%S')
+    except ValueError:
+        times = pd.to_datetime(df['DateTime'])
+    return times.to_numpy().astype('datetime64[ns]').astype(np.int64), df['Last'].to_numpy(dtype=np.float64)
+
+
+class LiveZones:
+    """Compact view of the live (unfilled, tracked) zone slots with cached bounds
+
+    The scalar bounds let the replay loop skip vector work on bars where no
+    zone can fill, change state or leave the distance window.
+    """
+
+    def __init__(self, bottom, top, gap, is_bear):
+        self.all_bottom = bottom
+        self.all_top = top
+        self.all_gap = gap
+        self.all_bear = is_bear
+        self.set(np.empty(0, dtype=np.int64))
+
+    def set(self, slots):
+        """Replace the live slots and refresh the cached columns and bounds"""
+        self.slots = slots
+        self.bottom = self.all_bottom[slots]
+        self.top = self.all_top[slots]
+        self.bear = self.all_bear[slots]
+
+        bull = ~self.bear
+        self.max_bull_bottom = self.bottom[bull].max(initial=-np.inf)
+        self.max_bull_top = self.top[bull].max(initial=-np.inf)
+        self.min_bear_bottom = self.bottom[self.bear].min(initial=np.inf)
+        self.min_bear_top = self.top[self.bear].min(initial=np.inf)
+        self.min_top = self.top.min(initial=np.inf)
+        self.max_bottom = self.bottom.max(initial=-np.inf)
+        self.max_gap = self.all_gap[slots].max(initial=0.0)
+
+    def keep(self, mask):
+        """Drop the slots where mask is False"""
+        if not mask.all():
+            self.set(self.slots[mask])
+
+
+class Backtester:
+    """Replays bar closes and the ticks between them through the live zone state machine
+
+    Per bar close, in the same order as process_historical_bars:
+      1. zone cooldowns end (trade taken before this bar)
+      2. a new FVG ending at this bar is added unless a same-type overlapping
+         zone is the same size or smaller (smaller zone wins)
+      3. the bar's High/Low fills zones
+    Then the ticks up to the next bar close run through scan_tick_batch (live
+    fills and zone entries), and zones more than max_distance points from the
+    last tick are dropped. Zone state lives in a structured zone table, one
+    slot per detected gap, so each step is a handful of vector operations.
+
+    Entries go through the live bot's signal ledger rules (signal_rules, the
+    bot's defaults if not given): a suppressed entry starts no cooldown, so
+    the zone is scanned again from the next tick for its next entry.
+    """
+
+    def __init__(self, min_gap=5.0, max_distance=250.0, stop_points=10.0, target_points=5.0,
+                 quantity=12, point_value=5.0, one_position=True, slippage_points=0.0, signal_rules=None):
+        self.min_gap = min_gap
+        self.max_distance = max_distance
+        self.stop_points = stop_points
+        self.target_points = target_points
+        self.slippage_points = slippage_points  # stop-market fills this far past the stop
+        self.quantity = quantity
+        self.point_value = point_value
+        self.one_position = one_position
+        self.signal_rules = signal_rules
+
+    def find_signals(self, bars, tick_times, tick_prices):
+        """Run the zone state machine - returns a DataFrame of retest signals"""
+        high = bars['High'].to_numpy(dtype=np.float64)
+        low = bars['Low'].to_numpy(dtype=np.float64)
+        bar_times = bars['DateTime'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        bar_count = len(bars)
+
+        detected = detect_fvgs(high, low, min_gap=self.min_gap)
+        zones = zone_table(detected, bar_times)
+        slots = len(zones)
+        bottom = zones['bottom']
+        top = zones['top']
+        gap = zones['gap_size']
+        zone_bars = zones['index']
+        zone_times = zones['time'].view(np.int64)
+        is_bear = zones['type'] == BEARISH
+        # Entry state is kept in the zone table itself
+        outside = zones['price_was_outside']
+        trade_taken = zones['trade_taken']
+        cooling = []  # slots with a trade taken, waiting for the next bar
+        live = LiveZones(bottom, top, gap, is_bear)
+
+        # In-memory ledger with the live rules (None when every rule is off - entries are never suppressed)
+        ledger = SignalLedger(None, self.signal_rules)
+        if not any(ledger.rules.values()):
+            ledger = None
+
+        # Ticks after bar i's close (and up to bar i+1's close) replay after bar i
+        tick_bounds = np.searchsorted(tick_times, bar_times, side='right')
+        tick_bounds = np.append(tick_bounds, len(tick_times))
+
+        # Per-batch price range and last price, computed for all bars at once
+        # (a sentinel past the end keeps every reduceat start index valid)
+        has_ticks = tick_bounds[1:] > tick_bounds[:-1]
+        batch_low = np.minimum.reduceat(np.append(tick_prices, np.inf), tick_bounds[:-1])
+        batch_high = np.maximum.reduceat(np.append(tick_prices, -np.inf), tick_bounds[:-1])
+        batch_last = np.append(tick_prices, np.nan)[tick_bounds[1:] - 1]
+
+        signal_ticks, signal_slots, signal_bars = [], [], []
+        next_slot = 0
+        last_price = None
+        max_distance = self.max_distance
+
+        for i in range(2, bar_count):
+            # 1) Re-enable zones whose trade bar has closed
+            if cooling:
+                trade_taken[cooling] = False
+                outside[cooling] = True
+                cooling = []
+
+            # 2) New FVG formed by the bar that just closed
+            while next_slot < slots and zone_bars[next_slot] < i:
+                next_slot += 1
+            if next_slot < slots and zone_bars[next_slot] == i:
+                slot = next_slot
+                if last_price is not None:
+                    outside[slot] = not (bottom[slot] <= last_price <= top[slot])
+                overlaps = (live.bear == is_bear[slot]) & (live.bottom < top[slot]) & (bottom[slot] < live.top)
+                if not (gap[live.slots[overlaps]] <= gap[slot]).any():
+                    live.set(np.append(live.slots[~overlaps], slot))
+
+            # 3) Bar-based fills (scalar bounds skip the vector check on most bars)
+            if low[i] <= live.max_bull_bottom or high[i] >= live.min_bear_top:
+                live.keep(np.where(live.bear, high[i] < live.top, low[i] > live.bottom))
+
+            # 4) Ticks until the next bar close
+            if not has_ticks[i]:
+                continue
+            lo, hi = batch_low[i], batch_high[i]
+            last_price = batch_last[i]
+
+            # Bearish zones can change once price reaches their bottom, bullish
+            # zones once it reaches their top, and zones price is inside can exit
+            if hi >= live.min_bear_bottom or lo <= live.max_bull_top or not outside[live.slots].all():
+                candidates = np.where(live.bear, live.bottom <= hi, live.top >= lo) | ~outside[live.slots]
+                start, end = tick_bounds[i], tick_bounds[i + 1]
+                prices = tick_prices[start:end]
+                candidate_slots = live.slots[candidates]
+                fill_tick, entry_tick, outside_after = scan_tick_batch(
+                    prices, live.bottom[candidates], live.top[candidates], live.bear[candidates],
+                    outside[candidate_slots], trade_taken[candidate_slots])
+                outside[candidate_slots] = outside_after
+
+                entered = entry_tick < len(prices)
+                if entered.any():
+                    entered_slots = candidate_slots[entered]
+                    entered_ticks = entry_tick[entered]
+                    if ledger is not None:
+                        entered_ticks, entered_slots = self.apply_rules(
+                            ledger, prices, tick_times[start:end], bar_times[i], entered_ticks, entered_slots,
+                            zone_times, bottom, top, is_bear, outside)
+                    trade_taken[entered_slots] = True
+                    cooling.extend(entered_slots.tolist())
+                    signal_ticks.extend((start + entered_ticks).tolist())
+                    signal_slots.extend(entered_slots.tolist())
+                    signal_bars.extend([i] * len(entered_slots))
+
+                filled = fill_tick < len(prices)
+                if filled.any():
+                    keep = np.ones(len(live.slots), dtype=bool)
+                    keep[np.flatnonzero(candidates)[filled]] = False
+                    live.keep(keep)
+
+            # 5) Distance cleanup against the last tick of the batch
+            if (last_price - max_distance > live.min_top or last_price + max_distance < live.max_bottom
+                    or live.max_gap > 2 * max_distance):
+                live.keep(np.minimum(np.abs(last_price - live.bottom), np.abs(last_price - live.top)) <= max_distance)
+
+        # Same-tick signals in the order the live bot evaluates zones (ZoneIndex: bullish then
+        # bearish, each by bottom) - with one_position the first one is the trade taken
+        signal_ticks = np.array(signal_ticks, dtype=np.int64)
+        signal_slots = np.array(signal_slots, dtype=np.int64)
+        order = np.lexsort((signal_slots, bottom[signal_slots], is_bear[signal_slots], signal_ticks))
+        signal_ticks = signal_ticks[order]
+        signal_slots = signal_slots[order]
+        signal_bars = np.array(signal_bars, dtype=np.int64)[order]
+
+        return pd.DataFrame({
+            'tick': signal_ticks,
+            'bar': signal_bars,
+            'signal_time': pd.to_datetime(tick_times[signal_ticks]),
+            # Bearish zones are bought, bullish zones are sold
+            'direction': np.where(is_bear[signal_slots], 'LONG', 'SHORT'),
+            'zone_bottom': bottom[signal_slots],
+            'zone_top': top[signal_slots],
+            'gap_size': gap[signal_slots],
+            'entry_price': tick_prices[signal_ticks],
+        })
+
+    def apply_rules(self, ledger, prices, times, bar_ns, entry_ticks, entry_slots, zone_times, bottom, top,
+                    is_bear, outside):
+        """Send a batch's zone entries through the ledger in live order - returns the (ticks, slots) signalled
+
+        A suppressed zone stays armed: it is rescanned from the tick after the
+        entry (price inside it), and its entry state after the batch is updated
+        in outside.
+        """
+        # Live order: tick, then bullish before bearish, each by bottom
+        pending = [(tick, is_bear[slot], bottom[slot], slot)
+                   for tick, slot in zip(entry_ticks.tolist(), entry_slots.tolist())]
+        heapq.heapify(pending)
+        sent_ticks, sent_slots = [], []
+        while pending:
+            tick, bear, zone_bottom, slot = heapq.heappop(pending)
+            # Bearish zones are bought at the bottom, bullish zones sold at the top
+            direction = 'LONG' if bear else 'SHORT'
+            entry_price = zone_bottom if bear else top[slot]
+            key = ledger.key(int(zone_times[slot]), direction, entry_price, int(bar_ns))
+            signal_ns = int(times[tick])
+            if ledger.check(key, signal_ns) is None:
+                ledger.settle(ledger.record(key, signal_ns, zone_bottom, top[slot]), True)
+                sent_ticks.append(tick)
+                sent_slots.append(slot)
+                continue
+
+            ledger.suppressed += 1
+            rest = prices[tick + 1:]
+            if not len(rest):
+                continue
+            _, entry_tick, outside_after = scan_tick_batch(rest, bottom[slot:slot + 1], top[slot:slot + 1],
+                                                           is_bear[slot:slot + 1], [False], [False])
+            outside[slot] = outside_after[0]
+            if entry_tick[0] < len(rest):
+                heapq.heappush(pending, (tick + 1 + int(entry_tick[0]), bear, zone_bottom, slot))
+        return np.array(sent_ticks, dtype=np.int64), np.array(sent_slots, dtype=np.int64)
+
+    def apply_brackets(self, signals, tick_times, tick_prices):
+        """Simulate the NinjaTrader stop/target bracket on each signal - returns the trades"""
+        if signals.empty:
+            return signals.assign(exit_time=pd.Series(dtype='datetime64[ns]'), exit_price=[], exit_reason=[],
+                                  pnl_points=[], pnl_dollars=[])
+
+        entry = signals['entry_price'].to_numpy()
+        is_long = (signals['direction'] == 'LONG').to_numpy()
+        starts = signals['tick'].to_numpy() + 1
+        stop_level = np.where(is_long, entry - self.stop_points, entry + self.stop_points)
+        target_level = np.where(is_long, entry + self.target_points, entry - self.target_points)
+
+        # First tick at/through each level - longs stop below and target above, shorts the reverse
+        sign = np.where(is_long, 1.0, -1.0)
+        stop_tick = np.full(len(signals), -1, dtype=np.int64)
+        target_tick = np.full(len(signals), -1, dtype=np.int64)
+        for direction in (1.0, -1.0):
+            rows = sign == direction
+            if rows.any():
+                stop_tick[rows] = first_at_or_below(direction * tick_prices, starts[rows], direction * stop_level[rows])
+                target_tick[rows] = first_at_or_below(-direction * tick_prices, starts[rows],
+                                                      -direction * target_level[rows])
+
+        never = len(tick_prices)
+        stop_tick = np.where(stop_tick < 0, never, stop_tick)
+        target_tick = np.where(target_tick < 0, never, target_tick)
+        exit_tick = np.minimum(stop_tick, target_tick)
+        is_open = exit_tick >= never
+        hit_target = (target_tick < stop_tick) & ~is_open
+
+        # Bracket orders fill at their level (the stop-market with optional slippage), not at the tick
+        # that crossed it - a synthetic tick is a whole bar's High/Low away
+        last = len(tick_prices) - 1
+        stop_fill = stop_level - sign * self.slippage_points
+        exit_price = np.where(is_open, tick_prices[np.minimum(exit_tick, last)],
+                              np.where(hit_target, target_level, stop_fill))
+        exit_reason = np.where(is_open, 'OPEN', np.where(hit_target, 'TARGET', 'STOP'))
+        exit_tick = np.minimum(exit_tick, last)
+
+        trades = signals.assign(
+            exit_tick=exit_tick,
+            exit_time=pd.to_datetime(tick_times[exit_tick]),
+            exit_price=exit_price,
+            exit_reason=exit_reason,
+        )
+
+        # NinjaTrader ignores signals while a position is open
+        if self.one_position:
+            keep = np.zeros(len(trades), dtype=bool)
+            busy_until = -1
+            for row, (tick, exit_at) in enumerate(zip(trades['tick'].tolist(), exit_tick.tolist())):
+                if tick > busy_until:
+                    keep[row] = True
+                    busy_until = exit_at
+            trades = trades[keep].reset_index(drop=True)
+
+        pnl_points = np.where(trades['direction'] == 'LONG', 1.0, -1.0) * (trades['exit_price'] - trades['entry_price'])
+        return trades.assign(pnl_points=pnl_points,
+                             pnl_dollars=pnl_points * self.point_value * self.quantity)
+
+    def run(self, bars, tick_times=None, tick_prices=None):
+        """Backtest bars (and optional recorded ticks) - returns (trades, summary)"""
+        if tick_times is None:
+            tick_times, tick_prices = synthetic_ticks(bars)
+        signals = self.find_signals(bars, tick_times, tick_prices)
+        trades = self.apply_brackets(signals, tick_times, tick_prices)
+        return trades, summarize(trades, len(signals))
+
+
+def summarize(trades, signal_count=None):
+    """Headline statistics for a trades table"""
+    closed = trades[trades['exit_reason'] != 'OPEN'] if len(trades) else trades
+    pnl = closed['pnl_dollars'].to_numpy() if len(closed) else np.zeros(0)
+    equity = np.cumsum(pnl)
+    wins = pnl[pnl > 0].sum()
+    losses = -pnl[pnl < 0].sum()
+    return {
+        'signals': signal_count if signal_count is not None else len(trades),
+        'trades': len(closed),
+        'wins': int((pnl > 0).sum()),
+        'losses': int((pnl < 0).sum()),
+        'win_rate': float((pnl > 0).mean()) if len(pnl) else 0.0,
+        'total_points': float(closed['pnl_points'].sum()) if len(closed) else 0.0,
+        'total_pnl': float(pnl.sum()),
+        'profit_factor': float(wins / losses) if losses > 0 else float('inf') if wins > 0 else 0.0,
+        'max_drawdown': float((np.maximum.accumulate(np.append(0.0, equity)) - np.append(0.0, equity)).max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the FVG retest strategy on historical data')
+    parser.add_argument('--historical', default='data/HistoricalData.csv')
+    parser.add_argument('--ticks', help='LiveFeed.csv style tick file (default: synthetic ticks from OHLC)')
+    parser.add_argument('--min-gap', type=float, default=5.0)
+    parser.add_argument('--max-distance', type=float, default=250.0)
+    parser.add_argument('--stop', type=float, default=10.0)
+    parser.add_argument('--target', type=float, default=5.0)
+    parser.add_argument('--slippage', type=float, default=0.0, help='points a stop fills past its level')
+    parser.add_argument('--quantity', type=int, default=12)
+    parser.add_argument('--point-value', type=float, default=5.0, help='dollars per point (MES = 5)')
+    parser.add_argument('--signal-rules', type=json.loads, help='JSON signal ledger rules (default: the bot\'s)')
+    parser.add_argument('--output', help='write the trades table to this CSV')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = BarStore(args.historical, use_cache=True)
+    store.refresh()
+    if store.bar_count < 3:
+        logger.error(f"Not enough bars in {args.historical}")
+        return
+
+    tick_times = tick_prices = None
+    if args.ticks:
+        tick_times, tick_prices = read_tick_file(args.ticks)
+
+    backtester = Backtester(min_gap=args.min_gap, max_distance=args.max_distance, stop_points=args.stop,
+                            target_points=args.target, quantity=args.quantity, point_value=args.point_value,
+                            slippage_points=args.slippage, signal_rules=args.signal_rules)
+    trades, summary = backtester.run(store.df, tick_times, tick_prices)
+
+    logger.info(f"Backtest over {store.bar_count} bars")
+    for key, value in summary.items():
+        logger.info(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+    if args.output:
+        trades.to_csv(args.output, index=False)
+        logger.info(f"Trades written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
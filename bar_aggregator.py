@@ -0,0 +1,126 @@
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# LiveFeed.csv tick times are MM/dd/yyyy HH:mm:ss - the first 13 characters name the hour
+HOUR_PREFIX = 13
+HOUR_FORMAT = '%m/%d/%Y %H'
+HOUR_NS = 3600 * 10**9
+
+
+class BarAggregator:
+    """Builds the forming hourly bar from live ticks - O(1) per tick
+
+    HistoricalData bars are stamped with their close time, so a tick at
+    10:xx:xx belongs to the bar labelled 11:00:00. A bar closes on the first
+    tick of a later hour, or from close_if_due() once the clock is past its
+    end (the bar before the daily break gets no next tick for an hour).
+
+    The bar forming when the bot starts is partial unless seed() rebuilt it
+    from archived ticks; partial bars are never emitted - the file supplies
+    them. Ticks for an hour that already closed are counted and skipped.
+    """
+
+    def __init__(self, grace_seconds=5.0, live_window_seconds=600.0):
+        # Clock closes wait grace_seconds for late ticks, and only happen within
+        # live_window_seconds of the bar's end (replayed ticks are hours old)
+        self.grace_ns = int(grace_seconds * 1e9)
+        self.live_window_ns = int(live_window_seconds * 1e9)
+
+        self.bar = None          # [end_ns, open, high, low, close] of the forming bar
+        self.partial = True      # the forming bar is missing ticks from before the bot started
+        self.hour_key = None     # tick time prefix of the forming bar's hour
+        self.last_end_ns = None  # end of the last closed bar
+        self.bars_closed = 0
+        self.late_ticks = 0
+
+    def hour_end(self, hour):
+        """Close time (epoch ns) of the bar an 'MM/dd/yyyy HH' hour's ticks belong to, or None"""
+        try:
+            return pd.Timestamp(datetime.strptime(hour, HOUR_FORMAT)).value + HOUR_NS
+        except ValueError:
+            return None
+
+    def add_ticks(self, ticks):
+        """Fold (datetime_str, price) ticks in - returns (position, bar) for each bar they closed
+
+        position is the index of the tick that closed the bar, so callers can
+        process the ticks before it against the zones the bar leaves behind.
+        Ticks without a time (price re-checks) are ignored.
+        """
+        closed = []
+        bar = self.bar
+        key = self.hour_key
+        for position, (tick_datetime, price) in enumerate(ticks):
+            if tick_datetime is None:
+                continue
+            hour = tick_datetime[:HOUR_PREFIX]
+            if hour != key:
+                # First tick of a new hour (or a late / malformed one) - parsed once per hour
+                end_ns = self.hour_end(hour)
+                if (end_ns is None or (bar is not None and end_ns < bar[0])
+                        or (self.last_end_ns is not None and end_ns <= self.last_end_ns)):
+                    self.late_ticks += 1
+                    continue
+                key = self.hour_key = hour
+                if bar is None or end_ns != bar[0]:
+                    if bar is not None:
+                        done = self._close()
+                        if done is not None:
+                            closed.append((position, done))
+                    bar = self.bar = [end_ns, price, price, price, price]
+                    continue
+
+            if price > bar[2]:
+                bar[2] = price
+            elif price < bar[3]:
+                bar[3] = price
+            bar[4] = price
+        return closed
+
+    def is_due(self, now_ns):
+        """True if the clock is past the forming bar's end (and the bar is live, not replayed)"""
+        bar = self.bar
+        return bar is not None and bar[0] + self.grace_ns <= now_ns < bar[0] + self.live_window_ns
+
+    def close_if_due(self, now_ns):
+        """Close the forming bar if the clock is past its end - returns the bar, or None"""
+        if not self.is_due(now_ns):
+            return None
+        self.hour_key = None  # later ticks for this hour are late
+        return self._close()
+
+    def _close(self):
+        bar, self.bar = self.bar, None
+        self.last_end_ns = bar[0]
+        if self.partial:
+            self.partial = False
+            logger.info(f"Live bar {pd.Timestamp(bar[0])} started before the first tick read - "
+                        f"left to HistoricalData.csv")
+            return None
+        self.bars_closed += 1
+        return tuple(bar)
+
+    def seed(self, times, prices):
+        """Rebuild the forming bar from earlier ticks (the tick archive at startup)
+
+        The newest tick's hour becomes the forming bar. It only counts as
+        complete when the ticks reach back into the hour before it - the feed
+        was recording when the bar opened.
+        """
+        times_ns = np.asarray(times).astype('datetime64[ns]').view(np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if not len(times_ns):
+            return
+        ends = (times_ns // HOUR_NS + 1) * HOUR_NS
+        end = ends[-1]
+        current = prices[ends == end]
+        self.bar = [int(end), float(current[0]), float(current.max()), float(current.min()), float(current[-1])]
+        self.partial = not (ends < end).any()
+        self.hour_key = None  # the next tick re-parses its hour
+        logger.info(f"Forming bar {pd.Timestamp(end)} rebuilt from {len(current)} archived ticks"
+                    f"{' (partial)' if self.partial else ''}")
@@ -0,0 +1,289 @@
+import io
+import os
+import json
+import hashlib
+import logging
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows - single writer assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# NinjaScript writes bar times as MM/dd/yyyy HH:mm:ss
+BAR_DATETIME_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+# Bytes hashed from the end of the covered part of a CSV
+TAIL_BYTES = 4096
+
+
+def history_fingerprint(path, size, tail_bytes=TAIL_BYTES):
+    """Fingerprint of the first `size` bytes of a file - size plus a hash of their tail"""
+    with open(path, 'rb') as f:
+        start = max(0, size - tail_bytes)
+        f.seek(start)
+        tail = f.read(size - start)
+    if len(tail) != size - start:
+        return None
+    return {'size': size, 'tail_sha1': hashlib.sha1(tail).hexdigest()}
+
+
+def parse_bar_times(values):
+    """Vectorized parse of fixed-width MM/dd/yyyy HH:mm:ss strings - None if any value differs"""
+    raw = np.asarray(values, dtype='S')
+    if raw.dtype.itemsize != 19:
+        return None
+    chars = raw.view(np.uint8).reshape(-1, 19).astype(np.int64)
+    if not ((chars[:, [2, 5]] == ord('/')).all() and (chars[:, 10] == ord(' ')).all()
+            and (chars[:, [13, 16]] == ord(':')).all()):
+        return None
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]] - ord('0')
+    if digits.min() < 0 or digits.max() > 9:
+        return None
+
+    month = digits[:, 0] * 10 + digits[:, 1]
+    day = digits[:, 2] * 10 + digits[:, 3]
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+    seconds = (digits[:, 8] * 10 + digits[:, 9]) * 3600 + (digits[:, 10] * 10 + digits[:, 11]) * 60 \
+        + digits[:, 12] * 10 + digits[:, 13]
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    dates = months.astype('datetime64[D]') + (day - 1)
+
+    # Out-of-range fields (month 13, Feb 30, 25:00) go to the slow path for a proper error
+    if ((month < 1) | (month > 12) | (day < 1) | (dates.astype('datetime64[M]') != months)
+            | (seconds >= 86400)).any():
+        return None
+    return dates.astype('datetime64[ns]') + seconds.astype('timedelta64[s]')
+
+
+def parse_bar_csv(data, names=None):
+    """Parse bar CSV bytes into a DataFrame (header in the data unless names are given)"""
+    if names is None:
+        df = pd.read_csv(io.BytesIO(data))
+    else:
+        df = pd.read_csv(io.BytesIO(data), header=None, names=names)
+    if df.empty:
+        return df
+
+    times = parse_bar_times(df['DateTime'].to_numpy(dtype=str))
+    if times is not None:
+        df['DateTime'] = times
+        return df
+    try:
+        df['DateTime'] = pd.to_datetime(df['DateTime'], format=BAR_DATETIME_FORMAT)
+    except ValueError:
+        df['DateTime'] = pd.to_datetime(df['DateTime'])
+    return df
+
+
+class BarCache:
+    """Memory-mapped columnar sidecar cache of a bar CSV
+
+    Each column lives in its own raw file next to the CSV (DateTime as int64
+    epoch nanoseconds, prices as float64) and is memory-mapped read-only, so
+    a cold start maps the files instead of parsing text and every process
+    using the same CSV shares the same page-cache pages. The CSV stays the
+    source of truth: sync() appends only the rows written since the last
+    sync, and rebuilds the cache from scratch when the CSV no longer starts
+    with the bytes the cache was built from. Text columns (e.g. Instrument)
+    are kept in the metadata and must hold a single value.
+    """
+
+    def __init__(self, csv_path, cache_dir=None):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir or f'{csv_path}.cache'
+        self.meta_path = os.path.join(self.cache_dir, 'meta.json')
+        self.meta = None
+        self.columns = {}
+
+    @contextmanager
+    def _locked(self):
+        """Serialize cache writers across processes (advisory lock, POSIX only)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, 'lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        """Cache metadata, or None if there is no usable cache"""
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == CACHE_VERSION else None
+
+    def _write_meta(self, meta):
+        """Atomically replace the metadata (readers never see a half-written file)"""
+        tmp_path = f'{self.meta_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _column_path(self, name, generation):
+        return os.path.join(self.cache_dir, f'{name}.{generation}.bin')
+
+    def _column_arrays(self, df, meta):
+        """Split parsed bars into the cache's binary columns"""
+        arrays = {}
+        for name, dtype in meta['columns']:
+            if name == 'DateTime':
+                arrays[name] = df[name].to_numpy().astype('datetime64[ns]').astype(np.int64)
+            else:
+                arrays[name] = df[name].to_numpy(dtype=dtype)
+
+        for name, value in meta['constants'].items():
+            values = df[name].unique()
+            if len(values) != 1 or values[0] != value:
+                raise ValueError(f"column {name} is not constant - cannot cache it")
+        return arrays
+
+    def _valid(self, meta, csv_size):
+        """True if the CSV still starts with the bytes the cache was built from"""
+        if meta is None or csv_size < meta['csv_offset']:
+            return False
+        return history_fingerprint(self.csv_path, meta['csv_offset']) == meta['fingerprint']
+
+    def _read_complete(self, offset, size):
+        """Bytes from offset up to the last complete line"""
+        with open(self.csv_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        return data[:data.rfind(b'\n') + 1]
+
+    def _rebuild(self, old_meta, csv_size):
+        """Parse the whole CSV into a new generation of column files"""
+        data = self._read_complete(0, csv_size)
+        header_end = data.find(b'\n') + 1
+        if header_end == 0:
+            return None
+        df = parse_bar_csv(data)
+        if df.empty:
+            # Column types are unknown until the first bar arrives
+            return None
+
+        columns = [['DateTime', 'int64']]
+        constants = {}
+        for name in df.columns:
+            if name == 'DateTime':
+                continue
+            if pd.api.types.is_numeric_dtype(df[name]):
+                columns.append([name, 'float64'])
+            else:
+                constants[name] = df[name].iloc[0]
+
+        generation = old_meta['generation'] + 1 if old_meta else 1
+        meta = {
+            'version': CACHE_VERSION,
+            'generation': generation,
+            'header': data[:header_end].decode(),
+            'columns': columns,
+            'constants': constants,
+            'rows': len(df),
+            'csv_offset': len(data),
+            'fingerprint': history_fingerprint(self.csv_path, len(data)),
+        }
+        for name, array in self._column_arrays(df, meta).items():
+            with open(self._column_path(name, generation), 'wb') as f:
+                f.write(array.tobytes())
+        self._write_meta(meta)
+
+        # Old generations stay valid for processes that still map them (POSIX)
+        if old_meta:
+            for name, _ in old_meta['columns']:
+                try:
+                    os.remove(self._column_path(name, old_meta['generation']))
+                except OSError:
+                    pass
+
+        logger.info(f"Built bar cache for {self.csv_path}: {len(df)} bars")
+        return meta
+
+    def _append(self, meta, csv_size):
+        """Parse only the rows appended to the CSV and extend the column files"""
+        data = self._read_complete(meta['csv_offset'], csv_size)
+        if not data:
+            return meta
+
+        names = meta['header'].strip().split(',')
+        df = parse_bar_csv(data, names=names)
+        meta = dict(meta)
+        if not df.empty:
+            rows = meta['rows']
+            for name, array in self._column_arrays(df, meta).items():
+                path = self._column_path(name, meta['generation'])
+                # Drop any tail left by an interrupted append before extending
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * array.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(array.tobytes())
+            meta['rows'] = rows + len(df)
+
+        meta['csv_offset'] += len(data)
+        meta['fingerprint'] = history_fingerprint(self.csv_path, meta['csv_offset'])
+        self._write_meta(meta)
+        return meta
+
+    def _map(self, meta):
+        """Memory-map every column for the rows the metadata covers"""
+        columns = {}
+        rows = meta['rows']
+        for name, dtype in meta['columns']:
+            if rows == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(self._column_path(name, meta['generation']), dtype=dtype,
+                                          mode='r', shape=(rows,))
+        self.columns = columns
+        self.meta = meta
+
+    def sync(self):
+        """Bring the cache up to date with the CSV - returns True if the bars changed"""
+        csv_size = os.path.getsize(self.csv_path)
+        with self._locked():
+            meta = self._read_meta()
+            if not self._valid(meta, csv_size):
+                meta = self._rebuild(meta, csv_size)
+                if meta is None:
+                    return False
+            elif csv_size > meta['csv_offset']:
+                meta = self._append(meta, csv_size)
+
+        changed = (self.meta is None or meta['generation'] != self.meta['generation']
+                   or meta['rows'] != self.meta['rows'])
+        if changed:
+            self._map(meta)
+        else:
+            self.meta = meta
+        return changed
+
+    @property
+    def csv_offset(self):
+        """Bytes of the CSV the cache covers"""
+        return 0 if self.meta is None else self.meta['csv_offset']
+
+    def frame(self, start=0):
+        """Bars from row start on as a DataFrame whose columns are views of the memory maps"""
+        if self.meta is None:
+            return None
+        data = {'DateTime': self.columns['DateTime'][start:].view('datetime64[ns]')}
+        for name, _ in self.meta['columns'][1:]:
+            data[name] = self.columns[name][start:]
+        df = pd.DataFrame(data, copy=False)
+        for name, value in self.meta['constants'].items():
+            df[name] = value
+        # Keep the CSV's column order
+        names = [name for name in self.meta['header'].strip().split(',') if name in df.columns]
+        return df[names] if names != list(df.columns) else df
@@ -0,0 +1,217 @@
+import os
+import logging
+
+import pandas as pd
+
+from bar_cache import BarCache, parse_bar_csv
+
+logger = logging.getLogger(__name__)
+
+
+class BarStore:
+    """In-memory store of HistoricalData.csv bars - loads once, appends only new rows
+
+    With use_cache the bars are served from a memory-mapped BarCache sidecar
+    instead of being parsed from the CSV; any cache error falls back to
+    parsing the CSV directly.
+
+    After release_history() the full history is dropped and only the rows
+    read since the last take_new_bars() are held - the live bot keeps its
+    own bounded bar window, so memory no longer grows with the file.
+    """
+
+    # Bytes kept from just before the read offset to detect in-place rewrites
+    CHECK_BYTES = 128
+
+    def __init__(self, path, use_cache=False):
+        self.path = path
+        self.df = None
+        self.cache = BarCache(path) if use_cache else None
+
+        # Full history (startup, backtests) or only new rows (live bot)
+        self.keep_history = True
+        self.new_bars = []
+
+        # Rows read from the file and the close time of the newest one
+        self.rows = 0
+        self.last_time_ns = None
+
+        # File tracking
+        self.offset = 0
+        self.header = None
+        self.file_id = None
+        self.check_bytes = b''
+        self.last_stat = None
+        self.cache_generation = None
+
+    def reset(self):
+        """Drop all bars and the read position"""
+        self.df = None
+        self.new_bars = []
+        self.rows = 0
+        self.last_time_ns = None
+        self.offset = 0
+        self.header = None
+        self.file_id = None
+        self.check_bytes = b''
+        self.last_stat = None
+        self.cache_generation = None
+
+    def release_history(self):
+        """Stop holding the full history - later reads only queue new rows for take_new_bars()"""
+        self.keep_history = False
+        self.df = None
+
+    def take_new_bars(self):
+        """Rows read since the last call (all of them again after a rewrite), or None"""
+        if not self.new_bars:
+            return None
+        bars = self.new_bars[0] if len(self.new_bars) == 1 else pd.concat(self.new_bars, ignore_index=True)
+        self.new_bars = []
+        return bars
+
+    def _add(self, new_bars):
+        """Record newly read rows - extend the history, or queue them once it was released"""
+        # Bars normally arrive in order - only sort when they don't
+        if not new_bars['DateTime'].is_monotonic_increasing:
+            new_bars = new_bars.sort_values('DateTime', kind='stable').reset_index(drop=True)
+
+        if not self.keep_history:
+            self.new_bars.append(new_bars)
+        elif self.df is None or self.df.empty:
+            self.df = new_bars
+        else:
+            df = pd.concat([self.df, new_bars], ignore_index=True)
+            if not df['DateTime'].is_monotonic_increasing:
+                df = df.sort_values('DateTime', kind='stable').reset_index(drop=True)
+            self.df = df
+
+        self.rows += len(new_bars)
+        latest = pd.Timestamp(new_bars['DateTime'].iat[-1]).value
+        self.last_time_ns = latest if self.last_time_ns is None else max(self.last_time_ns, latest)
+
+    def _file_changed(self, f, stat):
+        """Check if the file was truncated, re-created or rewritten since the last read"""
+        if self.file_id is not None and (stat.st_dev, stat.st_ino) != self.file_id:
+            return True
+        if stat.st_size < self.offset:
+            return True
+        if self.check_bytes:
+            f.seek(self.offset - len(self.check_bytes))
+            if f.read(len(self.check_bytes)) != self.check_bytes:
+                return True
+        return False
+
+    def _refresh_from_cache(self, stat_key):
+        """Sync the binary cache and take the rows it gained from its memory maps"""
+        self.cache.sync()
+        self.last_stat = stat_key
+        self.offset = self.cache.csv_offset
+        meta = self.cache.meta
+        if meta is None:
+            return False
+
+        if meta['generation'] != self.cache_generation:
+            # Cache rebuilt - the CSV was rewritten, every row is new
+            self.df = None
+            self.new_bars = []
+            self.rows = 0
+            self.last_time_ns = None
+            self.cache_generation = meta['generation']
+        if meta['rows'] == self.rows:
+            return False
+
+        if self.keep_history:
+            # The whole history, as views of the maps
+            self.df = None
+            self.rows = 0
+            self._add(self.cache.frame())
+        else:
+            # Only the new rows, copied off the maps
+            self._add(self.cache.frame(start=self.rows).copy())
+        return True
+
+    def refresh(self):
+        """Sync with the file if its mtime/size changed - returns True if bars changed"""
+        if not os.path.exists(self.path):
+            if self.rows:
+                self.reset()
+                return True
+            return False
+
+        stat = os.stat(self.path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if stat_key == self.last_stat:
+            return False
+
+        if self.cache is not None:
+            try:
+                return self._refresh_from_cache(stat_key)
+            except Exception as e:
+                logger.error(f"Bar cache unavailable, parsing CSV instead: {e}")
+                self.cache = None
+                self.reset()
+
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+
+            if self._file_changed(f, stat):
+                logger.info(f"Historical data rewritten, reloading: {self.path}")
+                self.reset()
+
+            self.file_id = (stat.st_dev, stat.st_ino)
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+
+        # Only consume complete lines - a bar may still be being written
+        end = data.rfind(b'\n')
+        if end < 0:
+            return False
+        complete = data[:end + 1]
+        self.last_stat = stat_key
+
+        if self.header is None:
+            header_end = complete.find(b'\n') + 1
+            self.header = complete[:header_end]
+            body = complete[header_end:]
+        else:
+            body = complete
+
+        self.offset += end + 1
+        self.check_bytes = (self.check_bytes + complete)[-self.CHECK_BYTES:]
+
+        if not body.strip():
+            return False
+
+        new_bars = parse_bar_csv(self.header + body)
+        if new_bars.empty:
+            return False
+
+        self._add(new_bars)
+        return True
+
+    @property
+    def bar_count(self):
+        """Number of rows read from the file"""
+        return self.rows
+
+    def latest_bar(self):
+        """Most recent bar of the history as a Series, or None"""
+        if self.df is None or self.df.empty:
+            return None
+        return self.df.iloc[-1]
+
+    def latest_time(self):
+        """Timestamp of the most recent bar read, or None"""
+        if self.last_time_ns is None:
+            return None
+        return pd.Timestamp(self.last_time_ns)
+
+    def window(self, count, end=None):
+        """Last `count` bars of the history ending at index `end` (exclusive, default all bars)"""
+        if self.df is None or self.df.empty:
+            return None
+        if end is None:
+            end = len(self.df)
+        return self.df.iloc[max(0, end - count):end]
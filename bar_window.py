@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# Prices within this of each other are the same bar (2-decimal CSV vs tick prices)
+PRICE_TOLERANCE = 0.005
+
+
+class BarWindow:
+    """The most recent bars in preallocated NumPy ring buffers - O(1) per bar, fixed memory
+
+    Bars are addressed by number (0 = first bar of the history), so numbers
+    stay valid as old bars fall out of the window; bar(i) raises IndexError
+    for bars no longer held. The window only needs to cover the three
+    candles of the gap check plus the bars a late file bar can correct.
+
+    Bars built from live ticks sit after the confirmed (file / socket) bars
+    until merge() confirms or corrects them.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.int64)  # bar close, epoch ns
+        self.open = np.zeros(capacity, dtype=np.float64)
+        self.high = np.zeros(capacity, dtype=np.float64)
+        self.low = np.zeros(capacity, dtype=np.float64)
+        self.close = np.zeros(capacity, dtype=np.float64)
+        self.total = 0       # bars ever added - the next bar's number
+        self.count = 0       # bars held (at most capacity)
+        self.live_count = 0  # trailing bars built from ticks, not yet confirmed
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def first(self):
+        """Number of the oldest bar held"""
+        return self.total - self.count
+
+    def _slot(self, number):
+        if not self.first <= number < self.total:
+            raise IndexError(f"bar {number} is not in the window ({self.first} to {self.total - 1})")
+        return number % self.capacity
+
+    def bar(self, number):
+        """(time_ns, open, high, low, close) of a bar held in the window"""
+        slot = self._slot(number)
+        return (int(self.times[slot]), float(self.open[slot]), float(self.high[slot]),
+                float(self.low[slot]), float(self.close[slot]))
+
+    def time_ns(self, number):
+        return int(self.times[self._slot(number)])
+
+    @property
+    def latest_time_ns(self):
+        """Close time of the newest bar, or None"""
+        return int(self.times[(self.total - 1) % self.capacity]) if self.count else None
+
+    @property
+    def latest_confirmed_time_ns(self):
+        """Close time of the newest bar that did not come from live ticks, or None"""
+        number = self.total - 1 - self.live_count
+        return int(self.times[number % self.capacity]) if number >= self.first else None
+
+    def append(self, time_ns, open_, high, low, close, live=False):
+        """Add a bar newer than every bar held - returns False (and adds nothing) otherwise"""
+        if self.count and time_ns <= self.times[(self.total - 1) % self.capacity]:
+            return False
+        slot = self.total % self.capacity
+        self.times[slot] = time_ns
+        self.open[slot] = open_
+        self.high[slot] = high
+        self.low[slot] = low
+        self.close[slot] = close
+        self.total += 1
+        self.count = min(self.count + 1, self.capacity)
+        if live:
+            self.live_count += 1
+        return True
+
+    def extend(self, times_ns, opens, highs, lows, closes, first_number=None):
+        """Add confirmed bars in time order in one vectorized write (only the last capacity are kept)
+
+        first_number restarts the numbering at that bar, dropping every bar
+        held (seeding the window with the tail of a longer history).
+        """
+        if first_number is not None and first_number != self.total:
+            self.total = first_number
+            self.count = self.live_count = 0
+        added = len(times_ns)
+        keep = min(added, self.capacity)
+        slots = (self.total + added - keep + np.arange(keep)) % self.capacity
+        for column, values in ((self.times, times_ns), (self.open, opens), (self.high, highs),
+                               (self.low, lows), (self.close, closes)):
+            column[slots] = np.asarray(values)[added - keep:]
+        self.total += added
+        self.count = min(self.count + added, self.capacity)
+
+    def truncate(self, number):
+        """Drop the bars numbered number and up (never more than the window holds)"""
+        number = max(number, self.first)
+        dropped = self.total - number
+        if dropped <= 0:
+            return
+        self.total = number
+        self.count -= dropped
+        self.live_count = max(self.live_count - dropped, 0)
+
+    def find(self, time_ns):
+        """Number of the first bar held closing at or after time_ns (total if none)"""
+        order = (self.first + np.arange(self.count)) % self.capacity
+        return self.first + int(np.searchsorted(self.times[order], time_ns))
+
+    def merge(self, times_ns, opens, highs, lows, closes):
+        """Add confirmed bars, reconciling the live bars they cover - returns the corrections
+
+        Confirmed bars not newer than the newest confirmed bar held are
+        ignored. A correction (time_ns, live OHLC or None, confirmed OHLC or
+        None) is returned for every covered live bar that the confirmed bars
+        lack or disagree with, and for every confirmed bar that lands among
+        live bars (an hour the ticks missed).
+        """
+        times_ns = np.asarray(times_ns, dtype=np.int64)
+        latest = self.latest_confirmed_time_ns
+        if latest is not None:
+            newer = times_ns > latest
+            times_ns, opens, highs, lows, closes = (times_ns[newer], np.asarray(opens)[newer], np.asarray(highs)[newer],
+                                                    np.asarray(lows)[newer], np.asarray(closes)[newer])
+        if not len(times_ns):
+            return []
+
+        live = [self.bar(number) for number in range(self.total - self.live_count, self.total)]
+        self.truncate(self.total - self.live_count)
+
+        corrections = []
+        covered = {bar[0]: bar for bar in live if bar[0] <= times_ns[-1]}
+        if covered:
+            newest_live = live[-1][0]
+            for i in range(len(times_ns)):
+                time_ns = int(times_ns[i])
+                if time_ns > newest_live:
+                    break
+                confirmed = (float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i]))
+                bar = covered.pop(time_ns, None)
+                if bar is None or max(abs(a - b) for a, b in zip(bar[1:], confirmed)) >= PRICE_TOLERANCE:
+                    corrections.append((time_ns, None if bar is None else bar[1:], confirmed))
+            corrections += [(time_ns, bar[1:], None) for time_ns, bar in covered.items()]
+            corrections.sort(key=lambda correction: correction[0])
+
+        self.extend(times_ns, opens, highs, lows, closes)
+        for bar in live:
+            if bar[0] > times_ns[-1]:
+                self.append(*bar, live=True)
+        return corrections
+
+    def frame(self):
+        """Bars held as a DataFrame, oldest first"""
+        order = (self.first + np.arange(self.count)) % self.capacity
+        return pd.DataFrame({
+            'DateTime': self.times[order].view('datetime64[ns]'),
+            'Open': self.open[order],
+            'High': self.high[order],
+            'Low': self.low[order],
+            'Close': self.close[order],
+        })
@@ -0,0 +1,62 @@
+"""Benchmark HistoricalData.csv loading - CSV parsing against the memory-mapped bar cache
+
+Usage: python benchmarks/bench_bar_cache.py [--sizes 100000 1000000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bar_store import BarStore  # noqa: E402
+from synthetic_data import synthetic_bars, write_historical_csv  # noqa: E402
+
+
+def timed_load(path, use_cache):
+    """Seconds for a fresh BarStore to load the file"""
+    store = BarStore(path, use_cache=use_cache)
+    start = time.perf_counter()
+    store.refresh()
+    return time.perf_counter() - start, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**5, 10**6])
+    args = parser.parse_args()
+
+    print(f"{'bars':>10} {'csv (s)':>9} {'build (s)':>10} {'mapped (s)':>11} {'append 1 (s)':>13}")
+    for size in args.sizes:
+        directory = tempfile.mkdtemp(prefix='fvg_bench_')
+        try:
+            path = os.path.join(directory, 'HistoricalData.csv')
+            bars = synthetic_bars(size + 1)
+            write_historical_csv(bars.iloc[:size], path)
+
+            csv_time, _ = timed_load(path, use_cache=False)
+            build_time, _ = timed_load(path, use_cache=True)
+            mapped_time, store = timed_load(path, use_cache=True)
+
+            # One new bar appended by NinjaScript
+            last = bars.iloc[size]
+            with open(path, 'a') as f:
+                f.write(f"{last['DateTime']:%m/%d/%Y %H:%M:%S},{last['Open']:.2f},{last['High']:.2f},"
+                        f"{last['Low']:.2f},{last['Close']:.2f}\n")
+            start = time.perf_counter()
+            store.refresh()
+            append_time = time.perf_counter() - start
+            if store.bar_count != size + 1:
+                print(f"MISMATCH at {size} bars: {store.bar_count} bars after append")
+                sys.exit(1)
+
+            print(f"{size:>10} {csv_time:9.3f} {build_time:10.3f} {mapped_time:11.4f} {append_time:13.4f}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
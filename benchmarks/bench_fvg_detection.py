@@ -0,0 +1,77 @@
+"""Benchmark vectorized FVG detection against the original per-bar loop
+
+Usage: python benchmarks/bench_fvg_detection.py [--sizes 100000 1000000 10000000] [--loop-max 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fvg_detection import detect_fvgs  # noqa: E402
+from fvg_zone import zones_from_detected  # noqa: E402
+from synthetic_data import synthetic_bars  # noqa: E402
+
+
+def loop_find_fvgs(df, start_index=2, min_gap=5.0):
+    """Original per-bar FVGATITradingBot.find_fvgs_in_data loop (reference)"""
+    fvgs = []
+    for i in range(start_index, len(df)):
+        candle1 = df.iloc[i - 2]
+        candle3 = df.iloc[i]
+        if candle3['Low'] > candle1['High']:
+            gap_size = candle3['Low'] - candle1['High']
+            if gap_size >= min_gap:
+                fvgs.append(('bullish', candle3['Low'], candle1['High'], gap_size, candle3['DateTime'], i))
+        elif candle3['High'] < candle1['Low']:
+            gap_size = candle1['Low'] - candle3['High']
+            if gap_size >= min_gap:
+                fvgs.append(('bearish', candle1['Low'], candle3['High'], gap_size, candle3['DateTime'], i))
+    return fvgs
+
+
+def vectorized_find_fvgs(df, start_index=2, min_gap=5.0):
+    """Vectorized detector plus zone object conversion, as used by the bot"""
+    detected = detect_fvgs(df['High'].to_numpy(), df['Low'].to_numpy(), min_gap=min_gap, start_index=start_index)
+    return zones_from_detected(detected, df['DateTime'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**5, 10**6, 10**7])
+    parser.add_argument('--loop-max', type=int, default=10**5,
+                        help='largest size to run the per-bar loop on (it is very slow)')
+    args = parser.parse_args()
+
+    print(f"{'bars':>10} {'gaps':>8} {'loop (s)':>10} {'vector (s)':>11} {'columnar (s)':>13} {'speedup':>9}")
+    for size in args.sizes:
+        df = synthetic_bars(size)
+
+        start = time.perf_counter()
+        detected = detect_fvgs(df['High'].to_numpy(), df['Low'].to_numpy())
+        columnar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fvgs = vectorized_find_fvgs(df)
+        vector_time = time.perf_counter() - start
+
+        loop_time = None
+        if size <= args.loop_max:
+            start = time.perf_counter()
+            reference = loop_find_fvgs(df)
+            loop_time = time.perf_counter() - start
+
+            ours = [(f.type, f.top, f.bottom, f.gap_size, f.datetime, f.index) for f in fvgs]
+            if ours != reference:
+                print(f"MISMATCH at {size} bars: {len(ours)} vs {len(reference)} gaps")
+                sys.exit(1)
+
+        loop_str = f"{loop_time:10.3f}" if loop_time is not None else f"{'-':>10}"
+        speedup = f"{loop_time / vector_time:8.0f}x" if loop_time is not None else f"{'-':>9}"
+        print(f"{size:>10} {len(detected.index):>8} {loop_str} {vector_time:11.4f} {columnar_time:13.4f} {speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the signal ledger - startup rebuild of the index and the per-signal check
+
+Usage: python benchmarks/bench_signal_ledger.py [--sizes 10000 1000000] [--interval 600]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signal_ledger import LEDGER_DTYPE, LEDGER_HEADER, LEDGER_MAGIC, LEDGER_VERSION, SignalLedger  # noqa: E402
+
+
+def write_ledger(path, size, interval_s, seed=42):
+    """A ledger of size signals, one every interval_s seconds up to now"""
+    rng = np.random.default_rng(seed)
+    now_ns = time.time_ns()
+    records = np.zeros(size, dtype=LEDGER_DTYPE)
+    times = now_ns - np.arange(size)[::-1].astype(np.int64) * int(interval_s * 1e9)
+    records['wall_time'] = times.view('datetime64[ns]')
+    records['signal_time'] = times.view('datetime64[ns]')
+    records['zone_time'] = (times - 3600 * 10**9).view('datetime64[ns]')
+    records['bar_time'] = (times // (3600 * 10**9) * 3600 * 10**9).view('datetime64[ns]')
+    records['direction'] = rng.choice([1, -1], size)
+    records['entry_cents'] = rng.integers(500000, 700000, size) // 25 * 25
+    with open(path, 'wb') as f:
+        f.write(LEDGER_HEADER.pack(LEDGER_MAGIC, LEDGER_VERSION))
+        f.write(records.tobytes())
+    return now_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**4, 10**5, 10**6])
+    parser.add_argument('--interval', type=float, default=600, help='seconds between ledger signals')
+    args = parser.parse_args()
+
+    print(f"{'signals':>10} {'file (MB)':>10} {'rebuild (ms)':>13} {'indexed':>8} {'check (us)':>11}")
+    for size in args.sizes:
+        directory = tempfile.mkdtemp(prefix='fvg_bench_')
+        try:
+            path = os.path.join(directory, 'signal_ledger.bin')
+            now_ns = write_ledger(path, size, args.interval)
+
+            start = time.perf_counter()
+            ledger = SignalLedger(path)
+            rebuild = time.perf_counter() - start
+
+            # Duplicate + rate-limit check of a new signal
+            calls = 10000
+            start = time.perf_counter()
+            for i in range(calls):
+                ledger.check(ledger.key(now_ns, 'LONG', 6000.25, now_ns), now_ns)
+            check = (time.perf_counter() - start) / calls
+            ledger.close()
+
+            print(f"{size:>10} {os.path.getsize(path) / 2**20:10.1f} {rebuild * 1e3:13.2f} "
+                  f"{len(ledger.recent):>8} {check * 1e6:11.2f}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
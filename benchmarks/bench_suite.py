@@ -0,0 +1,255 @@
+"""Standing benchmark suite - times the bot's hot paths on synthetic data and writes the results as JSON
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000 10000 100000 1000000 10000000] [--ticks 5000]
+                                        [--output results.json] [--compare old.json] [--threshold 1.25]
+
+Every size gets a fresh seeded HistoricalData.csv / LiveFeed.csv pair in a
+temp folder. Per-call latencies are recorded for:
+
+  find_fvgs_in_data         detector over the whole history
+  load_historical_fvgs      startup scan of a fresh bot (bar cache already built)
+  check_fvg_retest_signals  per tick, zones loaded
+  clean_old_fvgs            per tick
+  display_status            per tick (output discarded)
+  loop_step                 one pass of the main loop with new ticks and a new bar every 60 passes
+
+Bot logging is switched off so the numbers measure the code, not the console.
+--compare prints p50 ratios against an earlier results file and exits 1 when
+any stage got slower than --threshold.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fvg_bot import FVGATITradingBot  # noqa: E402
+from synthetic_data import (BAR_DATETIME_FORMAT, synthetic_bars, synthetic_ticks,  # noqa: E402
+                            write_historical_csv, write_live_feed_csv)
+
+# Loop passes per new hourly bar in the loop_step benchmark
+PASSES_PER_BAR = 60
+# Ticks appended before each loop pass
+TICKS_PER_PASS = 10
+
+
+def latency_stats(samples_ns):
+    """Summary of per-call latencies in microseconds"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e3
+    if not len(samples):
+        return {'calls': 0}
+    return {
+        'calls': len(samples),
+        'mean_us': float(samples.mean()),
+        'p50_us': float(np.percentile(samples, 50)),
+        'p99_us': float(np.percentile(samples, 99)),
+        'max_us': float(samples.max()),
+        'total_s': float(samples.sum() / 1e6),
+    }
+
+
+def timed_calls(fn, args_list):
+    """Call fn once per argument tuple - returns the latency of each call in ns"""
+    clock = time.perf_counter_ns
+    samples = []
+    for args in args_list:
+        start = clock()
+        fn(*args)
+        samples.append(clock() - start)
+    return samples
+
+
+def make_bot(directory):
+    """A headless bot on the files in directory"""
+    return FVGATITradingBot(
+        instrument='MES',
+        historical_path=os.path.join(directory, 'HistoricalData.csv'),
+        live_feed_path=os.path.join(directory, 'LiveFeed.csv'),
+        signals_path=os.path.join(directory, 'trade_signals.csv'),
+        trades_log_path=os.path.join(directory, 'trades_taken.csv'),
+        journal_path=os.path.join(directory, 'signal_journal.csv'),
+        snapshot_path=os.path.join(directory, 'zone_snapshot.npz'),
+        ledger_path=os.path.join(directory, 'signal_ledger.bin'),
+        tick_archive_path=os.path.join(directory, 'tick_archive'),
+        watch_backend=None,
+        headless=True,
+        instrument_from_data=False,
+    )
+
+
+def prepare(directory, size, tick_count, seed):
+    """Write size bars and a one-tick LiveFeed.csv - returns the bars and ticks still to come"""
+    extra_bars = tick_count // (PASSES_PER_BAR * TICKS_PER_PASS) + 1
+    bars = synthetic_bars(size + extra_bars, seed=seed)
+    write_historical_csv(bars.iloc[:size], os.path.join(directory, 'HistoricalData.csv'))
+
+    ticks = synthetic_ticks(tick_count + 1, seed=seed + 1, start_price=bars['Close'].iat[size - 1],
+                            start_time=bars['DateTime'].iat[size - 1])
+    write_live_feed_csv(ticks.iloc[:1], os.path.join(directory, 'LiveFeed.csv'))
+    return bars.iloc[size:], ticks.iloc[1:]
+
+
+def bench_size(size, tick_count, repeats, seed):
+    """Run every benchmark on one history size"""
+    directory = tempfile.mkdtemp(prefix='fvg_bench_')
+    results = {}
+    try:
+        new_bars, ticks = prepare(directory, size, tick_count, seed)
+        prices = ticks['Last'].tolist()
+
+        # Detector over the whole history
+        bot = make_bot(directory)
+        df = bot.read_historical_data()
+        results['find_fvgs_in_data'] = latency_stats(timed_calls(bot.find_fvgs_in_data, [(df,)] * repeats))
+
+        # Startup scan - the first bot built the bar cache, so later ones map it
+        samples = []
+        for _ in range(repeats):
+            bot = make_bot(directory)
+            samples += timed_calls(bot.load_historical_fvgs, [()])
+        results['load_historical_fvgs'] = latency_stats(samples)
+        results['zones'] = len(bot.active_fvgs)
+
+        # Per-tick stages on the loaded bot, in loop order
+        current_index = bot.bar_window.total - 1
+        retest, clean, display = [], [], []
+        clock = time.perf_counter_ns
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for price in prices:
+                bot.check_live_fvg_fills(price)
+                start = clock()
+                bot.check_fvg_retest_signals(price)
+                retest.append(clock() - start)
+                start = clock()
+                bot.clean_old_fvgs(current_index, price)
+                clean.append(clock() - start)
+                start = clock()
+                bot.display_status(price)
+                display.append(clock() - start)
+        results['check_fvg_retest_signals'] = latency_stats(retest)
+        results['clean_old_fvgs'] = latency_stats(clean)
+        results['display_status'] = latency_stats(display)
+        bot.signal_writer.close()
+
+        # End to end - a fresh bot reading the files NinjaTrader would append to
+        bot = make_bot(directory)
+        bot.load_historical_fvgs()
+        results['loop_step'] = latency_stats(run_loop(bot, directory, new_bars, ticks))
+        bot.signal_writer.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def run_loop(bot, directory, new_bars, ticks):
+    """Append ticks (and a bar every PASSES_PER_BAR passes) between timed step() calls"""
+    live_feed_path = os.path.join(directory, 'LiveFeed.csv')
+    historical_path = os.path.join(directory, 'HistoricalData.csv')
+    tick_lines = [f"{when:{BAR_DATETIME_FORMAT}},{price:.2f}\n"
+                  for when, price in zip(ticks['DateTime'], ticks['Last'])]
+    bar_lines = [f"{bar.DateTime:{BAR_DATETIME_FORMAT}},{bar.Open:.2f},{bar.High:.2f},{bar.Low:.2f},{bar.Close:.2f}\n"
+                 for bar in new_bars.itertuples()]
+
+    clock = time.perf_counter_ns
+    samples = []
+    for count, start in enumerate(range(0, len(tick_lines), TICKS_PER_PASS)):
+        with open(live_feed_path, 'a') as f:
+            f.writelines(tick_lines[start:start + TICKS_PER_PASS])
+        if count and count % PASSES_PER_BAR == 0 and bar_lines:
+            with open(historical_path, 'a') as f:
+                f.write(bar_lines.pop(0))
+
+        began = clock()
+        bot.step()
+        samples.append(clock() - began)
+    return samples
+
+
+def environment(seed, tick_count):
+    """Where and on what the results were measured"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': seed,
+        'ticks': tick_count,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print p50 ratios against a baseline results file - returns the regressions"""
+    regressions = []
+    print(f"\nAgainst {baseline['environment'].get('commit')} ({baseline['environment'].get('timestamp')}):")
+    for size, stages in results['sizes'].items():
+        for stage, stats in stages.items():
+            old = baseline['sizes'].get(size, {}).get(stage)
+            if not isinstance(stats, dict) or not isinstance(old, dict) or not old.get('p50_us'):
+                continue
+            ratio = stats['p50_us'] / old['p50_us']
+            flag = '  REGRESSION' if ratio > threshold else ''
+            print(f"{size:>10} {stage:<26} {old['p50_us']:12.1f} -> {stats['p50_us']:12.1f} us  {ratio:6.2f}x{flag}")
+            if flag:
+                regressions.append((size, stage, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument('--ticks', type=int, default=5000, help='ticks for the per-tick and loop benchmarks')
+    parser.add_argument('--repeats', type=int, default=5, help='runs of the whole-history benchmarks')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.path.join(REPO, 'benchmarks', 'results',
+                                                         f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"))
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='p50 slowdown ratio counted as a regression')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = {'environment': environment(args.seed, args.ticks), 'sizes': {}}
+
+    print(f"{'bars':>10} {'zones':>6} {'stage':<26} {'calls':>6} {'p50 (us)':>12} {'p99 (us)':>12} {'max (us)':>12}")
+    for size in args.sizes:
+        stages = bench_size(size, args.ticks, args.repeats, args.seed)
+        results['sizes'][str(size)] = stages
+        for stage, stats in stages.items():
+            if isinstance(stats, dict):
+                print(f"{size:>10} {stages['zones']:>6} {stage:<26} {stats['calls']:>6} "
+                      f"{stats['p50_us']:12.1f} {stats['p99_us']:12.1f} {stats['max_us']:12.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Seeded synthetic NinjaTrader data - HistoricalData.csv hourly bars and LiveFeed.csv ticks
+
+Usage: python benchmarks/synthetic_data.py OUT_DIR [--bars 100000] [--ticks 100000] [--seed 42]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+TICK_SIZE = 0.25
+
+# Same layout as the NinjaScript exporters
+BAR_DATETIME_FORMAT = '%m/%d/%Y %H:%M:%S'
+HISTORICAL_HEADER = ['DateTime', 'Open', 'High', 'Low', 'Close']
+LIVE_FEED_HEADER = ['DateTime', 'Last']
+
+# Bars are stamped with their close time in exchange time (CT): the session runs
+# Sunday 17:00 to Friday 16:00 with a daily break from 16:00 to 17:00
+FIRST_SESSION = pd.Timestamp('2020-01-05 18:00:00')
+
+# Relative hourly volatility by bar close hour (cash open and close are busiest)
+HOURLY_VOLATILITY = np.array([
+    0.6, 0.6, 0.7, 0.8, 0.8, 0.8, 0.8, 0.9, 1.2, 1.9, 1.6, 1.2,
+    1.0, 1.0, 1.1, 1.5, 1.3, 1.0, 0.9, 0.7, 0.7, 0.6, 0.6, 0.6,
+])
+
+CHUNK_ROWS = 10**6
+
+DAY_NS = 86400 * 10**9
+
+
+def to_ticks(prices):
+    """Round to the 0.25 tick grid"""
+    return np.round(np.asarray(prices) / TICK_SIZE) * TICK_SIZE
+
+
+def session_bar_times(count, start=FIRST_SESSION):
+    """Close times of `count` consecutive CME hourly bars (no weekends, no daily break)"""
+    # About 115 of the 168 hours in a week have a bar
+    candidates = pd.date_range(start, periods=int(count * 168 / 115) + 168, freq='h')
+    hour = candidates.hour
+    day = candidates.dayofweek
+    trading = ((hour != 17) & (day != 5)
+               & ~((day == 4) & (hour > 16))
+               & ~((day == 6) & (hour < 18)))
+    return candidates[trading][:count]
+
+
+def ar1(noise, phi):
+    """x[t] = phi * x[t-1] + noise[t], vectorized a block at a time"""
+    noise = np.asarray(noise, dtype=np.float64)
+    out = np.empty_like(noise)
+    # phi ** -block must stay finite
+    block = max(1, min(65536, int(30 / -np.log(phi)))) if phi < 1 else 65536
+    weights = phi ** np.arange(block)
+    previous = 0.0
+    for start in range(0, len(noise), block):
+        chunk = noise[start:start + block]
+        w = weights[:len(chunk)]
+        x = w * (phi * previous + np.cumsum(chunk / w))
+        out[start:start + len(chunk)] = x
+        previous = x[-1]
+    return out
+
+
+def synthetic_bars(count, seed=42, start_price=5000.0, volatility=9.0):
+    """Hourly OHLC bars on the quarter-tick grid
+
+    Log-price random walk that slowly reverts to start_price (so 10^7 bars
+    stay in a plausible range), with an intraday volatility profile,
+    volatility regimes lasting a few days and overnight / weekend gaps, so
+    small and large FVGs appear at roughly the rate they do on MES.
+    volatility is the typical hourly move in points at start_price.
+    """
+    rng = np.random.default_rng(seed)
+    times = session_bar_times(count)
+
+    # Volatility regimes times the hour-of-day profile (relative to price)
+    regime = ar1(rng.normal(0, 0.07, count), 0.98)
+    sigma = volatility / start_price * np.exp(regime - 0.06) * HOURLY_VOLATILITY[times.hour]
+
+    # Bigger moves across the daily break and the weekend
+    gap_hours = np.diff(times.asi8, prepend=times.asi8[0] - 3600 * 10**9) // (3600 * 10**9)
+    gap = np.where(gap_hours > 1, rng.normal(0, 1, count) * np.sqrt(np.minimum(gap_hours, 49) / 4), 0.0)
+    gap *= volatility / start_price
+
+    # Half-life of about two years of hourly bars
+    log_close = ar1(rng.normal(0, 1, count) * sigma + gap, 1 - 1 / 12000)
+    close = start_price * np.exp(log_close)
+    open_ = np.concatenate(([start_price], close[:-1])) * np.exp(gap + rng.normal(0, 0.15, count) * sigma)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.6, count)) * sigma)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.6, count)) * sigma)
+    return pd.DataFrame({
+        'DateTime': times,
+        'Open': to_ticks(open_),
+        'High': to_ticks(high),
+        'Low': to_ticks(low),
+        'Close': to_ticks(close),
+    })
+
+
+def synthetic_ticks(count, seed=42, start_price=5000.0, start_time=None):
+    """Last-price ticks moving one tick (or not at all) at a time, several per second at busy times"""
+    rng = np.random.default_rng(seed)
+    steps = rng.choice(np.array([-1, 0, 1]), size=count, p=[0.3, 0.4, 0.3]) * TICK_SIZE
+    prices = to_ticks(start_price) + np.cumsum(steps)
+
+    # One-second timestamps - most ticks share a second with the one before
+    start_time = pd.Timestamp(start_time if start_time is not None else FIRST_SESSION)
+    seconds = np.cumsum(rng.random(count) < 0.35)
+    return pd.DataFrame({
+        'DateTime': start_time + pd.to_timedelta(seconds, unit='s'),
+        'Last': prices,
+    })
+
+
+def format_times(times):
+    """MM/dd/yyyy HH:mm:ss strings - each distinct day is formatted once"""
+    ns = pd.DatetimeIndex(times).as_unit('ns').asi8
+    days, inverse = np.unique(ns // DAY_NS, return_inverse=True)
+    day_strings = pd.DatetimeIndex(days * DAY_NS).strftime('%m/%d/%Y').tolist()
+    clock = clock_strings()
+    return [f'{day_strings[day]} {clock[second]}'
+            for day, second in zip(inverse.tolist(), ((ns % DAY_NS) // 10**9).tolist())]
+
+
+def clock_strings():
+    """HH:mm:ss for every second of the day"""
+    return [f'{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}' for second in range(86400)]
+
+
+def write_csv(df, path, header, chunk_rows=CHUNK_ROWS):
+    """Write rows in the NinjaScript CSV format (prices to 2 decimals), a chunk at a time"""
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(header) + '\n')
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            columns = [format_times(chunk[header[0]])]
+            columns += [[f'{value:.2f}' for value in chunk[name].tolist()] for name in header[1:]]
+            f.write(''.join(','.join(row) + '\n' for row in zip(*columns)))
+
+
+def write_historical_csv(bars, path):
+    """HistoricalData.csv: DateTime,Open,High,Low,Close"""
+    write_csv(bars[HISTORICAL_HEADER], path, HISTORICAL_HEADER)
+
+
+def write_live_feed_csv(ticks, path):
+    """LiveFeed.csv: DateTime,Last"""
+    write_csv(ticks[LIVE_FEED_HEADER], path, LIVE_FEED_HEADER)
+
+
+def generate(directory, bar_count, tick_count, seed=42, start_price=5000.0):
+    """Write HistoricalData.csv and a LiveFeed.csv that continues from the last bar"""
+    os.makedirs(directory, exist_ok=True)
+    bars = synthetic_bars(bar_count, seed=seed, start_price=start_price)
+    write_historical_csv(bars, os.path.join(directory, 'HistoricalData.csv'))
+
+    last_close = bars['Close'].iat[-1] if bar_count else start_price
+    last_time = bars['DateTime'].iat[-1] if bar_count else FIRST_SESSION
+    ticks = synthetic_ticks(tick_count, seed=seed + 1, start_price=last_close, start_time=last_time)
+    write_live_feed_csv(ticks, os.path.join(directory, 'LiveFeed.csv'))
+    return bars, ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help='folder to write HistoricalData.csv and LiveFeed.csv to')
+    parser.add_argument('--bars', type=int, default=10**5)
+    parser.add_argument('--ticks', type=int, default=10**5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start-price', type=float, default=5000.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bars, ticks = generate(args.directory, args.bars, args.ticks, seed=args.seed, start_price=args.start_price)
+    print(f"Wrote {len(bars)} bars ({bars['DateTime'].iat[0]} to {bars['DateTime'].iat[-1]}) "
+          f"and {len(ticks)} ticks to {args.directory} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Replay recorded LiveFeed/HistoricalData CSVs into the bot's socket feed - stands in for NinjaTrader
+
+Usage:
+    python fvg_bot.py --socket 127.0.0.1:9200
+    python feed_replay.py 127.0.0.1:9200 --bars data/HistoricalData.csv --ticks data/LiveFeed.csv \\
+        --after "10/30/2025 14:00:00" --speed 60
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bar_cache import BAR_DATETIME_FORMAT  # noqa: E402
+from socket_feed import parse_address  # noqa: E402
+
+# Lines per send when replaying as fast as possible
+BATCH_LINES = 512
+
+
+def read_events(ticks_path=None, bars_path=None, after=None):
+    """Socket feed lines from the CSVs as (time, order, line) sorted by time - bars before ticks at the same second"""
+    events = []
+    for path, kind, order, fields in ((bars_path, b'B', 0, 5), (ticks_path, b'T', 1, 2)):
+        if not path:
+            continue
+        with open(path, 'rb') as f:
+            next(f, None)  # header
+            for raw in f:
+                parts = raw.strip().split(b',')
+                if len(parts) < fields:
+                    continue
+                try:
+                    when = datetime.strptime(parts[0].decode('ascii'), BAR_DATETIME_FORMAT)
+                except ValueError:
+                    continue
+                if after is not None and when <= after:
+                    continue
+                events.append((when, order, b','.join([kind] + parts[:fields]) + b'\n'))
+    events.sort(key=lambda event: (event[0], event[1]))
+    return events
+
+
+def connect(address, timeout=30.0):
+    """Connect to the bot's socket feed, retrying until it is listening"""
+    kind, target = parse_address(address)
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_UNIX if kind == 'unix' else socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.connect(target)
+            if kind == 'tcp':
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+
+
+def replay(sock, events, speed=0.0, max_gap=5.0):
+    """Send events - speed 0 sends as fast as the bot accepts them, otherwise speed x real time
+
+    Gaps between events are capped at max_gap seconds of wall time (nights, weekends).
+    """
+    if not speed:
+        for start in range(0, len(events), BATCH_LINES):
+            sock.sendall(b''.join(line for _, _, line in events[start:start + BATCH_LINES]))
+        return len(events)
+
+    previous = None
+    for when, _, line in events:
+        if previous is not None:
+            time.sleep(min((when - previous).total_seconds() / speed, max_gap))
+        previous = when
+        sock.sendall(line)
+    return len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('address', help='bot socket feed address (host:port or unix:///path)')
+    parser.add_argument('--ticks', help='LiveFeed.csv to replay')
+    parser.add_argument('--bars', help='HistoricalData.csv to replay')
+    parser.add_argument('--after', help='only events after this time (MM/dd/yyyy HH:mm:ss) - bars the bot already has')
+    parser.add_argument('--speed', type=float, default=0.0, help='x real time (0 = as fast as possible)')
+    parser.add_argument('--max-gap', type=float, default=5.0, help='longest pause between events in seconds')
+    args = parser.parse_args()
+    if not args.ticks and not args.bars:
+        parser.error('give --ticks and/or --bars')
+
+    after = datetime.strptime(args.after, BAR_DATETIME_FORMAT) if args.after else None
+    events = read_events(args.ticks, args.bars, after)
+    print(f"Replaying {len(events)} events to {args.address}")
+
+    sock = connect(args.address)
+    start = time.perf_counter()
+    try:
+        sent = replay(sock, events, args.speed, args.max_gap)
+    finally:
+        sock.close()
+    print(f"Sent {sent} events in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Linux inotify backend - watches the parent directories so re-created files are seen"""
+
+    def __init__(self, paths):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        # watch descriptor -> {file name -> watched path}
+        self.watches = {}
+        for path in paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            wd = libc.inotify_add_watch(self.fd, directory.encode(), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+            self.watches.setdefault(wd, {})[name.encode()] = path
+
+    def _read_events(self):
+        """Drain pending events - returns the watched paths they touched"""
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return changed
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Lost events - report everything as changed
+                    for names in self.watches.values():
+                        changed.update(names.values())
+                    continue
+                path = self.watches.get(wd, {}).get(name)
+                if path is not None:
+                    changed.add(path)
+
+    def wait(self, timeout):
+        """Block until a watched file changes or the timeout expires"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        return self._read_events()
+
+    def poll_changes(self):
+        """Return changes already queued, without blocking"""
+        return self._read_events()
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable backend - stats the files, polling faster while they are busy"""
+
+    def __init__(self, paths, min_interval=0.005, max_interval=0.05):
+        self.paths = list(paths)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.last_stats = {path: self._stat(path) for path in self.paths}
+
+    def _stat(self, path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+    def poll_changes(self):
+        """Stat every file once - returns the paths that changed"""
+        changed = set()
+        for path in self.paths:
+            stat = self._stat(path)
+            if stat != self.last_stats[path]:
+                self.last_stats[path] = stat
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout):
+        """Poll until a watched file changes or the timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = self.poll_changes()
+            if changed:
+                # Busy file - keep polling at the fastest rate
+                self.interval = self.min_interval
+                return changed
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(self.interval, remaining))
+            # Quiet file - back off towards the slowest rate
+            self.interval = min(self.interval * 2, self.max_interval)
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """Wakes the bot when LiveFeed.csv or HistoricalData.csv is written
+
+    Uses inotify on Linux and adaptive polling elsewhere. After the first
+    change, further events are collected for `debounce` seconds so a burst
+    of tick appends is handled as one wake-up.
+    """
+
+    def __init__(self, paths, backend='auto', debounce=0.002):
+        self.debounce = debounce
+        self.backend = None
+
+        if backend in ('auto', 'inotify') and sys.platform.startswith('linux'):
+            try:
+                self.backend = InotifyWatcher(paths)
+                self.backend_name = 'inotify'
+            except (OSError, AttributeError) as e:
+                if backend == 'inotify':
+                    raise
+                logger.info(f"inotify unavailable ({e}), falling back to polling")
+
+        if self.backend is None:
+            self.backend = PollingWatcher(paths)
+            self.backend_name = 'polling'
+
+    def wait(self, timeout=1.0):
+        """Block until a watched file changes (or timeout) - returns the changed paths"""
+        changed = self.backend.wait(timeout)
+        if changed and self.debounce > 0:
+            # Let the rest of the burst land before waking the caller
+            time.sleep(self.debounce)
+            changed |= self.backend.poll_changes()
+        return changed
+
+    def close(self):
+        self.backend.close()
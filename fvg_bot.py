@@ -4,17 +4,41 @@ import time
 import os
 import sys
 import csv
+import heapq
 from datetime import datetime
 from pathlib import Path
 import logging
 import subprocess
 
+from async_runtime import AsyncRuntime
+from bar_aggregator import BarAggregator
+from bar_cache import history_fingerprint
+from bar_store import BarStore
+from bar_window import BarWindow
+from fvg_detection import detect_fvgs, first_fill_indices, resolve_overlaps, select_fvgs
+from file_watcher import FileWatcher
+from fvg_zone import FVGZone, ZoneView, zones_from_detected, zones_from_table, zones_to_table
+from live_feed import LiveFeedReader
+from metrics import Metrics, MetricsExporter
+from signal_ledger import SignalLedger
+from signal_writer import SignalWriter
+from state_publisher import StatePublisher
+from socket_feed import SocketFeed
+from status_view import status_lines
+from terminal_renderer import TerminalRenderer
+from tick_archive import TickArchive
+from timeframes import HIGHER_TIMEFRAMES, TimeframeZones, bar_times_ns
+from zone_index import ZoneIndex, scan_tick_batch
+from zone_snapshot import load_snapshot, save_snapshot, snapshot_matches
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class FVGATITradingBot:
-    def __init__(self, instrument='MES', historical_path='data/HistoricalData.csv', live_feed_path='data/LiveFeed.csv', signals_path='data/trade_signals.csv', trades_log_path='data/trades_taken.csv'):
+    def __init__(self, instrument='MES', historical_path='data/HistoricalData.csv', live_feed_path='data/LiveFeed.csv', signals_path='data/trade_signals.csv', trades_log_path='data/trades_taken.csv', batch_ticks=True, watch_backend='auto', snapshot_path='data/zone_snapshot.npz', journal_path='data/signal_journal.csv', fsync_policy='always', headless=False, render_fps=4.0, metrics_port=None, metrics_json_path=None, instrument_from_data=True, timeframes=HIGHER_TIMEFRAMES, tick_archive_path='data/tick_archive', rotate_bytes=16 * 1024 * 1024, live_bars=True, window_bars=256, ledger_path='data/signal_ledger.bin', signal_rules=None, state_path='data/bot_state.bin', session_close=None):
         self.instrument = instrument
+        # Adopt the Instrument column of HistoricalData.csv (off when the instrument is configured)
+        self.instrument_from_data = instrument_from_data
         self.historical_path = historical_path
         self.live_feed_path = live_feed_path
         self.signals_path = signals_path
@@ -22,20 +46,157 @@ class FVGATITradingBot:
 
         # FVG tracking
         self.active_fvgs = []
+        self.zone_index = ZoneIndex()  # Price-sorted view of unfilled zones
+        self.filled_since_cleanup = 0
         self.last_processed_bar_time = None
         self.last_historical_mod_time = None
 
+        # 4-hour / daily zone sets built from the hourly bars (tracked and displayed, never traded), on a
+        # grid ending at session_close ('HH:MM' in the bars' time zone; None = the break found in the data)
+        self.timeframes = [TimeframeZones(name, **{'anchor': session_close, **settings})
+                           for name, settings in (timeframes or {}).items()]
+
+        # Every consumed tick goes to compressed daily segments (None disables); LiveFeed.csv
+        # is rotated into the archive once rotate_bytes have been read
+        self.tick_archive = TickArchive(tick_archive_path) if tick_archive_path else None
+
+        # Live feed tail reader (keeps its byte offset between polls)
+        # In batch mode every tick since the last poll is processed, not just the last one
+        # (live bars need every tick in either mode)
+        self.batch_ticks = batch_ticks
+        self.live_feed = LiveFeedReader(live_feed_path, buffer_ticks=batch_ticks or live_bars,
+                                        archive=self.tick_archive, rotate_bytes=rotate_bytes)
+
+        # Historical bars read once at startup (only appended rows are parsed after that),
+        # served from a memory-mapped binary cache next to the CSV
+        self.bar_store = BarStore(historical_path, use_cache=True)
+
+        # The last window_bars bars in fixed ring buffers - all the zone logic needs once
+        # startup has scanned the history, so memory stays flat however long the bot runs
+        self.bar_window = BarWindow(window_bars)
+
+        # Hourly bars built from the tick stream and processed the tick they close;
+        # HistoricalData.csv then only reconciles them (None waits for the file)
+        self.bar_aggregator = BarAggregator() if live_bars else None
+
+        # Wake on file writes ('auto', 'inotify' or 'poll'); None keeps the fixed 1-second sleep
+        self.watch_backend = watch_backend
+        self.watcher = None
+
+        # Zone state persisted for warm restarts (None disables); saved when zones change
+        self.snapshot_path = snapshot_path
+        self.snapshot_dirty = False
+
+        # Status display drawn by a separate thread at a capped frame rate (headless disables it)
+        self.headless = headless
+        self.renderer = TerminalRenderer(self.status_lines, fps=render_fps, headless=headless)
+        self.display_interval = 1.0 / render_fps
+        self.last_display_time = 0.0
+
+        # Zone table, price and counters published to a memory-mapped file at the display rate,
+        # for viewers and monitors in other processes (state_viewer.py) - None disables
+        self.state_publisher = None
+        if state_path:
+            try:
+                self.state_publisher = StatePublisher(state_path)
+            except Exception as e:
+                logger.error(f"Error opening shared state {state_path}: {e}")
+
         # Trading state
         self.strategy_enabled = True
 
+        self.data_instrument_warned = None
+        self.signals_sent = 0
+
+        # Set by the asyncio runtime - signals are queued here and written by its signal task
+        self.signal_outbox = None
+
         # Initialize files
         self.initialize_signals_file()
         self.initialize_trades_log()
-        
+
+        # Journal and trades log stay open (trade_signals.csv is opened per signal so fvgbot.cs can
+        # read and clear it on Windows); every signal is journaled with a sequence number
+        self.signal_writer = SignalWriter(signals_path, trades_log_path, journal_path, fsync_policy=fsync_policy)
+
+        # Every signal sent, indexed by (zone, direction, entry price, bar) - duplicate and
+        # rate-limit checks survive restarts (signal_rules overrides the suppression rules)
+        self.signal_ledger = SignalLedger(ledger_path, signal_rules)
+        if self.signal_ledger.file is not None:
+            self.signal_writer.add_file(self.signal_ledger.file)
+
+        # Hot-path latency metrics - off unless a port or JSON path is given (nothing is wrapped then)
+        self.metrics = None
+        self.metrics_exporter = None
+        self.last_tick_read_ns = None
+        if metrics_port is not None or metrics_json_path:
+            self.enable_metrics(metrics_port, metrics_json_path)
+
+    def enable_metrics(self, port=None, json_path=None):
+        """Time every loop stage and count ticks, zones and signals by wrapping the stage methods"""
+        metrics = Metrics()
+        stages = [
+            (self.live_feed, 'poll', 'feed_read'),
+            (self.live_feed, '_parse_lines', 'feed_parse'),
+            (self.bar_store, 'refresh', 'bars_read'),
+            (self, 'process_historical_bars', 'new_bar'),
+            (self, 'close_live_bar', 'live_bar'),
+            (self, 'update_timeframes', 'timeframe_bar'),
+            (self, 'process_tick_batch', 'tick_batch'),  # fills + retests in one pass (batch mode)
+            (self, 'check_live_fvg_fills', 'fill_check'),
+            (self, 'check_fvg_retest_signals', 'retest_check'),
+            (self, 'clean_old_fvgs', 'cleanup'),
+            (self, 'save_zone_snapshot', 'snapshot_save'),
+            (self.renderer, 'render', 'render'),
+            (self.signal_writer, 'write', 'signal_write'),
+        ]
+        if self.tick_archive is not None:
+            stages.append((self.tick_archive, 'flush', 'archive_flush'))
+        for owner, name, stage in stages:
+            setattr(owner, name, metrics.timed(stage, getattr(owner, name)))
+
+        # Count ticks as they are read and remember when, for read-to-signal latency
+        poll = self.live_feed.poll
+        def counted_poll():
+            ticks = poll()
+            if ticks:
+                self.last_tick_read_ns = time.perf_counter_ns()
+                metrics.count('ticks', len(ticks))
+            return ticks
+        self.live_feed.poll = counted_poll
+
+        self.track_zone = metrics.counted('zones_tracked', self.track_zone)
+        # Fills by live bars and ticks only (fill_live / process_latest_bar) - not history replays
+        metrics.count('zones_filled', 0)
+        metrics.gauge('active_zones', lambda: len(self.active_fvgs))
+        metrics.gauge('bars', lambda: self.bar_window.total)
+
+        self.metrics = metrics
+        self.metrics_exporter = MetricsExporter(metrics, port=port, json_path=json_path)
+
+    def record_signal_latency(self, signal_datetime):
+        """Tick-to-signal latency (LiveFeed timestamp to written signal) and read-to-signal latency"""
+        self.metrics.count('signals')
+        # LiveFeed timestamps have one-second resolution and come from the NinjaTrader clock
+        self.metrics.observe('tick_to_signal', (datetime.now() - signal_datetime).total_seconds() * 1e9)
+        if self.last_tick_read_ns is not None:
+            self.metrics.observe('read_to_signal', time.perf_counter_ns() - self.last_tick_read_ns)
+
     def round_to_quarter(self, price):
         """Round price to nearest 0.25 to match NinjaTrader pricing"""
         return round(price * 4) / 4
 
+    def track_zone(self, fvg):
+        """Add a zone to the active list and the price index"""
+        self.active_fvgs.append(fvg)
+        self.zone_index.add(fvg)
+
+    def mark_filled(self, fvg):
+        """Mark a zone filled and drop it from the price index"""
+        fvg.filled = True
+        self.zone_index.remove(fvg)
+        self.filled_since_cleanup += 1
+        self.snapshot_dirty = True
     
     def initialize_signals_file(self):
         """Initialize the trade signals CSV file - clears old signals on startup"""
@@ -57,37 +218,74 @@ class FVGATITradingBot:
         else:
             logger.info(f"Using existing trades log file: {self.trades_log_path}")
     
-    def generate_signal(self, signal_type, direction, signal_datetime, zone_bottom, zone_top, gap_size):
+    def generate_signal(self, signal_type, direction, signal_datetime, zone_bottom, zone_top, gap_size, zone_time_ns=None, zone=None):
         """Write trade signal to CSV - NinjaTrader handles all order management"""
+        # Entry_Price = zone boundary that triggers the trade
+        entry_price = zone_top if direction == 'SHORT' else zone_bottom
+
+        # Duplicate / rate-limit check against the ledger index before anything is written
+        latest_bar_time = self.latest_processed_bar_time()
+        bar_ns = None if latest_bar_time is None else pd.Timestamp(latest_bar_time).value
+        signal_ns = pd.Timestamp(signal_datetime).value
+        key = self.signal_ledger.key(zone_time_ns, direction, entry_price, bar_ns)
+        reason = self.signal_ledger.check(key, signal_ns)
+        if reason is not None:
+            self.signal_ledger.suppressed += 1
+            if self.metrics is not None:
+                self.metrics.count('signals_suppressed')
+            logger.info(f"Signal suppressed: {direction} @ {entry_price:.2f} - {reason}")
+            return False
+
+        record = self.signal_ledger.record(key, signal_ns, zone_bottom, zone_top)
+        signal = (signal_datetime, direction, entry_price, zone_bottom, zone_top, record)
+
+        if self.signal_outbox is not None:
+            # Async runtime - written (and settled in the ledger) by the signal task, off the zone state machine;
+            # the zone goes with it so a failed write can lift its cooldown
+            self.signal_outbox.append((signal, zone))
+            return True
+
+        written = self.write_signal(*signal)
+        self.signal_ledger.settle(record, written)
+        return written
+
+    def release_zone(self, fvg, ledger_record):
+        """Lift the cooldown of a zone whose queued signal failed to write - same state as a failed sync write"""
+        # Skip zones filled since, or already cooled down and signalled again on a later bar
+        bar_ns = int(ledger_record['bar_time'].view(np.int64)[0])
+        trade_bar = fvg.trade_bar_timestamp
+        if fvg.filled or not fvg.trade_taken or (trade_bar is not None and pd.Timestamp(trade_bar).value != bar_ns):
+            return
+        fvg.trade_taken = False
+        fvg.trade_bar_timestamp = None
+        # Price entered the zone - the next entry after it leaves signals again
+        fvg.price_was_outside = False
+        self.zone_index.inside[id(fvg)] = fvg
+        self.snapshot_dirty = True
+        logger.warning(f"Signal for zone {fvg.bottom:.2f}-{fvg.top:.2f} was not written - zone cooldown lifted")
+
+    def write_signal(self, signal_datetime, direction, entry_price, zone_bottom, zone_top, ledger_record=None):
+        """Deliver one signal to NinjaTrader and the trades log - returns False if writing it failed"""
         try:
-            # Entry_Price = zone boundary that triggers the trade
-            entry_price = zone_top if direction == 'SHORT' else zone_bottom
+            # Ledger first - a signal cut short by a crash is not sent again after the restart
+            if ledger_record is not None:
+                self.signal_ledger.write(ledger_record)
 
-            # Write to trade_signals.csv (NinjaTrader reads this)
+            # Write to trade_signals.csv (NinjaTrader reads this) and trades_taken.csv
+            # (persistent historical log for Python bot) as single appends
             # Simplified format: DateTime, Direction, Entry_Price
-            with open(self.signals_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    signal_datetime.strftime('%m/%d/%Y %H:%M:%S'),
-                    direction,
-                    f"{entry_price:.2f}"
-                ])
-
-            # Write to trades_taken.csv (persistent historical log for Python bot)
-            # Same simplified format: DateTime, Direction, Entry_Price
-            with open(self.trades_log_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    signal_datetime.strftime('%m/%d/%Y %H:%M:%S'),
-                    direction,
-                    f"{entry_price:.2f}"
-                ])
+            seq = self.signal_writer.write(signal_datetime, direction, entry_price, zone_bottom, zone_top)
+            self.signals_sent += 1
+            if self.metrics is not None:
+                self.record_signal_latency(signal_datetime)
 
-            logger.info(f"Signal sent: {direction} @ {signal_datetime.strftime('%H:%M:%S')}")
+            logger.info(f"Signal #{seq} sent: {direction} @ {signal_datetime.strftime('%H:%M:%S')}")
             logger.info(f"  Entry Price: {entry_price:.2f} (Zone: {zone_bottom:.2f}-{zone_top:.2f})")
             logger.info(f"  NinjaTrader will handle entry, stops (10pts), and targets (5pts)")
+            return True
         except Exception as e:
             logger.error(f"Error writing signal: {e}")
+            return False
         
     
     def check_historical_updated(self):
@@ -112,93 +310,68 @@ class FVGATITradingBot:
             return False
     
     def read_historical_data(self):
-        """Read historical hourly data for FVG detection"""
+        """Read historical hourly data for FVG detection (the full history, until startup releases it)"""
         try:
             if not os.path.exists(self.historical_path):
                 return None
 
-            df = pd.read_csv(self.historical_path)
-            if df.empty:
+            self.bar_store.refresh()
+            df = self.bar_store.df
+            if df is None or df.empty:
                 return None
 
-            # Update instrument from data if available
-            if 'Instrument' in df.columns and not df['Instrument'].empty:
-                data_instrument = df['Instrument'].iloc[0]
-                if data_instrument != self.instrument:
-                    self.instrument = data_instrument
-                    logger.info(f"Instrument updated to: {self.instrument}")
-
-            df['DateTime'] = pd.to_datetime(df['DateTime'])
-            df = df.sort_values('DateTime').reset_index(drop=True)
+            self.check_instrument(df)
             return df
         except Exception as e:
             logger.error(f"Error reading historical data: {e}")
             return None
 
-    def read_current_price(self):
-        """Read current price from live feed (last line)"""
+    def read_new_bars(self):
+        """Rows added to HistoricalData.csv since the last read (the whole file again after a rewrite)"""
         try:
-            if not os.path.exists(self.live_feed_path):
+            if not os.path.exists(self.historical_path):
                 return None
 
-            df = pd.read_csv(self.live_feed_path)
-            if df.empty:
+            self.bar_store.refresh()
+            bars = self.bar_store.take_new_bars()
+            if bars is None or bars.empty:
                 return None
 
-            # Get the last line for current price
-            last_row = df.iloc[-1]
-            return float(last_row['Last'])
+            self.check_instrument(bars)
+            return bars
+        except Exception as e:
+            logger.error(f"Error reading historical data: {e}")
+            return None
+
+    def check_instrument(self, df):
+        """Update instrument from data if available"""
+        if 'Instrument' in df.columns and not df['Instrument'].empty:
+            data_instrument = df['Instrument'].iloc[0]
+            if data_instrument != self.instrument:
+                if self.instrument_from_data:
+                    self.instrument = data_instrument
+                    logger.info(f"Instrument updated to: {self.instrument}")
+                elif data_instrument != self.data_instrument_warned:
+                    self.data_instrument_warned = data_instrument
+                    logger.warning(f"{self.historical_path} holds {data_instrument} bars, configured for {self.instrument}")
+
+    def read_current_price(self):
+        """Read current price from live feed (only newly appended lines are parsed)"""
+        try:
+            if not os.path.exists(self.live_feed_path):
+                return None
+
+            return self.live_feed.latest_price()
         except Exception as e:
             logger.error(f"Error reading current price: {e}")
             return None
         
 
     def find_fvgs_in_data(self, df, start_index=2):
-        """Find FVGs in price data"""
-        fvgs = []
-        
-        for i in range(start_index, len(df)):
-            candle1 = df.iloc[i - 2]
-            candle2 = df.iloc[i - 1]  
-            candle3 = df.iloc[i]
-            
-            # Check for bullish FVG (gap up)
-            if candle3['Low'] > candle1['High']:
-                gap_size = candle3['Low'] - candle1['High']
-                if gap_size >= 5.0:  # Minimum gap size
-                    fvg = {
-                        'type': 'bullish',
-                        'top': candle3['Low'],
-                        'bottom': candle1['High'],
-                        'gap_size': gap_size,
-                        'datetime': candle3['DateTime'],
-                        'index': i,
-                        'filled': False,
-                        'trade_taken': False,
-                        'trade_bar_timestamp': None,  # Track which bar the trade occurred in
-                        'price_was_outside': True  # Track if price was outside zone
-                    }
-                    fvgs.append(fvg)
-
-            # Check for bearish FVG (gap down)
-            elif candle3['High'] < candle1['Low']:
-                gap_size = candle1['Low'] - candle3['High']
-                if gap_size >= 5.0:
-                    fvg = {
-                        'type': 'bearish',
-                        'top': candle1['Low'],
-                        'bottom': candle3['High'],
-                        'gap_size': gap_size,
-                        'datetime': candle3['DateTime'],
-                        'index': i,
-                        'filled': False,
-                        'trade_taken': False,
-                        'trade_bar_timestamp': None,  # Track which bar the trade occurred in
-                        'price_was_outside': True  # Track if price was outside zone
-                    }
-                    fvgs.append(fvg)
-        
-        return fvgs
+        """Find FVGs in price data (vectorized over the High/Low columns)"""
+        detected = detect_fvgs(df['High'].to_numpy(), df['Low'].to_numpy(),
+                               min_gap=5.0, start_index=start_index)
+        return zones_from_detected(detected, df['DateTime'])
     
     def is_fvg_filled(self, fvg, df, start_index):
         """Check if FVG has been filled by subsequent price action"""
@@ -206,27 +379,58 @@ class FVGATITradingBot:
             check_candle = df.iloc[j]
 
             # Bullish FVG fills when price touches/closes at or below the bottom
-            if fvg['type'] == 'bullish' and check_candle['Low'] <= fvg['bottom']:
+            if fvg.type == 'bullish' and check_candle['Low'] <= fvg.bottom:
                 return True
             # Bearish FVG fills when price touches/closes at or above the top
-            elif fvg['type'] == 'bearish' and check_candle['High'] >= fvg['top']:
+            elif fvg.type == 'bearish' and check_candle['High'] >= fvg.top:
                 return True
 
         return False
     
     def process_historical_bars(self):
-        """Process historical data for new FVG detection"""
-        df = self.read_historical_data()
+        """Process bars added to HistoricalData.csv for new FVG detection"""
+        bars = self.read_new_bars()
+        if bars is None:
+            return
 
-        if df is None or df.empty or len(df) < 3:
+        self.process_bars(bars, self.read_current_price())
+
+    def process_bars(self, bars, current_price):
+        """Add confirmed bars (a DataFrame of new rows) to the bar window and process the newest one"""
+        corrections = self.bar_window.merge(bar_times_ns(bars['DateTime']), bars['Open'].to_numpy(),
+                                            bars['High'].to_numpy(), bars['Low'].to_numpy(), bars['Close'].to_numpy())
+
+        # Redo detection around live bars the file disagreed with
+        if corrections:
+            self.reconcile_live_bars(corrections, current_price)
+
+        self.process_latest_bar(current_price)
+
+    def process_bar_rows(self, rows, current_price):
+        """Add confirmed (time_ns, open, high, low, close) bars (socket feed) and process each in turn"""
+        window = self.bar_window
+        for time_ns, open_, high, low, close in rows:
+            if window.live_count:
+                # Covers bars built from ticks - reconcile them like a file read
+                corrections = window.merge([time_ns], [open_], [high], [low], [close])
+                if corrections:
+                    self.reconcile_live_bars(corrections, current_price)
+            elif not window.append(time_ns, open_, high, low, close):
+                continue  # not newer than the bars held
+            self.process_latest_bar(current_price)
+
+    def process_latest_bar(self, current_price):
+        """Run cooldowns, FVG detection and bar fills if the bar window ends with a bar not processed yet"""
+        window = self.bar_window
+        if not len(window):
             return
 
         # Get the latest bar time
-        latest_bar_time = df.iloc[-1]['DateTime']
-        current_index = len(df) - 1
+        latest_bar_time = pd.Timestamp(window.latest_time_ns)
+        current_index = window.total - 1
 
-        # Check if this is a new bar
-        is_new_bar = self.last_processed_bar_time != latest_bar_time
+        # Check if this is a new bar (live bars may already be ahead of the file)
+        is_new_bar = self.last_processed_bar_time is None or latest_bar_time > self.last_processed_bar_time
 
         if is_new_bar:
             logger.info(f"New hourly bar detected at {latest_bar_time}")
@@ -235,36 +439,96 @@ class FVGATITradingBot:
             self.check_zone_cooldowns(latest_bar_time)
 
             # Look for new FVGs
-            self.find_new_fvgs(df, current_index)
+            self.find_new_fvgs(window, current_index, current_price)
 
             # Check if any FVGs got filled
-            self.check_fvg_fill_status(df, current_index)
+            filled = self.check_fvg_fill_status(window, current_index)
+            if filled and self.metrics is not None:
+                self.metrics.count('zones_filled', filled)
+
+            # Fold the bar into the 4-hour / daily bars
+            self.update_timeframes()
 
             self.last_processed_bar_time = latest_bar_time
+            self.snapshot_dirty = True
+
+    def close_live_bar(self, bar, current_price):
+        """Process an hourly bar built from ticks as soon as it closes"""
+        if not self.bar_window.append(*bar, live=True):
+            return  # HistoricalData.csv already had it
+        _, open_, high, low, close = bar
+        logger.info(f"Hourly bar closed from live ticks: O {open_:.2f} H {high:.2f} L {low:.2f} C {close:.2f}")
+        self.process_latest_bar(current_price)
+
+    def close_due_live_bar(self, current_price):
+        """Close the forming bar on the clock when no tick of the next hour has come"""
+        if self.bar_aggregator is None:
+            return
+        bar = self.bar_aggregator.close_if_due(pd.Timestamp.now().value)
+        if bar is not None:
+            self.close_live_bar(bar, current_price)
+
+    def reconcile_live_bars(self, corrections, current_price):
+        """Rebuild the zones live bars formed where the file's bars differ from them"""
+        window = self.bar_window
+        processed_ns = pd.Timestamp(self.latest_processed_bar_time()).value
+        for time_ns, live_bar, file_bar in corrections:
+            bar_time = pd.Timestamp(time_ns)
+            if file_bar is None:
+                logger.warning(f"Live bar {bar_time} is not in {self.historical_path} - redoing its zones")
+            elif live_bar is None:
+                logger.warning(f"Bar {bar_time} was not built from live ticks - redoing the zones after it")
+            else:
+                logger.warning(f"Live bar {bar_time} differs from {self.historical_path} "
+                               f"(OHLC {'/'.join(f'{p:.2f}' for p in live_bar)} vs "
+                               f"{'/'.join(f'{p:.2f}' for p in file_bar)}) - redoing its zones")
+
+            # The bar is candle 3 of its own gap check and candle 1 of the one two bars later
+            # (only bars already processed - newer ones are checked when they arrive)
+            first = window.find(time_ns)
+            last = min(first + 2, window.total - 1)
+            while last >= first and window.time_ns(last) > processed_ns:
+                last -= 1
+
+            # Drop the zones those checks formed, then run them and the bar fills again on the file's bars
+            end_ns = time_ns if last < first else max(time_ns, window.time_ns(last))
+            for fvg in self.active_fvgs:
+                if not fvg.filled and fvg.time_ns is not None and time_ns <= fvg.time_ns <= end_ns:
+                    self.mark_filled(fvg)
+            for current_index in range(first, last + 1):
+                self.find_new_fvgs(window, current_index, current_price)
+                self.check_fvg_fill_status(window, current_index)
+
+    def update_timeframes(self):
+        """Fold bar-window bars the higher timeframes have not seen yet (normally just the newest)"""
+        if not self.timeframes:
+            return
+        window = self.bar_window
+        last_seen = self.timeframes[0].resampler.last_time_ns
+        first = window.total - 1
+        # Several bars can land between reads of HistoricalData.csv
+        while last_seen is not None and first > window.first and window.time_ns(first - 1) > last_seen:
+            first -= 1
+
+        for i in range(first, window.total):
+            bar = window.bar(i)
+            for timeframe in self.timeframes:
+                timeframe.add_bar(*bar)
     
     def check_zone_cooldowns(self, latest_bar_time):
         """Re-enable zones that were waiting for next bar"""
         for fvg in self.active_fvgs:
-            if fvg['filled']:
+            if fvg.filled:
                 continue
 
             # If zone had a trade and is in cooldown
-            if fvg['trade_taken'] and fvg['trade_bar_timestamp'] is not None:
+            if fvg.trade_taken and fvg.trade_bar_timestamp is not None:
                 # Check if the new bar is more recent than the bar when trade was taken
-                if latest_bar_time > fvg['trade_bar_timestamp']:
+                if latest_bar_time > fvg.trade_bar_timestamp:
                     # Re-enable trading for this zone
-                    fvg['trade_taken'] = False
-                    fvg['price_was_outside'] = True  # Reset entry detection
-                    logger.info(f"Zone cooldown complete - re-enabling trades for {fvg['type']} zone {fvg['bottom']:.2f}-{fvg['top']:.2f}")
-
-    def clear_screen(self):
-        """Clear screen - optimized for Windows"""
-        if os.name == 'nt':
-            # Windows: use standard os.system for proper clearing
-            os.system('cls')
-        else:
-            # Unix: use ANSI codes
-            os.system('clear')
+                    fvg.trade_taken = False
+                    fvg.price_was_outside = True  # Reset entry detection
+                    logger.info(f"Zone cooldown complete - re-enabling trades for {fvg.type} zone {fvg.bottom:.2f}-{fvg.top:.2f}")
 
     def zones_overlap(self, zone1_bottom, zone1_top, zone2_bottom, zone2_top):
         """Check if two zones overlap"""
@@ -277,15 +541,15 @@ class FVGATITradingBot:
         zones_to_remove = []
 
         for i, existing_fvg in enumerate(self.active_fvgs):
-            if existing_fvg['type'] != new_fvg['type']:
+            if existing_fvg.type != new_fvg.type:
                 continue
-            if existing_fvg['filled']:
+            if existing_fvg.filled:
                 continue
 
-            if self.zones_overlap(existing_fvg['bottom'], existing_fvg['top'],
-                                 new_fvg['bottom'], new_fvg['top']):
-                existing_size = existing_fvg['gap_size']
-                new_size = new_fvg['gap_size']
+            if self.zones_overlap(existing_fvg.bottom, existing_fvg.top,
+                                 new_fvg.bottom, new_fvg.top):
+                existing_size = existing_fvg.gap_size
+                new_size = new_fvg.gap_size
 
                 if new_size < existing_size:
                     zones_to_remove.append(i)
@@ -293,83 +557,61 @@ class FVGATITradingBot:
                     return True
 
         for i in reversed(zones_to_remove):
-            self.active_fvgs.pop(i)
+            self.zone_index.remove(self.active_fvgs.pop(i))
 
         return False
 
-    def find_new_fvgs(self, df, current_index):
-        """Find new FVGs in the latest price data"""
-        if current_index < 2:
+    def find_new_fvgs(self, bars, current_index, current_price):
+        """Find new FVGs in the latest price data (bar numbers of the bar window)"""
+        if current_index < 2 or current_index - 2 < bars.first:
             return
 
-        candle1 = df.iloc[current_index - 2]
-        candle2 = df.iloc[current_index - 1]
-        candle3 = df.iloc[current_index]
+        _, _, high1, low1, _ = bars.bar(current_index - 2)
+        time3, _, high3, low3, _ = bars.bar(current_index)
 
-        # Get current price to check if we're already inside the new zone
-        current_price = self.read_current_price()
+        # current_price is used to check if we're already inside the new zone
 
         # Check for bullish FVG
-        if candle3['Low'] > candle1['High']:
-            gap_size = candle3['Low'] - candle1['High']
+        if low3 > high1:
+            gap_size = low3 - high1
             if gap_size >= 5.0:
-                fvg = {
-                    'type': 'bullish',
-                    'top': candle3['Low'],
-                    'bottom': candle1['High'],
-                    'gap_size': gap_size,
-                    'datetime': candle3['DateTime'],
-                    'index': current_index,
-                    'filled': False,
-                    'trade_taken': False,
-                    'trade_bar_timestamp': None,  # Track which bar the trade occurred in
-                    'price_was_outside': True  # Track if price was outside zone
-                }
+                fvg = FVGZone('bullish', top=low3, bottom=high1, gap_size=gap_size,
+                              zone_datetime=time3, index=current_index)
 
                 # Check if current price is already inside this new zone
                 if current_price is not None:
-                    price_in_zone = (current_price >= fvg['bottom'] and current_price <= fvg['top'])
+                    price_in_zone = fvg.contains(current_price)
                     if price_in_zone:
-                        fvg['price_was_outside'] = False
-                        logger.info(f"NEW BULLISH FVG: Gap {gap_size:.2f}pts ({candle1['High']:.2f} to {candle3['Low']:.2f}) - Price already in zone")
+                        fvg.price_was_outside = False
+                        logger.info(f"NEW BULLISH FVG: Gap {gap_size:.2f}pts ({high1:.2f} to {low3:.2f}) - Price already in zone")
                     else:
-                        logger.info(f"NEW BULLISH FVG: Gap {gap_size:.2f}pts ({candle1['High']:.2f} to {candle3['Low']:.2f})")
+                        logger.info(f"NEW BULLISH FVG: Gap {gap_size:.2f}pts ({high1:.2f} to {low3:.2f})")
                 else:
-                    logger.info(f"NEW BULLISH FVG: Gap {gap_size:.2f}pts ({candle1['High']:.2f} to {candle3['Low']:.2f})")
+                    logger.info(f"NEW BULLISH FVG: Gap {gap_size:.2f}pts ({high1:.2f} to {low3:.2f})")
 
                 if not self.is_duplicate_zone(fvg):
-                    self.active_fvgs.append(fvg)
+                    self.track_zone(fvg)
 
         # Check for bearish FVG
-        elif candle3['High'] < candle1['Low']:
-            gap_size = candle1['Low'] - candle3['High']
+        elif high3 < low1:
+            gap_size = low1 - high3
             if gap_size >= 5.0:
-                fvg = {
-                    'type': 'bearish',
-                    'top': candle1['Low'],
-                    'bottom': candle3['High'],
-                    'gap_size': gap_size,
-                    'datetime': candle3['DateTime'],
-                    'index': current_index,
-                    'filled': False,
-                    'trade_taken': False,
-                    'trade_bar_timestamp': None,  # Track which bar the trade occurred in
-                    'price_was_outside': True  # Track if price was outside zone
-                }
+                fvg = FVGZone('bearish', top=low1, bottom=high3, gap_size=gap_size,
+                              zone_datetime=time3, index=current_index)
 
                 # Check if current price is already inside this new zone
                 if current_price is not None:
-                    price_in_zone = (current_price >= fvg['bottom'] and current_price <= fvg['top'])
+                    price_in_zone = fvg.contains(current_price)
                     if price_in_zone:
-                        fvg['price_was_outside'] = False
-                        logger.info(f"NEW BEARISH FVG: Gap {gap_size:.2f}pts ({candle3['High']:.2f} to {candle1['Low']:.2f}) - Price already in zone")
+                        fvg.price_was_outside = False
+                        logger.info(f"NEW BEARISH FVG: Gap {gap_size:.2f}pts ({high3:.2f} to {low1:.2f}) - Price already in zone")
                     else:
-                        logger.info(f"NEW BEARISH FVG: Gap {gap_size:.2f}pts ({candle3['High']:.2f} to {candle1['Low']:.2f})")
+                        logger.info(f"NEW BEARISH FVG: Gap {gap_size:.2f}pts ({high3:.2f} to {low1:.2f})")
                 else:
-                    logger.info(f"NEW BEARISH FVG: Gap {gap_size:.2f}pts ({candle3['High']:.2f} to {candle1['Low']:.2f})")
+                    logger.info(f"NEW BEARISH FVG: Gap {gap_size:.2f}pts ({high3:.2f} to {low1:.2f})")
 
                 if not self.is_duplicate_zone(fvg):
-                    self.active_fvgs.append(fvg)
+                    self.track_zone(fvg)
 
         # Clean up old FVGs (without current price - will use bar age)
         self.clean_old_fvgs(current_index)
@@ -379,175 +621,417 @@ class FVGATITradingBot:
         if not self.strategy_enabled:
             return
 
-        for fvg in self.active_fvgs:
-            # Skip if filled
-            if fvg['filled']:
-                continue
+        # Only zones containing price, plus zones price was inside last tick, can change state
+        in_zone_fvgs = self.zone_index.containing(current_price)
 
+        for fvg in self.zone_index.exited(in_zone_fvgs):
             # Skip if recently traded (waiting for next bar)
-            if fvg['trade_taken']:
+            if fvg.trade_taken:
                 continue
+            # Price is outside zone - mark it
+            fvg.price_was_outside = True
 
-            # Check if price is inside the zone boundaries
-            price_in_zone = (current_price >= fvg['bottom'] and current_price <= fvg['top'])
+        for fvg in in_zone_fvgs:
+            # Skip if recently traded (waiting for next bar)
+            if fvg.trade_taken:
+                continue
 
-            # Track zone entry/exit state
-            if not price_in_zone:
-                # Price is outside zone - mark it
-                fvg['price_was_outside'] = True
-            elif price_in_zone and fvg['price_was_outside']:
+            if fvg.price_was_outside:
                 # Price JUST ENTERED the zone (was outside, now inside)
-                fvg['price_was_outside'] = False  # Mark that we've entered
-                # Log FRESH zone entry detection
-                logger.info(f"*** PRICE ENTERED ZONE ***")
-                logger.info(f"  Zone Type: {fvg['type'].upper()}")
-                logger.info(f"  Zone Range: {fvg['bottom']:.2f} - {fvg['top']:.2f}")
-                logger.info(f"  Entry Price: {current_price:.2f}")
-
-                # Trigger trade on zone entry
-                if fvg['type'] == 'bullish':
-                    # For bullish zones: SHORT when price enters zone from above
-                    self.evaluate_short_entry(fvg, current_price)
-                elif fvg['type'] == 'bearish':
-                    # For bearish zones: LONG when price enters zone from below
-                    self.evaluate_long_entry(fvg, current_price)
+                self.enter_zone(fvg, current_price)
+            else:
+                # Still inside - watch for the exit
+                self.zone_index.inside[id(fvg)] = fvg
+
+    def enter_zone(self, fvg, current_price, signal_datetime=None):
+        """Handle a fresh zone entry - log it and send the retest signal"""
+        fvg.price_was_outside = False  # Mark that we've entered
+        self.snapshot_dirty = True
+        # Log FRESH zone entry detection
+        logger.info(f"*** PRICE ENTERED ZONE ***")
+        logger.info(f"  Zone Type: {fvg.type.upper()}")
+        logger.info(f"  Zone Range: {fvg.bottom:.2f} - {fvg.top:.2f}")
+        logger.info(f"  Entry Price: {current_price:.2f}")
+
+        # Trigger trade on zone entry
+        if fvg.type == 'bullish':
+            # For bullish zones: SHORT when price enters zone from above
+            self.evaluate_short_entry(fvg, current_price, signal_datetime)
+        elif fvg.type == 'bearish':
+            # For bearish zones: LONG when price enters zone from below
+            self.evaluate_long_entry(fvg, current_price, signal_datetime)
+
+        # Signal suppressed - no cooldown, so watch for the exit to allow the next entry
+        if not fvg.trade_taken:
+            self.zone_index.inside[id(fvg)] = fvg
     
-    def evaluate_long_entry(self, fvg, current_price):
+    def evaluate_long_entry(self, fvg, current_price, signal_datetime=None):
         """Evaluate long entry on BEARISH FVG retest"""
         logger.info(f"=== LONG SIGNAL - BEARISH FVG ===")
-        logger.info(f"  Zone: {fvg['bottom']:.2f} - {fvg['top']:.2f} ({fvg['gap_size']:.2f}pts)")
+        logger.info(f"  Zone: {fvg.bottom:.2f} - {fvg.top:.2f} ({fvg.gap_size:.2f}pts)")
         logger.info(f"  Current Price: {current_price:.2f}")
 
-        # Send signal to NinjaTrader
-        self.generate_signal(
+        # Send signal to NinjaTrader (a suppressed or unwritten signal leaves the zone out of cooldown)
+        if not self.generate_signal(
             signal_type='FVG_RETEST',
             direction='LONG',
-            signal_datetime=datetime.now(),
-            zone_bottom=fvg['bottom'],
-            zone_top=fvg['top'],
-            gap_size=fvg['gap_size']
-        )
+            signal_datetime=signal_datetime or datetime.now(),
+            zone_bottom=fvg.bottom,
+            zone_top=fvg.top,
+            gap_size=fvg.gap_size,
+            zone_time_ns=fvg.time_ns,
+            zone=fvg
+        ):
+            return
 
         # Mark trade taken and record the latest closed bar timestamp
-        fvg['trade_taken'] = True
-        df = self.read_historical_data()
-        if df is not None and len(df) > 0:
-            fvg['trade_bar_timestamp'] = df.iloc[-1]['DateTime']
-            logger.info(f"  Trade cooldown active - waiting for next bar after {fvg['trade_bar_timestamp']}")
+        fvg.trade_taken = True
+        latest_bar_time = self.latest_processed_bar_time()
+        if latest_bar_time is not None:
+            fvg.trade_bar_timestamp = latest_bar_time
+            logger.info(f"  Trade cooldown active - waiting for next bar after {fvg.trade_bar_timestamp}")
     
-    def evaluate_short_entry(self, fvg, current_price):
+    def evaluate_short_entry(self, fvg, current_price, signal_datetime=None):
         """Evaluate short entry on BULLISH FVG retest"""
         logger.info(f"=== SHORT SIGNAL - BULLISH FVG ===")
-        logger.info(f"  Zone: {fvg['bottom']:.2f} - {fvg['top']:.2f} ({fvg['gap_size']:.2f}pts)")
+        logger.info(f"  Zone: {fvg.bottom:.2f} - {fvg.top:.2f} ({fvg.gap_size:.2f}pts)")
         logger.info(f"  Current Price: {current_price:.2f}")
 
-        # Send signal to NinjaTrader
-        self.generate_signal(
+        # Send signal to NinjaTrader (a suppressed or unwritten signal leaves the zone out of cooldown)
+        if not self.generate_signal(
             signal_type='FVG_RETEST',
             direction='SHORT',
-            signal_datetime=datetime.now(),
-            zone_bottom=fvg['bottom'],
-            zone_top=fvg['top'],
-            gap_size=fvg['gap_size']
-        )
+            signal_datetime=signal_datetime or datetime.now(),
+            zone_bottom=fvg.bottom,
+            zone_top=fvg.top,
+            gap_size=fvg.gap_size,
+            zone_time_ns=fvg.time_ns,
+            zone=fvg
+        ):
+            return
 
         # Mark trade taken and record the latest closed bar timestamp
-        fvg['trade_taken'] = True
-        df = self.read_historical_data()
-        if df is not None and len(df) > 0:
-            fvg['trade_bar_timestamp'] = df.iloc[-1]['DateTime']
-            logger.info(f"  Trade cooldown active - waiting for next bar after {fvg['trade_bar_timestamp']}")
+        fvg.trade_taken = True
+        latest_bar_time = self.latest_processed_bar_time()
+        if latest_bar_time is not None:
+            fvg.trade_bar_timestamp = latest_bar_time
+            logger.info(f"  Trade cooldown active - waiting for next bar after {fvg.trade_bar_timestamp}")
     
-    def check_fvg_fill_status(self, df, current_index):
-        """Check if any FVGs have been filled by completed bars"""
-        current_bar = df.iloc[current_index]
-
-        for fvg in self.active_fvgs:
-            if fvg['filled']:
-                continue
-
-            # Bullish FVG fills when price touches/closes at or below the bottom
-            if fvg['type'] == 'bullish' and current_bar['Low'] <= fvg['bottom']:
-                fvg['filled'] = True
-                logger.info(f"BULLISH FVG FILLED: Low {current_bar['Low']:.2f} touched bottom {fvg['bottom']:.2f}")
-            # Bearish FVG fills when price touches/closes at or above the top
-            elif fvg['type'] == 'bearish' and current_bar['High'] >= fvg['top']:
-                fvg['filled'] = True
-                logger.info(f"BEARISH FVG FILLED: High {current_bar['High']:.2f} touched top {fvg['top']:.2f}")
+    def latest_processed_bar_time(self):
+        """Latest bar the zone logic has seen (the store may already hold newer bars in async mode)"""
+        if self.last_processed_bar_time is not None:
+            return self.last_processed_bar_time
+        return self.bar_store.latest_time()
+
+    def check_fvg_fill_status(self, bars, current_index):
+        """Check if any FVGs have been filled by completed bars - returns how many were"""
+        _, _, high, low, _ = bars.bar(current_index)
+        filled = 0
+
+        # Bullish FVG fills when price touches/closes at or below the bottom
+        for fvg in self.zone_index.bullish_at_or_above(low):
+            self.mark_filled(fvg)
+            filled += 1
+            logger.info(f"BULLISH FVG FILLED: Low {low:.2f} touched bottom {fvg.bottom:.2f}")
+
+        # Bearish FVG fills when price touches/closes at or above the top
+        for fvg in self.zone_index.bearish_at_or_below(high):
+            self.mark_filled(fvg)
+            filled += 1
+            logger.info(f"BEARISH FVG FILLED: High {high:.2f} touched top {fvg.top:.2f}")
+        return filled
 
     def check_live_fvg_fills(self, current_price):
         """Check if any FVGs have been filled by current live price"""
-        for fvg in self.active_fvgs:
-            if fvg['filled']:
+        for timeframe in self.timeframes:
+            timeframe.check_fills(current_price, current_price)
+
+        # Bearish FVG fills when current price reaches or exceeds the TOP
+        for fvg in self.zone_index.bearish_at_or_below(current_price):
+            self.fill_live(fvg, current_price)
+
+        # Bullish FVG fills when current price reaches or goes below the BOTTOM
+        for fvg in self.zone_index.bullish_at_or_above(current_price):
+            self.fill_live(fvg, current_price)
+
+    def fill_live(self, fvg, fill_price):
+        """Mark a zone filled by a live tick"""
+        self.mark_filled(fvg)
+        if self.metrics is not None:
+            self.metrics.count('zones_filled')
+        logger.info(f"*** {fvg.type.upper()} FVG FILLED (LIVE) ***")
+        logger.info(f"  Zone: {fvg.bottom:.2f} - {fvg.top:.2f}")
+        logger.info(f"  Fill Price: {fill_price:.2f}")
+        logger.info(f"  Zone removed from active list")
+
+    def read_new_ticks(self):
+        """Read every tick appended to the live feed since the last poll"""
+        try:
+            if not os.path.exists(self.live_feed_path):
+                return []
+
+            return self.live_feed.drain()
+        except Exception as e:
+            logger.error(f"Error reading live ticks: {e}")
+            return []
+
+    def process_live_ticks(self, ticks):
+        """Fold ticks into the forming bar and run fills and entries - bars they close are processed at the closing tick"""
+        start = 0
+        if self.bar_aggregator is not None:
+            for position, bar in self.bar_aggregator.add_ticks(ticks):
+                if position > start:
+                    self.process_tick_batch(ticks[start:position])
+                    start = position
+                self.close_live_bar(bar, ticks[position][1])
+        if start < len(ticks):
+            self.process_tick_batch(ticks[start:])
+
+    def build_live_bars(self, ticks):
+        """Fold ticks into the forming bar and process every bar they close (per-tick mode)"""
+        if self.bar_aggregator is None:
+            return
+        for position, bar in self.bar_aggregator.add_ticks(ticks):
+            self.close_live_bar(bar, ticks[position][1])
+
+    def process_tick_batch(self, ticks):
+        """Run live fills and zone entries for a batch of (datetime_str, price) ticks in tick order"""
+        prices = np.fromiter((price for _, price in ticks), dtype=np.float64, count=len(ticks))
+        low, high = prices.min(), prices.max()
+
+        # Higher-timeframe zones only track fills, so the batch range is enough
+        for timeframe in self.timeframes:
+            timeframe.check_fills(low, high)
+
+        candidates = self.zone_index.batch_candidates(low, high)
+        if not candidates:
+            return
+
+        fill_tick, entry_tick, outside_after = scan_tick_batch(
+            prices,
+            [fvg.bottom for fvg in candidates],
+            [fvg.top for fvg in candidates],
+            [fvg.type == 'bearish' for fvg in candidates],
+            [fvg.price_was_outside for fvg in candidates],
+            [fvg.trade_taken for fvg in candidates],
+            entries_enabled=self.strategy_enabled,
+        )
+
+        # Carry each zone's entry state forward to the end of the batch
+        tick_count = len(ticks)
+        events = []
+        for i, fvg in enumerate(candidates):
+            fvg.price_was_outside = bool(outside_after[i])
+            if fill_tick[i] < tick_count:
+                events.append((int(fill_tick[i]), 0, i))
+            if entry_tick[i] < tick_count:
+                events.append((int(entry_tick[i]), 1, i))
+            elif fill_tick[i] >= tick_count and not fvg.price_was_outside and not fvg.trade_taken:
+                # Still inside - watch for the exit
+                self.zone_index.inside[id(fvg)] = fvg
+                continue
+            self.zone_index.inside.pop(id(fvg), None)
+
+        # Emit in tick order - fills before entries on the same tick, as in the per-tick loop
+        heapq.heapify(events)
+        while events:
+            tick, kind, i = heapq.heappop(events)
+            fvg = candidates[i]
+            tick_datetime, price = ticks[tick]
+            if kind == 0:
+                self.fill_live(fvg, price)
                 continue
+            signal_datetime = datetime.strptime(tick_datetime, '%m/%d/%Y %H:%M:%S') if tick_datetime else None
+            self.enter_zone(fvg, price, signal_datetime)
+
+            # A suppressed entry leaves the zone out of cooldown - scan the rest of the
+            # batch from inside the zone for its next entry
+            rest = prices[tick + 1:]
+            if fvg.trade_taken or not len(rest):
+                continue
+            _, next_entry, outside_after = scan_tick_batch(
+                rest, [fvg.bottom], [fvg.top], [fvg.type == 'bearish'], [False], [False])
+            fvg.price_was_outside = bool(outside_after[0])
+            if next_entry[0] < len(rest):
+                heapq.heappush(events, (tick + 1 + int(next_entry[0]), 1, i))
+            elif fvg.price_was_outside:
+                self.zone_index.inside.pop(id(fvg), None)
 
-            # Bearish FVG fills when current price reaches or exceeds the TOP
-            if fvg['type'] == 'bearish' and current_price >= fvg['top']:
-                fvg['filled'] = True
-                logger.info(f"*** BEARISH FVG FILLED (LIVE) ***")
-                logger.info(f"  Zone: {fvg['bottom']:.2f} - {fvg['top']:.2f}")
-                logger.info(f"  Fill Price: {current_price:.2f}")
-                logger.info(f"  Zone removed from active list")
-
-            # Bullish FVG fills when current price reaches or goes below the BOTTOM
-            elif fvg['type'] == 'bullish' and current_price <= fvg['bottom']:
-                fvg['filled'] = True
-                logger.info(f"*** BULLISH FVG FILLED (LIVE) ***")
-                logger.info(f"  Zone: {fvg['bottom']:.2f} - {fvg['top']:.2f}")
-                logger.info(f"  Fill Price: {current_price:.2f}")
-                logger.info(f"  Zone removed from active list")
-    
     def load_historical_fvgs(self):
         """Load FVGs from historical hourly data on startup"""
         logger.info("Scanning historical hourly data for existing FVGs...")
 
         df = self.read_historical_data()
+        self.scan_historical_fvgs(df)
+
+        # From here on only the bar window is kept - the full history is not needed again
+        if df is not None and not df.empty:
+            if self.bar_window.total != len(df):
+                self.seed_bar_window(df, len(df))
+            if self.last_processed_bar_time is None:
+                self.last_processed_bar_time = df['DateTime'].iat[-1]
+        self.bar_store.release_history()
+
+    def seed_bar_window(self, df, end):
+        """Fill the bar window with the last bars of the history before index end"""
+        start = max(0, end - self.bar_window.capacity)
+        bars = df.iloc[start:end]
+        self.bar_window.extend(bar_times_ns(bars['DateTime']), bars['Open'].to_numpy(), bars['High'].to_numpy(),
+                               bars['Low'].to_numpy(), bars['Close'].to_numpy(), first_number=start)
+
+    def scan_historical_fvgs(self, df):
+        """Find the zones still open in the history (or restore them from the snapshot)"""
         if df is None or len(df) < 3:
             logger.info("Not enough historical data to scan for FVGs")
             return
 
+        # Higher timeframes are rebuilt from the full history (one vectorized resample each)
+        for timeframe in self.timeframes:
+            timeframe.seed(df, self.read_current_price())
+
+        # Warm start - resume from the saved zone state if the history still matches it
+        if not self.active_fvgs and self.restore_zone_snapshot(df):
+            return
+
         # Get current price to check if we're already inside any zones
         current_price = self.read_current_price()
 
-        # Find all FVGs in historical data
-        historical_fvgs = self.find_fvgs_in_data(df)
+        # Find all FVGs in historical data (columnar, vectorized)
+        high = df['High'].to_numpy()
+        low = df['Low'].to_numpy()
+        detected = detect_fvgs(high, low, min_gap=5.0)
+
+        # Drop filled FVGs in one pass, then resolve overlapping zones (smaller zone wins)
+        unfilled = np.flatnonzero(first_fill_indices(detected, high, low) < 0)
+        already_tracking = len(self.active_fvgs) > 0
+        if already_tracking:
+            survivors = unfilled
+        else:
+            survivors = resolve_overlaps(detected, unfilled)
+        historical_fvgs = zones_from_detected(select_fvgs(detected, survivors), df['DateTime'])
 
-        # Filter out filled FVGs and duplicates, then add to active list
         for fvg in historical_fvgs:
-            if not self.is_fvg_filled(fvg, df, fvg['index']):
-                if not self.is_duplicate_zone(fvg):
-                    # Check if current price is already inside this zone
-                    if current_price is not None:
-                        price_in_zone = (current_price >= fvg['bottom'] and current_price <= fvg['top'])
-                        if price_in_zone:
-                            # Price is already in the zone, mark it so we don't immediately trade
-                            fvg['price_was_outside'] = False
-                            logger.info(f"Price already in {fvg['type']} zone {fvg['bottom']:.2f}-{fvg['top']:.2f} at startup")
+            # Zones already being tracked still go through the per-zone duplicate check
+            if already_tracking and self.is_duplicate_zone(fvg):
+                continue
+
+            # Check if current price is already inside this zone
+            if current_price is not None:
+                price_in_zone = fvg.contains(current_price)
+                if price_in_zone:
+                    # Price is already in the zone, mark it so we don't immediately trade
+                    fvg.price_was_outside = False
+                    logger.info(f"Price already in {fvg.type} zone {fvg.bottom:.2f}-{fvg.top:.2f} at startup")
 
-                    self.active_fvgs.append(fvg)
+            self.track_zone(fvg)
 
         logger.info(f"Loaded {len(self.active_fvgs)} active FVGs from historical data")
-        bullish_count = len([f for f in self.active_fvgs if f['type'] == 'bullish'])
-        bearish_count = len([f for f in self.active_fvgs if f['type'] == 'bearish'])
+        bullish_count = len([f for f in self.active_fvgs if f.type == 'bullish'])
+        bearish_count = len([f for f in self.active_fvgs if f.type == 'bearish'])
         logger.info(f"  - {bullish_count} bullish FVGs")
         logger.info(f"  - {bearish_count} bearish FVGs")
 
+    def save_zone_snapshot(self):
+        """Persist zone state keyed to the last processed bar and a fingerprint of the history file"""
+        state = self.snapshot_state()
+        if state is not None and self.write_zone_snapshot(*state):
+            self.snapshot_dirty = False
+
+    def snapshot_state(self):
+        """Copy of the zone table, snapshot metadata and history size - None if bars are still unprocessed"""
+        if not self.snapshot_path or self.last_processed_bar_time is None:
+            return None
+        # Only snapshot when every bar read from the file has been processed - and no others:
+        # bars received over a socket or built from ticks are not in the file the snapshot is keyed to
+        window = self.bar_window
+        file_time_ns = self.bar_store.last_time_ns
+        if (window.live_count or window.latest_time_ns != file_time_ns
+                or pd.Timestamp(self.last_processed_bar_time).value != file_time_ns):
+            return None
+
+        zones = [fvg for fvg in self.active_fvgs if not fvg.filled]
+        meta = {
+            'instrument': self.instrument,
+            'bar_count': self.bar_store.bar_count,
+            'last_bar_time': pd.Timestamp(self.last_processed_bar_time).value,
+        }
+        return zones_to_table(zones), meta, self.bar_store.offset
+
+    def write_zone_snapshot(self, table, meta, history_size):
+        """Write a snapshot from snapshot_state() - returns True on success"""
+        try:
+            meta = dict(meta, fingerprint=history_fingerprint(self.historical_path, history_size))
+            save_snapshot(self.snapshot_path, table, meta)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving zone snapshot: {e}")
+            return False
+
+    def restore_zone_snapshot(self, df):
+        """Load saved zone state and replay bars appended since - returns False if a full rebuild is needed"""
+        if not self.snapshot_path:
+            return False
+        snapshot = load_snapshot(self.snapshot_path)
+        if snapshot is None:
+            return False
+
+        zones_table, meta = snapshot
+        if meta.get('instrument') != self.instrument:
+            logger.info(f"Zone snapshot is for {meta.get('instrument')}, not {self.instrument} - rebuilding zones")
+            return False
+
+        bar_count = meta['bar_count']
+        if (not snapshot_matches(meta, self.historical_path) or not 3 <= bar_count <= len(df)
+                or df['DateTime'].iat[bar_count - 1].value != meta['last_bar_time']):
+            logger.info("Historical data was rewritten since the zone snapshot - rebuilding zones")
+            return False
+
+        current_price = self.read_current_price()
+        for fvg in zones_from_table(zones_table):
+            # Same rule as a cold start - no entry signal for a zone price is already inside
+            if current_price is not None and fvg.contains(current_price):
+                fvg.price_was_outside = False
+            self.track_zone(fvg)
+        self.last_processed_bar_time = df['DateTime'].iat[bar_count - 1]
+        logger.info(f"Restored {len(self.active_fvgs)} zones from snapshot at bar {self.last_processed_bar_time}")
+
+        # Catch up on bars appended while the bot was stopped, one bar at a time through the window
+        self.seed_bar_window(df, bar_count)
+        times_ns = bar_times_ns(df['DateTime'])
+        opens, highs, lows, closes = (df[column].to_numpy() for column in ('Open', 'High', 'Low', 'Close'))
+        for current_index in range(bar_count, len(df)):
+            self.bar_window.append(int(times_ns[current_index]), opens[current_index], highs[current_index],
+                                   lows[current_index], closes[current_index])
+            bar_time = df['DateTime'].iat[current_index]
+            self.check_zone_cooldowns(bar_time)
+            self.find_new_fvgs(self.bar_window, current_index, current_price)
+            self.check_fvg_fill_status(self.bar_window, current_index)
+            self.last_processed_bar_time = bar_time
+        if len(df) > bar_count:
+            logger.info(f"Processed {len(df) - bar_count} bars added since the snapshot")
+
+        self.snapshot_dirty = True
+        return True
+
     def clean_old_fvgs(self, current_index, current_price=None):
         """Remove filled FVGs or those too far from current price"""
-        cleaned_fvgs = []
-        for fvg in self.active_fvgs:
-            # Remove filled FVGs
-            if fvg['filled']:
-                continue
+        # If we have current price, filter by distance (250 points)
+        far_fvgs = []
+        if current_price is not None:
+            far_fvgs = self.zone_index.farther_than(current_price, 250)
+            for timeframe in self.timeframes:
+                timeframe.cleanup(current_price)
+
+        # Nothing filled or out of range since the last pass - no need to touch the list
+        if not far_fvgs and not self.filled_since_cleanup:
+            return
 
-            # If we have current price, filter by distance (250 points)
-            if current_price is not None:
-                distance = min(abs(current_price - fvg['bottom']), abs(current_price - fvg['top']))
-                if distance <= 250:
-                    cleaned_fvgs.append(fvg)
-            else:
-                # Fallback: keep all unfilled FVGs when no price available
-                cleaned_fvgs.append(fvg)
+        far_ids = {id(fvg) for fvg in far_fvgs}
+        for fvg in far_fvgs:
+            self.zone_index.remove(fvg)
+
+        cleaned_fvgs = [fvg for fvg in self.active_fvgs if not fvg.filled and id(fvg) not in far_ids]
+        self.filled_since_cleanup = 0
 
         removed_count = len(self.active_fvgs) - len(cleaned_fvgs)
         self.active_fvgs = cleaned_fvgs
@@ -555,200 +1039,241 @@ class FVGATITradingBot:
         if removed_count > 0:
             logger.info(f"Cleaned {removed_count} FVGs (filled or >250pts away)")
     
+    def status_snapshot(self, current_price):
+        """Copy what the status display needs, so the render thread never reads live zones"""
+        active_fvgs = [ZoneView(fvg.type, fvg.bottom, fvg.top, fvg.gap_size)
+                       for fvg in self.active_fvgs if not fvg.filled]
+        zones_in_cooldown = any(fvg.trade_taken for fvg in self.active_fvgs if not fvg.filled)
+        timeframe_zones = [(timeframe.name, timeframe.views()) for timeframe in self.timeframes]
+        return current_price, active_fvgs, zones_in_cooldown, self.instrument, timeframe_zones
+
+    def publish_state(self, current_price):
+        """Publish zones, price, cooldowns and counters to the shared state region"""
+        if self.state_publisher is None:
+            return
+        try:
+            latest_bar = self.last_processed_bar_time
+            self.state_publisher.publish(
+                current_price, self.instrument, self.active_fvgs,
+                [(timeframe.name, timeframe.zones) for timeframe in self.timeframes],
+                {'signals_sent': self.signals_sent, 'signals_suppressed': self.signal_ledger.suppressed,
+                 'bars': self.bar_window.total},
+                None if latest_bar is None else pd.Timestamp(latest_bar).value)
+        except Exception as e:
+            logger.error(f"Error publishing shared state: {e}")
+
+    def status_summary(self):
+        """Plain-value health summary (for the multi-instrument supervisor)"""
+        unfilled = [fvg for fvg in self.active_fvgs if not fvg.filled]
+        latest_bar = self.last_processed_bar_time
+        return {
+            'instrument': self.instrument,
+            'price': self.live_feed.last_price,
+            'last_tick': self.live_feed.last_datetime,
+            'last_bar': None if latest_bar is None else str(latest_bar),
+            'bars': self.bar_window.total,
+            'active_zones': len(unfilled),
+            'zones_in_cooldown': sum(1 for fvg in unfilled if fvg.trade_taken),
+            'signals': self.signals_sent,
+            'signals_suppressed': self.signal_ledger.suppressed,
+            'timeframe_zones': {timeframe.name: len(timeframe.zone_index) for timeframe in self.timeframes},
+        }
+
     def display_status(self, current_price):
         """Display current bot status with real-time updates"""
         if current_price is None:
             return
+        print('\n'.join(self.status_lines(self.status_snapshot(current_price))), end='', flush=True)
 
-        # Check if any zones are in cooldown
-        zones_in_cooldown = any(fvg['trade_taken'] for fvg in self.active_fvgs if not fvg['filled'])
-        system_status = "WAITING (next bar)" if zones_in_cooldown else "ENABLED"
-
-        # Build the entire display as a string buffer first
-        lines = []
-        lines.append(f"        FVG TRADING BOT - System: {system_status}")
-        lines.append("="*60)
-        lines.append("")
-
-        # Get all active FVGs and calculate distances
-        active_fvgs = [fvg for fvg in self.active_fvgs if not fvg['filled']]
-
-        if active_fvgs:
-            # Add distance to each FVG and sort by distance
-            fvgs_with_distance = []
-            for fvg in active_fvgs:
-                # Calculate distance to entry point
-                # Positive = price must go UP, Negative = price must go DOWN
-                if fvg['type'] == 'bearish':
-                    # For LONG zones: entry at BOTTOM
-                    # Positive if price needs to rise to reach bottom
-                    distance = fvg['bottom'] - current_price
-                else:  # bullish
-                    # For SHORT zones: entry at TOP
-                    # Negative if price needs to drop to reach top
-                    distance = fvg['top'] - current_price
-
-                fvgs_with_distance.append({
-                    'fvg': fvg,
-                    'distance': distance
-                })
-
-            # Sort by absolute distance (closest first)
-            fvgs_with_distance.sort(key=lambda x: abs(x['distance']))
-
-            # Separate by type but keep distance ordering
-            bullish_sorted = [item for item in fvgs_with_distance if item['fvg']['type'] == 'bullish']
-            bearish_sorted = [item for item in fvgs_with_distance if item['fvg']['type'] == 'bearish']
-
-            # Display BEARISH gaps (reversed - furthest first, closest to center last)
-            lines.append("   BEARISH GAPS (LONG)     Gap Size     Distance       ")
-            lines.append("-"*60)
-            if bearish_sorted:
-                # Reverse the order so furthest gaps are at top, closest to center at bottom
-                for item in reversed(bearish_sorted):
-                    fvg = item['fvg']
-                    distance = item['distance']
-                    # Show BOTTOM first for bearish zones (price approaches from below)
-                    zone_range = f"{fvg['bottom']:.2f} - {fvg['top']:.2f}"
-                    gap_size = f"{fvg['gap_size']:.2f}pts"
-                    # Show signed distance with arrows (↑ = price needs to go up, ↓ = price needs to go down)
-                    if distance > 0:
-                        distance_str = f"↑ {distance:.2f}pts"
-                    else:
-                        distance_str = f"↓ {abs(distance):.2f}pts"
-
-                    # Check if price is currently in this zone
-                    price_in_zone = (current_price >= fvg['bottom'] and current_price <= fvg['top'])
-                    zone_annotation = "In Zone" if price_in_zone else ""
-
-                    lines.append(f"    {zone_range:<22} {gap_size:<12} {distance_str:<12}{zone_annotation}")
-            else:
-                lines.append("    No bearish gaps")
-
-            # Center line with time, instrument, and price
-            lines.append("")
-            time_str = datetime.now().strftime('%H:%M:%S')
-            center_line = f" {time_str} | Instrument: {self.instrument} | Current Price: {current_price:.2f}"
-            lines.append(center_line)
-            lines.append("")
-
-            # Display BULLISH gaps (top first - closest to price when looking for shorts)
-            if bullish_sorted:
-                for item in bullish_sorted:
-                    fvg = item['fvg']
-                    distance = item['distance']
-                    # Show TOP first for bullish zones (price approaches from above)
-                    zone_range = f"{fvg['top']:.2f} - {fvg['bottom']:.2f}"
-                    gap_size = f"{fvg['gap_size']:.2f}pts"
-                    # Show signed distance with arrows (↑ = price needs to go up, ↓ = price needs to go down)
-                    if distance > 0:
-                        distance_str = f"↑ {distance:.2f}pts"
-                    else:
-                        distance_str = f"↓ {abs(distance):.2f}pts"
-
-                    # Check if price is currently in this zone
-                    price_in_zone = (current_price >= fvg['bottom'] and current_price <= fvg['top'])
-                    zone_annotation = "In Zone" if price_in_zone else ""
-
-                    lines.append(f"    {zone_range:<22} {gap_size:<12} {distance_str:<12}{zone_annotation}")
-            else:
-                lines.append("    No bullish gaps")
-
-            lines.append("-"*60)
-            lines.append("  BULLISH GAPS (SHORT)     Gap Size     Distance       ")
-        else:
-            lines.append("\nNo active FVGs")
-
-        lines.append("="*60)
-
-        # Print all lines at once with proper flushing
-        output = '\n'.join(lines)
-        print(output, end='', flush=True)
+    def status_lines(self, snapshot):
+        """Build the status display, one string per screen line"""
+        return status_lines(snapshot)
     
-    def run(self):
-        """Main trading loop"""
+    def start(self):
+        """Load zones and start the display, metrics and file watcher (shared by both runtimes)"""
         logger.info("Starting FVG Trading Bot...")
         logger.info("Monitoring Fair Value Gaps in real-time")
         logger.info("="*50)
 
+        # Archive ticks written while the bot was stopped (they are not traded)
+        if self.tick_archive is not None:
+            try:
+                self.live_feed.catch_up()
+            except Exception as e:
+                logger.error(f"Error catching up the tick archive: {e}")
+
         # Load historical FVGs on startup
         self.load_historical_fvgs()
+        self.seed_live_bar()
         logger.info("="*50)
 
         logger.info(f"FVG signal generation enabled for {self.instrument}")
         logger.info("Monitoring HistoricalData.csv for new hourly bars and FVGs...")
         logger.info("Monitoring LiveFeed.csv for real-time price updates...")
-        logger.info("Display updates every second with live price data...")
+        if not self.headless:
+            logger.info(f"Display refreshes up to {1 / self.display_interval:.0f} times per second with live price data...")
 
         # Enable ANSI escape codes for Windows 10+
-        if os.name == 'nt':
+        if os.name == 'nt' and not self.headless:
             os.system('color')
 
-        # Hide cursor for cleaner display
-        if os.name == 'nt':
-            # Windows cursor control
-            os.system('echo off')
-        else:
-            print('\033[?25l', end='', flush=True)
+        # Status display runs on its own thread (hides the cursor, clears the screen on the first frame)
+        self.renderer.start()
 
-        # Clear screen once at startup
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Metrics endpoint / JSON dump run on their own threads
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
 
+        # Wake as soon as either data file is appended instead of sleeping a fixed second
+        if self.watch_backend:
+            self.watcher = FileWatcher([self.live_feed_path, self.historical_path], backend=self.watch_backend)
+            logger.info(f"Watching data files with {self.watcher.backend_name}")
+
+    def seed_live_bar(self):
+        """Rebuild the forming hourly bar from archived ticks, so the first live bar is complete"""
+        if self.bar_aggregator is None or self.tick_archive is None:
+            return
         try:
-            while True:
-                # Check for new hourly bars (new FVGs)
-                if self.check_historical_updated():
-                    self.process_historical_bars()
+            last_tick = self.tick_archive.last_time()
+            if last_tick is None:
+                return
+            # The hour before the forming bar too - ticks there show the feed was up when it opened
+            ticks = self.tick_archive.read_range(last_tick.floor('h') - pd.Timedelta(hours=1),
+                                                 last_tick + pd.Timedelta(seconds=1))
+            self.bar_aggregator.seed(ticks['DateTime'].to_numpy(), ticks['Last'].to_numpy())
+        except Exception as e:
+            logger.error(f"Error rebuilding the forming bar: {e}")
+
+    def shutdown(self):
+        """Save zone state, close the signal files and stop the helper threads"""
+        self.save_zone_snapshot()
+        self.signal_writer.close()
+        if self.state_publisher is not None:
+            self.publish_state(self.live_feed.last_price)
+            self.state_publisher.close()
+        if self.tick_archive is not None:
+            self.tick_archive.close()
+        logger.info(f"Signal write latency: {self.signal_writer.latency_stats()}")
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        # Ensure the render thread is gone and the cursor is visible
+        self.renderer.stop()
+        logger.info("FVG Bot stopped")
+
+    def run_async(self, socket_address=None):
+        """Run on the asyncio runtime - feed, bars, zones, signals and display as separate tasks
+
+        With socket_address, ticks and bars arrive over a TCP/Unix socket
+        instead of LiveFeed.csv/HistoricalData.csv (read once at startup).
+        """
+        socket_feed = SocketFeed(socket_address) if socket_address else None
+        AsyncRuntime(self, socket_feed=socket_feed).run()
+
+    def step(self):
+        """One pass of the main loop: new bars, new ticks, cleanup, display, signal fsync, snapshot"""
+        # Check for new hourly bars (new FVGs) - reconciles bars already built from ticks
+        if self.check_historical_updated():
+            self.process_historical_bars()
+
+        # Close the forming bar on the clock (no tick comes between the session close and the reopen)
+        self.close_due_live_bar(self.live_feed.last_price)
+
+        if self.batch_ticks:
+            # Get every tick since the last poll from LiveFeed
+            ticks = self.read_new_ticks()
+            current_price = self.live_feed.last_price if os.path.exists(self.live_feed_path) else None
+            if current_price is not None and not ticks:
+                # No new ticks - re-check the last price (zones may have come off cooldown)
+                ticks = [(None, current_price)]
+        else:
+            # Build bars from every new tick, then get current price from LiveFeed
+            if self.bar_aggregator is not None:
+                self.build_live_bars(self.read_new_ticks())
+            current_price = self.read_current_price()
+
+        if current_price is not None:
+            if self.batch_ticks:
+                # Close bars and check fills and trade signals for every tick in the batch
+                self.process_live_ticks(ticks)
+            else:
+                # Check if any zones have been filled (real-time)
+                self.check_live_fvg_fills(current_price)
 
-                # Get current price from LiveFeed
-                current_price = self.read_current_price()
+                # Check for trade signals based on current price
+                self.check_fvg_retest_signals(current_price)
 
-                if current_price is not None:
-                    # Check if any zones have been filled (real-time)
-                    self.check_live_fvg_fills(current_price)
+            # Clean FVGs based on distance from current price
+            if self.bar_window.total > 0:
+                current_index = self.bar_window.total - 1
+                self.clean_old_fvgs(current_index, current_price)
+
+            # Publish state and hand the display state to the renderer (at most once per display interval)
+            now = time.monotonic()
+            if now - self.last_display_time >= self.display_interval:
+                self.last_display_time = now
+                self.publish_state(current_price)
+                if not self.headless:
+                    self.renderer.update(self.status_snapshot(current_price))
+
+        # Interval fsync policy - flush signal files that are due
+        self.signal_writer.sync_if_due()
 
-                    # Check for trade signals based on current price
-                    self.check_fvg_retest_signals(current_price)
+        # Persist zone state after new bars, fills and entries
+        if self.snapshot_dirty:
+            self.save_zone_snapshot()
 
-                    # Clean FVGs based on distance from current price
-                    df = self.read_historical_data()
-                    if df is not None and len(df) > 0:
-                        current_index = len(df) - 1
-                        self.clean_old_fvgs(current_index, current_price)
+    def run(self):
+        """Main trading loop"""
+        self.start()
 
-                    # Display status with current price
-                    self.clear_screen()
-                    self.display_status(current_price)
+        try:
+            while True:
+                self.step()
 
-                # Sleep for 1 second - updates every second
-                time.sleep(1)
+                if self.watcher is not None:
+                    # Wait for the next write to LiveFeed/HistoricalData (at most 1 second)
+                    self.watcher.wait(timeout=1.0)
+                else:
+                    # Sleep for 1 second - updates every second
+                    time.sleep(1)
 
         except KeyboardInterrupt:
-            # Show cursor again before exiting
-            if os.name == 'nt':
-                os.system('echo on')
-            else:
-                print('\033[?25h', end='', flush=True)
+            # Stop drawing (restores the cursor) before logging
+            self.renderer.stop()
             logger.info("\nStopping FVG ATI Trading Bot...")
             logger.info(f"Final active FVGs: {len(self.active_fvgs)}")
         except Exception as e:
-            # Show cursor again on error
-            if os.name == 'nt':
-                os.system('echo on')
-            else:
-                print('\033[?25h', end='', flush=True)
+            self.renderer.stop()
             logger.error(f"Error in main loop: {e}")
             import traceback
             logger.error(traceback.format_exc())
         finally:
-            # Ensure cursor is visible
-            if os.name == 'nt':
-                os.system('echo on')
-            else:
-                print('\033[?25h', end='', flush=True)
-            logger.info("FVG Bot stopped")
+            self.shutdown()
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='FVG signal engine for NinjaTrader')
+    # --headless turns the status display off (servers, logging to a file)
+    parser.add_argument('--headless', action='store_true', help='no status display')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='asyncio runtime - file reads never stall zone evaluation')
+    parser.add_argument('--socket', help='take ticks and bars from a socket feed at host:port or unix:///path '
+                                         '(implies --async)')
+    parser.add_argument('--metrics-port', type=int, help='serve Prometheus metrics on 127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-json', help='dump metrics as JSON to this file every 10 seconds')
+    parser.add_argument('--session-close', help='daily session close HH:MM in the bars\' time zone, which 4-hour '
+                                                'and daily bars end on (default: found in HistoricalData.csv)')
+    args = parser.parse_args()
+
     # Instrument will be auto-detected from HistoricalData.csv
-    bot = FVGATITradingBot(instrument='UNKNOWN')
-    bot.run()
\ No newline at end of file
+    bot = FVGATITradingBot(instrument='UNKNOWN', headless=args.headless,
+                           metrics_port=args.metrics_port, metrics_json_path=args.metrics_json,
+                           session_close=args.session_close)
+    if args.use_async or args.socket:
+        bot.run_async(socket_address=args.socket)
+    else:
+        bot.run()
\ No newline at end of file
@@ -0,0 +1,177 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+import numpy as np
+
+# Zone type codes used by the columnar detector
+BULLISH = 1
+BEARISH = -1
+
+TYPE_NAMES = {BULLISH: 'bullish', BEARISH: 'bearish'}
+
+# Columnar detection result - one entry per gap, in bar order
+DetectedFVGs = namedtuple('DetectedFVGs', ['type', 'top', 'bottom', 'gap_size', 'index'])
+
+
+def detect_fvgs(high, low, min_gap=5.0, start_index=2):
+    """Vectorized three-candle FVG scan over High/Low arrays"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    start_index = max(start_index, 2)
+
+    if len(high) <= start_index:
+        empty = np.empty(0, dtype=np.float64)
+        return DetectedFVGs(np.empty(0, dtype=np.int8), empty, empty, empty, np.empty(0, dtype=np.int64))
+
+    # candle1 = bar i-2, candle3 = bar i
+    high1 = high[start_index - 2:-2]
+    low1 = low[start_index - 2:-2]
+    high3 = high[start_index:]
+    low3 = low[start_index:]
+
+    # Bullish FVG (gap up): candle3 low above candle1 high
+    bull_gap = low3 - high1
+    bullish = (low3 > high1) & (bull_gap >= min_gap)
+
+    # Bearish FVG (gap down): candle3 high below candle1 low
+    bear_gap = low1 - high3
+    bearish = (high3 < low1) & (bear_gap >= min_gap)
+
+    # The two conditions are mutually exclusive, so one pass covers both
+    offsets = np.flatnonzero(bullish | bearish)
+    is_bull = bullish[offsets]
+
+    return DetectedFVGs(
+        type=np.where(is_bull, BULLISH, BEARISH).astype(np.int8),
+        top=np.where(is_bull, low3[offsets], low1[offsets]),
+        bottom=np.where(is_bull, high1[offsets], high3[offsets]),
+        gap_size=np.where(is_bull, bull_gap[offsets], bear_gap[offsets]),
+        index=offsets.astype(np.int64) + start_index,
+    )
+
+
+def select_fvgs(detected, positions):
+    """Subset a columnar detection result by position"""
+    return DetectedFVGs(*(column[positions] for column in detected))
+
+
+def first_at_or_below(values, starts, thresholds, block_size=64):
+    """First index j >= start with values[j] <= threshold for each query, -1 if none
+
+    Values are split into fixed-size blocks; the query's own block is scanned
+    directly, the first qualifying later block is found with a sparse table of
+    block minima (O(log n) per query), and that block is then scanned.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.int64)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    result = np.full(len(starts), -1, dtype=np.int64)
+
+    n = len(values)
+    if n == 0 or len(starts) == 0:
+        return result
+
+    block_count = -(-n // block_size)
+    padded = np.full(block_count * block_size, np.inf)
+    padded[:n] = values
+    blocks = padded.reshape(block_count, block_size)
+    block_min = blocks.min(axis=1)
+
+    # Sparse table: levels[k][b] = min(block_min[b:b + 2**k]), inf past the end
+    levels = [np.append(block_min, np.inf)]
+    span = 1
+    while span < block_count:
+        prev = levels[-1]
+        shifted = np.append(prev[span:], np.full(span, np.inf))
+        levels.append(np.minimum(prev, shifted))
+        span *= 2
+
+    offsets = np.arange(block_size)
+
+    def scan_blocks(query_ids, block_ids, from_offsets):
+        """Scan whole blocks for the first qualifying value at/after an offset"""
+        rows = blocks[block_ids]
+        mask = (rows <= thresholds[query_ids, None]) & (offsets >= from_offsets[:, None])
+        hit = mask.any(axis=1)
+        result[query_ids[hit]] = block_ids[hit] * block_size + mask[hit].argmax(axis=1)
+        return query_ids[~hit]
+
+    # Process queries in chunks to bound the temporary (queries x block) arrays
+    for chunk_start in range(0, len(starts), 8192):
+        query_ids = np.arange(chunk_start, min(chunk_start + 8192, len(starts)))
+        query_ids = query_ids[starts[query_ids] < n]
+        if len(query_ids) == 0:
+            continue
+
+        # 1) Rest of the starting block
+        start_blocks = starts[query_ids] // block_size
+        misses = scan_blocks(query_ids, start_blocks, starts[query_ids] % block_size)
+        if len(misses) == 0:
+            continue
+
+        # 2) Skip whole later blocks whose minimum stays above the threshold
+        pos = starts[misses] // block_size + 1
+        miss_thresholds = thresholds[misses]
+        for k in range(len(levels) - 1, -1, -1):
+            pos = np.minimum(pos, block_count)
+            skip = levels[k][pos] > miss_thresholds
+            pos = pos + skip * (1 << k)
+        pos = np.minimum(pos, block_count)
+
+        # 3) Scan the block that holds the first qualifying value
+        found = pos < block_count
+        if found.any():
+            scan_blocks(misses[found], pos[found], np.zeros(found.sum(), dtype=np.int64))
+
+    return result
+
+
+def first_fill_indices(detected, high, low):
+    """Index of the first bar after each gap that fills it, -1 if still open
+
+    Bullish gaps fill when a later Low touches the bottom, bearish gaps when a
+    later High touches the top (High is negated so both become a <= search).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    fill_index = np.full(len(detected.index), -1, dtype=np.int64)
+
+    bull = detected.type == BULLISH
+    if bull.any():
+        fill_index[bull] = first_at_or_below(low, detected.index[bull] + 1, detected.bottom[bull])
+    bear = ~bull
+    if bear.any():
+        fill_index[bear] = first_at_or_below(-high, detected.index[bear] + 1, -detected.top[bear])
+    return fill_index
+
+
+def resolve_overlaps(detected, positions):
+    """Sweep zones in bar order, keeping the smaller zone when same-type zones overlap
+
+    Mirrors repeated is_duplicate_zone calls: a new zone is rejected if any
+    overlapping live zone is the same size or smaller, otherwise it replaces
+    every zone it overlaps. Live zones of one type never overlap each other,
+    so they stay sorted by both bottom and top and each overlap lookup is a
+    pair of bisects. Returns the surviving positions in bar order.
+    """
+    live = {BULLISH: ([], [], [], []), BEARISH: ([], [], [], [])}  # bottoms, tops, gaps, positions
+    types = detected.type.tolist()
+    bottoms = detected.bottom.tolist()
+    tops = detected.top.tolist()
+    gaps = detected.gap_size.tolist()
+
+    for pos in np.asarray(positions).tolist():
+        live_bottoms, live_tops, live_gaps, live_positions = live[types[pos]]
+        bottom, top, gap = bottoms[pos], tops[pos], gaps[pos]
+
+        # Overlapping run: live tops above our bottom and live bottoms below our top
+        lo = bisect_right(live_tops, bottom)
+        hi = bisect_left(live_bottoms, top)
+        if any(live_gaps[i] <= gap for i in range(lo, hi)):
+            continue
+
+        for column, value in ((live_bottoms, bottom), (live_tops, top), (live_gaps, gap), (live_positions, pos)):
+            column[lo:hi] = [value]
+
+    survivors = live[BULLISH][3] + live[BEARISH][3]
+    return np.array(sorted(survivors), dtype=np.int64)
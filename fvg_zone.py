@@ -0,0 +1,139 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from fvg_detection import TYPE_NAMES
+
+TYPE_CODES = {name: code for code, name in TYPE_NAMES.items()}
+
+# Bulk/backtest zone table - one 52-byte record per zone
+ZONE_DTYPE = np.dtype([
+    ('type', np.int8),              # BULLISH / BEARISH
+    ('top', np.float64),
+    ('bottom', np.float64),
+    ('gap_size', np.float64),
+    ('time', 'datetime64[ns]'),     # close of the bar that formed the gap
+    ('index', np.int64),            # bar index of that bar
+    ('filled', np.bool_),
+    ('trade_taken', np.bool_),
+    ('trade_bar_time', 'datetime64[ns]'),  # NaT when no trade is cooling down
+    ('price_was_outside', np.bool_),
+])
+
+# Read-only copy of a zone's display fields (handed to the render thread)
+ZoneView = namedtuple('ZoneView', ['type', 'bottom', 'top', 'gap_size'])
+
+
+class FVGZone:
+    """A single live FVG zone - slotted so thousands of zones stay small and attribute access stays fast"""
+
+    __slots__ = ('type', 'top', 'bottom', 'gap_size', 'time_ns', 'index',
+                 'filled', 'trade_taken', 'trade_bar_timestamp', 'price_was_outside')
+
+    def __init__(self, zone_type, top, bottom, gap_size, zone_datetime=None, index=-1,
+                 filled=False, trade_taken=False, trade_bar_timestamp=None, price_was_outside=True):
+        self.type = zone_type
+        self.top = top
+        self.bottom = bottom
+        self.gap_size = gap_size
+        self.index = index
+        self.filled = filled
+        self.trade_taken = trade_taken
+        self.trade_bar_timestamp = trade_bar_timestamp  # Track which bar the trade occurred in
+        self.price_was_outside = price_was_outside  # Track if price was outside zone
+        self.datetime = zone_datetime
+
+    @property
+    def datetime(self):
+        """Bar time that formed the gap (stored as epoch nanoseconds)"""
+        return None if self.time_ns is None else pd.Timestamp(self.time_ns)
+
+    @datetime.setter
+    def datetime(self, value):
+        self.time_ns = None if value is None or pd.isna(value) else pd.Timestamp(value).value
+
+    @property
+    def is_bearish(self):
+        return self.type == 'bearish'
+
+    def contains(self, price):
+        """True if price is inside the zone (edges included)"""
+        return self.bottom <= price <= self.top
+
+    def __repr__(self):
+        return f"FVGZone({self.type} {self.bottom:.2f}-{self.top:.2f}, gap {self.gap_size:.2f}, bar {self.index})"
+
+
+def _bar_times_ns(datetimes, positions):
+    """Epoch-ns bar times at the given positions of a Series or array of datetimes"""
+    if hasattr(datetimes, 'iloc'):
+        datetimes = datetimes.iloc[positions]
+    else:
+        datetimes = np.asarray(datetimes)[positions]
+    return pd.to_datetime(datetimes).to_numpy().astype('datetime64[ns]').astype(np.int64)
+
+
+def zones_from_detected(detected, datetimes):
+    """Build live zone objects from a columnar detection result"""
+    # Only look up timestamps for bars that actually formed a gap
+    times = _bar_times_ns(datetimes, detected.index)
+    zones = []
+    for zone_type, top, bottom, gap_size, index, time_ns in zip(
+            detected.type.tolist(), detected.top.tolist(), detected.bottom.tolist(),
+            detected.gap_size.tolist(), detected.index.tolist(), times.tolist()):
+        zone = FVGZone(TYPE_NAMES[zone_type], top, bottom, gap_size, index=index)
+        zone.time_ns = time_ns
+        zones.append(zone)
+    return zones
+
+
+def zone_table(detected, datetimes):
+    """Build a structured zone table from a columnar detection result"""
+    table = np.zeros(len(detected.index), dtype=ZONE_DTYPE)
+    table['type'] = detected.type
+    table['top'] = detected.top
+    table['bottom'] = detected.bottom
+    table['gap_size'] = detected.gap_size
+    table['time'] = _bar_times_ns(datetimes, detected.index).view('datetime64[ns]')
+    table['index'] = detected.index
+    table['trade_bar_time'] = np.datetime64('NaT')
+    table['price_was_outside'] = True
+    return table
+
+
+def zones_to_table(zones):
+    """Pack live zone objects into a structured zone table"""
+    table = np.zeros(len(zones), dtype=ZONE_DTYPE)
+    nat = np.iinfo(np.int64).min  # NaT as an int64
+    table['type'] = [TYPE_CODES[zone.type] for zone in zones]
+    table['top'] = [zone.top for zone in zones]
+    table['bottom'] = [zone.bottom for zone in zones]
+    table['gap_size'] = [zone.gap_size for zone in zones]
+    table['time'] = np.array([nat if zone.time_ns is None else zone.time_ns for zone in zones],
+                             dtype=np.int64).view('datetime64[ns]')
+    table['index'] = [zone.index for zone in zones]
+    table['filled'] = [zone.filled for zone in zones]
+    table['trade_taken'] = [zone.trade_taken for zone in zones]
+    table['trade_bar_time'] = np.array([nat if zone.trade_bar_timestamp is None
+                                        else pd.Timestamp(zone.trade_bar_timestamp).value for zone in zones],
+                                       dtype=np.int64).view('datetime64[ns]')
+    table['price_was_outside'] = [zone.price_was_outside for zone in zones]
+    return table
+
+
+def zones_from_table(table):
+    """Unpack a structured zone table into live zone objects"""
+    nat = np.iinfo(np.int64).min
+    zones = []
+    for zone_type, top, bottom, gap_size, time_ns, index, filled, trade_taken, trade_ns, outside in zip(
+            table['type'].tolist(), table['top'].tolist(), table['bottom'].tolist(),
+            table['gap_size'].tolist(), table['time'].view(np.int64).tolist(), table['index'].tolist(),
+            table['filled'].tolist(), table['trade_taken'].tolist(),
+            table['trade_bar_time'].view(np.int64).tolist(), table['price_was_outside'].tolist()):
+        zone = FVGZone(TYPE_NAMES[zone_type], top, bottom, gap_size, index=index, filled=filled,
+                       trade_taken=trade_taken, price_was_outside=outside,
+                       trade_bar_timestamp=None if trade_ns == nat else pd.Timestamp(trade_ns))
+        zone.time_ns = None if time_ns == nat else time_ns
+        zones.append(zone)
+    return zones
@@ -0,0 +1,254 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LiveFeedReader:
+    """Incremental tail reader for LiveFeed.csv - parses only newly appended lines
+
+    With a TickArchive attached every tick read is also archived, and once
+    rotate_bytes have been consumed the file is renamed to LiveFeed.csv.rotating
+    (NinjaScript re-creates LiveFeed.csv on its next tick). When the path
+    starts pointing at a new file, the rest of the old one is read first if
+    it can still be found under a rotated name, so no tick is lost or read
+    twice across a rotation.
+    """
+
+    # Bytes kept from just before the read offset to detect in-place rewrites
+    CHECK_BYTES = 64
+    # Bytes read from the end of the file on first open to find the last tick
+    INITIAL_TAIL_BYTES = 4096
+    # Where a rotated feed is looked for - our own rotation, then logrotate-style
+    ROTATING_SUFFIX = '.rotating'
+    ROTATED_SUFFIXES = (ROTATING_SUFFIX, '.1')
+
+    def __init__(self, path, start_at_end=True, buffer_ticks=False, archive=None, rotate_bytes=None):
+        self.path = path
+        self.start_at_end = start_at_end
+
+        # Tick archive fed with every tick read; the file is rotated once it is this big (needs an archive)
+        self.archive = archive
+        self.rotate_bytes = rotate_bytes
+
+        # When buffering, every polled tick is kept until drain() hands it out
+        self.buffer_ticks = buffer_ticks
+        self.pending = []
+
+        # Read position (always at the start of a line)
+        self.offset = 0
+        self.file_id = None
+        self.check_bytes = b''
+        self.has_polled = False
+
+        # Latest tick seen
+        self.last_price = None
+        self.last_datetime = None
+
+    def reset(self):
+        """Forget the read position (file truncated, rewritten or re-created)"""
+        self.offset = 0
+        self.file_id = None
+        self.check_bytes = b''
+
+    def position(self):
+        """Read position as plain values (stored with the tick archive)"""
+        if self.file_id is None:
+            return None
+        return {'file_id': list(self.file_id), 'offset': self.offset, 'check_bytes': self.check_bytes.hex()}
+
+    def restore(self, position):
+        """Resume from a position() - the next poll reads everything written after it"""
+        self.file_id = tuple(position['file_id'])
+        self.offset = position['offset']
+        self.check_bytes = bytes.fromhex(position['check_bytes'])
+        self.has_polled = True
+
+    def catch_up(self):
+        """Archive ticks written since the archive's last position (the whole file on a first run)
+
+        The ticks are not handed out - only the latest price is kept.
+        Returns the number of ticks archived.
+        """
+        if self.archive is None:
+            return 0
+        if self.archive.checkpoint:
+            self.restore(self.archive.checkpoint)
+        else:
+            self.has_polled = True
+        ticks = self.poll()
+        self.pending = []
+        self.archive.flush()
+        if ticks:
+            logger.info(f"Archived {len(ticks)} ticks written to {self.path} while stopped")
+        return len(ticks)
+
+    def _read_rotated(self):
+        """Rest of the file we were reading, if it was renamed - (path, ticks) or (None, [])"""
+        for suffix in self.ROTATED_SUFFIXES:
+            rotated_path = self.path + suffix
+            try:
+                with open(rotated_path, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    if (stat.st_dev, stat.st_ino) != self.file_id:
+                        continue
+                    f.seek(self.offset)
+                    data = f.read()
+            except OSError:
+                continue
+            # Nothing writes to a rotated file, so a last line without a newline is complete
+            return rotated_path, self._parse_lines(data)
+        return None, []
+
+    def rotate(self):
+        """Rename the consumed feed aside so LiveFeed.csv starts over - the next poll finishes the old file"""
+        rotated_path = self.path + self.ROTATING_SUFFIX
+        if os.path.exists(rotated_path):
+            return False  # previous rotation not finished
+        try:
+            os.replace(self.path, rotated_path)
+        except OSError as e:
+            # Windows refuses while NinjaScript has the file open - try after the next poll
+            logger.debug(f"Live feed rotation deferred: {e}")
+            return False
+
+        # Re-create it with the header so the price stays readable until NinjaScript's next tick
+        try:
+            with open(self.path, 'x') as f:
+                f.write('DateTime,Last\n')
+        except OSError:
+            pass  # NinjaScript got there first
+        logger.info(f"Rotated {self.path} after {self.offset} bytes")
+        return True
+
+    def _file_changed(self, f, stat):
+        """Check if the file was truncated or re-created since the last read"""
+        file_id = (stat.st_dev, stat.st_ino)
+        if self.file_id is not None and file_id != self.file_id:
+            return True
+        if stat.st_size < self.offset:
+            return True
+
+        # NinjaScript rewrites the header in place on init - make sure the bytes
+        # we last consumed are still where we left them
+        if self.check_bytes:
+            f.seek(self.offset - len(self.check_bytes))
+            if f.read(len(self.check_bytes)) != self.check_bytes:
+                return True
+        return False
+
+    def _parse_lines(self, data):
+        """Parse complete 'DateTime,Last' lines into (datetime_str, price) ticks"""
+        ticks = []
+        for raw in data.split(b'\n'):
+            line = raw.strip()
+            if not line or line.startswith(b'DateTime'):
+                continue
+            parts = line.split(b',')
+            if len(parts) < 2:
+                continue
+            try:
+                ticks.append((parts[0].decode('ascii'), float(parts[1])))
+            except ValueError:
+                continue
+        return ticks
+
+    def poll(self):
+        """Read ticks appended since the last poll - O(new bytes)"""
+        if not os.path.exists(self.path):
+            if self.file_id is not None and self.archive is not None:
+                return self._poll_rotated()  # mid-rotation - finish the old file now
+            self.reset()
+            return []
+
+        rotated_path = None
+        rotated_ticks = []
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+
+            if self._file_changed(f, stat):
+                if self.file_id is not None and (stat.st_dev, stat.st_ino) != self.file_id:
+                    # Replaced - pick up the end of the old file if it was rotated
+                    rotated_path, rotated_ticks = self._read_rotated()
+                if rotated_path is not None:
+                    logger.info(f"Live feed rotated, finished {rotated_path} and reading the new file")
+                else:
+                    logger.info(f"Live feed rewritten, re-reading from start: {self.path}")
+                self.reset()
+
+            self.file_id = (stat.st_dev, stat.st_ino)
+
+            start = self.offset
+            skip_backlog = self.start_at_end and not self.has_polled
+            self.has_polled = True
+            if skip_backlog:
+                # Only the latest tick matters on startup - skip the backlog
+                start = max(0, stat.st_size - self.INITIAL_TAIL_BYTES)
+
+            if stat.st_size <= start:
+                return self._consumed(rotated_ticks, rotated_path)
+
+            f.seek(start)
+            data = f.read(stat.st_size - start)
+
+        # Drop the leading partial line when we started mid-file
+        if start > self.offset:
+            first_newline = data.find(b'\n')
+            if first_newline < 0:
+                return self._consumed(rotated_ticks, rotated_path)
+            start += first_newline + 1
+            data = data[first_newline + 1:]
+
+        # Leave a partial last line (tick still being written) for the next poll
+        end = data.rfind(b'\n')
+        if end < 0:
+            self.offset = start
+            return self._consumed(rotated_ticks, rotated_path)
+        complete = data[:end + 1]
+
+        ticks = self._parse_lines(complete)
+        if skip_backlog:
+            ticks = ticks[-1:]
+
+        self.offset = start + end + 1
+        self.check_bytes = complete[-self.CHECK_BYTES:]
+        return self._consumed(rotated_ticks + ticks, rotated_path)
+
+    def _poll_rotated(self):
+        """Read the rest of a feed renamed away before its replacement exists"""
+        rotated_path, ticks = self._read_rotated()
+        self.reset()
+        return self._consumed(ticks, rotated_path)
+
+    def _consumed(self, ticks, rotated_path=None):
+        """Record, buffer and archive ticks just read; rotate the file once enough is consumed"""
+        if ticks:
+            self.last_datetime, self.last_price = ticks[-1]
+            if self.buffer_ticks:
+                self.pending.extend(ticks)
+
+        if self.archive is not None:
+            if ticks or rotated_path is not None:
+                self.archive.append(ticks, self.position())
+            else:
+                self.archive.flush_if_due()  # write out a quiet spell's ticks
+            if rotated_path is not None:
+                # The old file is only removed once its ticks are on disk (our own rotation only)
+                self.archive.flush()
+                if rotated_path.endswith(self.ROTATING_SUFFIX):
+                    os.remove(rotated_path)
+            elif self.rotate_bytes and self.offset >= self.rotate_bytes:
+                self.rotate()
+        return ticks
+
+    def drain(self):
+        """Poll, then return every buffered tick since the last drain (oldest first)"""
+        self.poll()
+        ticks = self.pending
+        self.pending = []
+        return ticks
+
+    def latest_price(self):
+        """Return the most recent traded price, reading only new bytes"""
+        self.poll()
+        return self.last_price
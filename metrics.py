@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Quantiles reported by the exporters
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of nanosecond latencies
+
+    Values below 2**sub_bucket_bits are counted exactly; above that every
+    power-of-two range is split into 2**(sub_bucket_bits - 1) equal buckets,
+    so any recorded value is reported within 1 / 2**(sub_bucket_bits - 1) of
+    its true value (under 1% with the default 8 bits). Recording is a few
+    integer operations and one list increment.
+    """
+
+    def __init__(self, sub_bucket_bits=8, max_value_ns=60 * 10**9):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.half = 1 << (sub_bucket_bits - 1)
+        self.max_value_ns = max_value_ns
+        self.counts = [0] * (self._index(max_value_ns) + 1)
+        self.total = 0
+        self.sum_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def _index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self.half + (value >> shift)
+
+    def _value(self, index):
+        """Lower bound of a bucket"""
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        return (index - shift * self.half) << shift
+
+    def record(self, value_ns):
+        value_ns = min(max(int(value_ns), 0), self.max_value_ns)
+        self.counts[self._index(value_ns)] += 1
+        self.total += 1
+        self.sum_ns += value_ns
+        if self.min_ns is None or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def percentile(self, q):
+        """Value (ns) at quantile q in [0, 1]"""
+        if not self.total:
+            return 0
+        target = max(1, int(q * self.total + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Count, mean, min, max and quantiles in milliseconds"""
+        summary = {
+            'count': self.total,
+            'mean_ms': self.sum_ns / self.total / 1e6 if self.total else 0.0,
+            'min_ms': (self.min_ns or 0) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+        }
+        for q in QUANTILES:
+            summary[f'p{q * 100:g}_ms'] = self.percentile(q) / 1e6
+        return summary
+
+
+class Metrics:
+    """Stage latency histograms, counters and gauges for the bot's hot path
+
+    Instrumentation is attached by wrapping methods with timed(), so when
+    metrics are disabled nothing is wrapped and the hot path is unchanged.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}  # name -> zero-argument callable, read at export time
+        self.started = time.time()
+
+    def histogram(self, name):
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram()
+        return self.histograms[name]
+
+    def observe(self, name, value_ns):
+        self.histogram(name).record(value_ns)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    def timed(self, name, fn):
+        """Wrap fn so every call records its latency under name"""
+        record = self.histogram(name).record
+        clock = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(clock() - start)
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def counted(self, name, fn):
+        """Wrap fn so every call increments the counter name"""
+        self.counters.setdefault(name, 0)
+        counters = self.counters
+
+        def wrapper(*args, **kwargs):
+            counters[name] += 1
+            return fn(*args, **kwargs)
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def _gauge_values(self):
+        values = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                values[name] = fn()
+            except Exception:
+                values[name] = None
+        return values
+
+    def to_dict(self):
+        """Snapshot of every metric as plain JSON-able values"""
+        return {
+            'timestamp': time.time(),
+            'uptime_s': time.time() - self.started,
+            'latency': {name: hist.summary() for name, hist in list(self.histograms.items())},
+            'counters': dict(self.counters),
+            'gauges': self._gauge_values(),
+        }
+
+    def prometheus_text(self):
+        """Every metric in the Prometheus text exposition format"""
+        lines = ['# HELP fvg_latency_seconds Latency per bot stage',
+                 '# TYPE fvg_latency_seconds summary']
+        for name, hist in list(self.histograms.items()):
+            for q in QUANTILES:
+                lines.append(f'fvg_latency_seconds{{stage="{name}",quantile="{q:g}"}} {hist.percentile(q) / 1e9:.9f}')
+            lines.append(f'fvg_latency_seconds_sum{{stage="{name}"}} {hist.sum_ns / 1e9:.9f}')
+            lines.append(f'fvg_latency_seconds_count{{stage="{name}"}} {hist.total}')
+
+        lines += ['# HELP fvg_latency_max_seconds Slowest call per bot stage',
+                  '# TYPE fvg_latency_max_seconds gauge']
+        for name, hist in list(self.histograms.items()):
+            lines.append(f'fvg_latency_max_seconds{{stage="{name}"}} {hist.max_ns / 1e9:.9f}')
+
+        for name, value in list(self.counters.items()):
+            lines += [f'# TYPE fvg_{name}_total counter', f'fvg_{name}_total {value}']
+        for name, value in self._gauge_values().items():
+            if value is not None:
+                lines += [f'# TYPE fvg_{name} gauge', f'fvg_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Serves /metrics over HTTP (Prometheus text) and/or dumps JSON periodically, off the trading thread"""
+
+    def __init__(self, metrics, port=None, host='127.0.0.1', json_path=None, json_interval=10.0):
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.json_path = json_path
+        self.json_interval = json_interval
+        self.server = None
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        if self.port is not None:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] not in ('/metrics', '/'):
+                        self.send_error(404)
+                        return
+                    body = metrics.prometheus_text().encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # keep scrapes out of the bot log
+
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self.server.daemon_threads = True
+            self.port = self.server.server_address[1]
+            self._spawn(self.server.serve_forever, 'metrics-http')
+            logger.info(f"Metrics at http://{self.host}:{self.port}/metrics")
+
+        if self.json_path:
+            self._spawn(self._dump_loop, 'metrics-json')
+            logger.info(f"Metrics dumped to {self.json_path} every {self.json_interval:g}s")
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def dump_json(self):
+        """Write the current metrics to json_path atomically"""
+        try:
+            tmp_path = f'{self.json_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.metrics.to_dict(), f, indent=2)
+            os.replace(tmp_path, self.json_path)
+        except Exception as e:
+            logger.error(f"Error writing metrics: {e}")
+
+    def _dump_loop(self):
+        while not self.stop_event.wait(self.json_interval):
+            self.dump_json()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.json_path:
+            self.dump_json()
@@ -0,0 +1,229 @@
+import os
+import time
+import struct
+import logging
+from collections import deque
+
+import numpy as np
+
+from signal_writer import AppendFile
+
+logger = logging.getLogger(__name__)
+
+LEDGER_MAGIC = b'FVGL'
+LEDGER_VERSION = 1
+LEDGER_HEADER = struct.Struct('<4sHxx')
+
+# One fixed-width record per signal sent - the ledger is read back as a single array
+LEDGER_DTYPE = np.dtype([
+    ('wall_time', 'datetime64[ns]'),    # when the signal was written (UTC)
+    ('signal_time', 'datetime64[ns]'),  # tick time the signal fired on
+    ('zone_time', 'datetime64[ns]'),    # close of the bar that formed the zone (NaT if unknown)
+    ('bar_time', 'datetime64[ns]'),     # latest processed bar when the signal fired (NaT if none)
+    ('direction', np.int8),             # LONG / SHORT
+    ('entry_cents', np.int64),          # entry price in hundredths - exact key, no float compare
+    ('zone_bottom', np.float64),
+    ('zone_top', np.float64),
+])
+
+DIRECTIONS = {'LONG': 1, 'SHORT': -1}
+
+# Suppression rules - a bot's signal_rules override any of these
+DEFAULT_RULES = {
+    'once_per_bar': True,    # one signal per zone, direction and entry price per bar
+    'repeat_seconds': 900,   # same direction and entry price again only after this long (0 = off)
+    'max_per_hour': 0,       # signals across all zones per rolling hour (0 = no limit)
+}
+
+HOUR_NS = 3600 * 10**9
+NAT = int(np.iinfo(np.int64).min)  # NaT as epoch ns
+
+
+# Records scanned per step when looking for the start of the recent tail
+TAIL_CHUNK = 4096
+
+
+def read_ledger(path):
+    """Every record of a ledger file as a read-only LEDGER_DTYPE memory map (empty if missing or unreadable)"""
+    empty = np.zeros(0, dtype=LEDGER_DTYPE)
+    if not os.path.exists(path) or os.path.getsize(path) < LEDGER_HEADER.size:
+        return empty
+    try:
+        with open(path, 'rb') as f:
+            magic, version = LEDGER_HEADER.unpack(f.read(LEDGER_HEADER.size))
+        if magic != LEDGER_MAGIC or version != LEDGER_VERSION:
+            logger.error(f"Ignoring signal ledger with an unknown format: {path}")
+            return empty
+        # A record torn by a crash is left out
+        count = (os.path.getsize(path) - LEDGER_HEADER.size) // LEDGER_DTYPE.itemsize
+        if not count:
+            return empty
+        return np.memmap(path, dtype=LEDGER_DTYPE, mode='r', offset=LEDGER_HEADER.size, shape=(count,))
+    except Exception as e:
+        logger.error(f"Error reading signal ledger {path}: {e}")
+        return empty
+
+
+def recent_records(records, retention_ns):
+    """Copy of the records whose signal time is within retention_ns of the newest, oldest first
+
+    Records are appended in time order, so only the tail is read - in
+    TAIL_CHUNK steps back from the end until a chunk reaches past the cutoff.
+    """
+    times = records['signal_time'].view(np.int64)
+    start = max(len(records) - TAIL_CHUNK, 0)
+    cutoff = times[start:].max() - retention_ns
+    while start > 0 and times[start] >= cutoff:
+        start = max(start - TAIL_CHUNK, 0)
+    tail = np.array(records[start:])
+    tail = tail[tail['signal_time'].view(np.int64) >= cutoff]
+    return tail[np.argsort(tail['signal_time'], kind='stable')]
+
+
+class SignalLedger:
+    """Append-only ledger of sent signals with a hash index for O(1) duplicate and rate-limit checks
+
+    Each signal is keyed by (zone, direction, entry price, bar). check()
+    answers from in-memory dicts before anything is written; record() holds
+    the signal as pending (check() sees it, so a second signal queued behind
+    it is caught) and returns the ledger record, which write() appends to
+    the file - in the async runtime that happens on the signal thread.
+    settle() indexes the signal once it was written, or forgets it if the
+    write failed, so an unsent signal never suppresses a later one.
+
+    At startup only the tail of the ledger that the rules can still see is
+    read (from a memory map, back from the end), so years of signals load
+    in milliseconds. A file with a torn final record is
+    repaired on open so later records stay aligned.
+    """
+
+    def __init__(self, path, rules=None):
+        self.path = path
+        self.rules = dict(DEFAULT_RULES, **(rules or {}))
+        unknown = set(self.rules) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"Unknown signal rules: {sorted(unknown)}")
+
+        # How far back any rule looks - older signals drop out of the index (a bar stays the
+        # latest one for up to a day over the daily and weekend breaks)
+        self.retention_ns = max(int(self.rules['repeat_seconds'] * 1e9),
+                                HOUR_NS if self.rules['max_per_hour'] else 0,
+                                24 * HOUR_NS if self.rules['once_per_bar'] else 0)
+
+        self.keys = {}            # (zone_ns, direction, entry_cents, bar_ns) -> signal time (ns)
+        self.last_at_price = {}   # (direction, entry_cents) -> signal time (ns) of the last one
+        self.recent = deque()     # (signal time ns, key) in the order written
+        self.last_hour = deque()  # signal times (ns) of the last hour, for max_per_hour
+        self.pending = {}         # key -> signal time (ns) of signals recorded but not written yet
+        self.suppressed = 0
+        self.file = AppendFile(path) if path else None
+
+        if path:
+            self.open()
+
+    def open(self):
+        """Write the header of a new ledger, cut a torn final record, and index the recent signals"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self.file.write(LEDGER_HEADER.pack(LEDGER_MAGIC, LEDGER_VERSION))
+            return
+
+        size = os.path.getsize(self.path)
+        torn = (size - LEDGER_HEADER.size) % LEDGER_DTYPE.itemsize if size >= LEDGER_HEADER.size else 0
+        if torn:
+            logger.warning(f"Signal ledger ended in a partial record - dropping its last {torn} bytes")
+            os.truncate(self.path, size - torn)
+
+        records = read_ledger(self.path)
+        if len(records) and self.retention_ns:
+            self.load(recent_records(records, self.retention_ns))
+        logger.info(f"Signal ledger: {len(records)} signals, {len(self.recent)} within the suppression window")
+
+    def load(self, recent):
+        """Index records the rules can still see (oldest first)"""
+        for signal_ns, zone_ns, bar_ns, direction, entry_cents in zip(
+                recent['signal_time'].view(np.int64).tolist(), recent['zone_time'].view(np.int64).tolist(),
+                recent['bar_time'].view(np.int64).tolist(), recent['direction'].tolist(),
+                recent['entry_cents'].tolist()):
+            self._add((zone_ns, direction, entry_cents, bar_ns), signal_ns)
+
+    def key(self, zone_ns, direction, entry_price, bar_ns):
+        """Index key of a signal - missing zone / bar times are NaT, like in the file"""
+        return (NAT if zone_ns is None else zone_ns, DIRECTIONS[direction], int(round(entry_price * 100)),
+                NAT if bar_ns is None else bar_ns)
+
+    def _add(self, key, signal_ns):
+        self.keys[key] = signal_ns
+        self.last_at_price[key[1:3]] = signal_ns
+        self.recent.append((signal_ns, key))
+        self.last_hour.append(signal_ns)
+
+    def _expire(self, now_ns):
+        """Drop signals older than every rule's window from the index"""
+        last_hour = self.last_hour
+        while last_hour and last_hour[0] <= now_ns - HOUR_NS:
+            last_hour.popleft()
+
+        recent = self.recent
+        while recent and recent[0][0] < now_ns - self.retention_ns:
+            signal_ns, key = recent.popleft()
+            if self.keys.get(key) == signal_ns:
+                del self.keys[key]
+            if self.last_at_price.get(key[1:3]) == signal_ns:
+                del self.last_at_price[key[1:3]]
+
+    def check(self, key, signal_ns):
+        """Reason the rules suppress this signal, or None to send it"""
+        self._expire(signal_ns)
+        rules = self.rules
+        if rules['once_per_bar'] and (key in self.keys or key in self.pending):
+            return "already signalled for this zone on this bar"
+
+        last = self.last_at_price.get(key[1:3])
+        for pending_key, pending_ns in self.pending.items():
+            if pending_key[1:3] == key[1:3] and (last is None or pending_ns > last):
+                last = pending_ns
+        if rules['repeat_seconds'] and last is not None and signal_ns - last < rules['repeat_seconds'] * 1e9:
+            return f"same entry {(signal_ns - last) / 1e9:.0f}s ago (repeat_seconds {rules['repeat_seconds']})"
+
+        sent = len(self.last_hour) + sum(1 for pending_ns in self.pending.values()
+                                         if pending_ns > signal_ns - HOUR_NS)
+        if rules['max_per_hour'] and sent >= rules['max_per_hour']:
+            return f"{sent} signals in the last hour (max_per_hour {rules['max_per_hour']})"
+        return None
+
+    def record(self, key, signal_ns, zone_bottom, zone_top):
+        """Hold a signal being sent as pending - returns its ledger record for write() and settle()"""
+        self.pending[key] = signal_ns
+        record = np.zeros(1, dtype=LEDGER_DTYPE)
+        record['signal_time'] = np.int64(signal_ns).view('datetime64[ns]')
+        record['zone_time'] = np.int64(key[0]).view('datetime64[ns]')
+        record['bar_time'] = np.int64(key[3]).view('datetime64[ns]')
+        record['direction'] = key[1]
+        record['entry_cents'] = key[2]
+        record['zone_bottom'] = zone_bottom
+        record['zone_top'] = zone_top
+        return record
+
+    def settle(self, record, written):
+        """Index a pending signal once it was written, or drop it if writing it failed"""
+        key = (int(record['zone_time'].view(np.int64)[0]), int(record['direction'][0]),
+               int(record['entry_cents'][0]), int(record['bar_time'].view(np.int64)[0]))
+        signal_ns = self.pending.pop(key, None)
+        if written and signal_ns is not None:
+            self._add(key, signal_ns)
+
+    def write(self, record):
+        """Append a record from record() as one write"""
+        if self.file is None:
+            return
+        record['wall_time'] = np.int64(time.time_ns()).view('datetime64[ns]')
+        self.file.write(record.tobytes())
+
+    def fsync(self):
+        if self.file is not None:
+            self.file.fsync()
+
+    def close(self):
+        if self.file is not None:
+            self.file.fsync()
+            self.file.close()
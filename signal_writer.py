@@ -0,0 +1,227 @@
+import os
+import time
+import logging
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+JOURNAL_HEADER = 'Seq,Event,WallTimeNs,DateTime,Direction,Entry_Price,Zone_Bottom,Zone_Top\n'
+
+
+class AppendFile:
+    """Append-only file, kept open between writes unless keep_open is False
+
+    Each record is a single os.write on an O_APPEND descriptor, so it lands
+    at the current end of the file as one piece even after another process
+    (fvgbot.cs) truncates the file. If the file is deleted or replaced the
+    handle is reopened on the next write.
+
+    With keep_open=False the file is opened for each write and closed right
+    after (and briefly reopened to fsync) - for files another process reads
+    and rewrites on Windows, where an open write handle makes its
+    FileShare.Read opens fail.
+    """
+
+    def __init__(self, path, header=None, keep_open=True):
+        self.path = path
+        self.header = header
+        self.keep_open = keep_open
+        self.fd = None
+        self.file_id = None
+        self.dirty = False  # written since the last fsync
+
+    def _open(self):
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        self.fd = os.open(self.path, flags, 0o644)
+        stat = os.fstat(self.fd)
+        self.file_id = (stat.st_dev, stat.st_ino)
+        if stat.st_size == 0 and self.header:
+            os.write(self.fd, self.header.encode())
+
+    def _check_replaced(self):
+        """Reopen if the path no longer refers to the open file"""
+        try:
+            stat = os.stat(self.path)
+            if (stat.st_dev, stat.st_ino) == self.file_id:
+                return
+        except OSError:
+            pass
+        self.close()
+
+    def write(self, data):
+        """Append bytes as one write - returns the number of bytes written"""
+        if self.fd is not None:
+            self._check_replaced()
+        if self.fd is None:
+            self._open()
+        try:
+            written = os.write(self.fd, data)
+        finally:
+            if not self.keep_open:
+                self.close()
+        self.dirty = True
+        return written
+
+    def fsync(self):
+        if not self.dirty:
+            return
+        if self.fd is not None:
+            os.fsync(self.fd)
+        elif not self.keep_open and os.path.exists(self.path):
+            fd = os.open(self.path, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.dirty = False
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+            self.file_id = None
+
+
+class SignalWriter:
+    """Writes trade signals for NinjaTrader on the critical path - journal, fsync policy
+
+    The journal and trades log stay open between signals. trade_signals.csv
+    is opened for each signal and closed at once, so fvgbot.cs can read and
+    clear it on Windows without a sharing violation.
+
+    Per signal, in order:
+      1. journal INTENT record (sequence number + signal)
+      2. trade_signals.csv line (what fvgbot.cs acts on)
+      3. trades_taken.csv line
+      4. journal WRITTEN record
+    A restart reads the journal to recover the next sequence number and to
+    report signals whose delivery was interrupted. Durability follows
+    fsync_policy: 'always' fsyncs every file after each signal, 'interval'
+    fsyncs at most every fsync_interval seconds (from write or
+    sync_if_due), 'never' leaves it to the OS. The fsync happens after the
+    signal line is visible, so it never delays NinjaTrader seeing it.
+    """
+
+    def __init__(self, signals_path, trades_log_path, journal_path, fsync_policy='always',
+                 fsync_interval=1.0, latency_budget_ms=5.0, header='DateTime,Direction,Entry_Price\r\n'):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {FSYNC_POLICIES}, got {fsync_policy!r}")
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.latency_budget_ns = int(latency_budget_ms * 1e6)
+
+        self.signals = AppendFile(signals_path, header, keep_open=False)
+        self.trades_log = AppendFile(trades_log_path, header)
+        self.journal = AppendFile(journal_path, JOURNAL_HEADER) if journal_path else None
+        self.files = [f for f in (self.signals, self.trades_log, self.journal) if f is not None]
+        self.last_fsync = time.monotonic()
+
+        # Latency samples (ns) of the trade_signals.csv write and the whole signal
+        self.write_latencies = deque(maxlen=1000)
+        self.total_latencies = deque(maxlen=1000)
+        self.over_budget = 0
+
+        self.next_seq = 1
+        self.undelivered = []
+        if self.journal is not None:
+            self.recover()
+
+    def recover(self):
+        """Read the journal - sets next_seq and returns signals with an INTENT but no WRITTEN record"""
+        intents = {}
+        last_seq = 0
+        if os.path.exists(self.journal.path):
+            with open(self.journal.path, 'rb') as f:
+                data = f.read()
+            lines = data.decode(errors='replace').split('\n')
+            if lines[-1]:
+                # Final line torn by a crash - ignore it and start the next record on a new line
+                self.journal.write(b'\n')
+
+            for line in lines[:-1]:
+                parts = line.rstrip('\r').split(',')
+                if len(parts) < 2 or not parts[0].isdigit():
+                    continue  # header
+                seq = int(parts[0])
+                last_seq = max(last_seq, seq)
+                if parts[1] == 'INTENT':
+                    intents[seq] = parts[3:]
+                elif parts[1] == 'WRITTEN':
+                    intents.pop(seq, None)
+
+        self.next_seq = last_seq + 1
+        self.undelivered = [(seq, fields) for seq, fields in sorted(intents.items())]
+        for seq, fields in self.undelivered:
+            logger.warning(f"Signal #{seq} was not fully written before the last shutdown: {','.join(fields)}")
+        return self.undelivered
+
+    def write(self, signal_datetime, direction, entry_price, zone_bottom=None, zone_top=None):
+        """Deliver one signal - returns its sequence number"""
+        start = time.perf_counter_ns()
+        seq = self.next_seq
+        self.next_seq += 1
+
+        time_str = signal_datetime.strftime('%m/%d/%Y %H:%M:%S')
+        line = f"{time_str},{direction},{entry_price:.2f}\r\n".encode()
+
+        if self.journal is not None:
+            zone = f"{zone_bottom:.2f},{zone_top:.2f}" if zone_bottom is not None else ','
+            self.journal.write(f"{seq},INTENT,{time.time_ns()},{time_str},{direction},{entry_price:.2f},{zone}\n".encode())
+
+        self.signals.write(line)
+        write_ns = time.perf_counter_ns() - start
+
+        self.trades_log.write(line)
+        if self.journal is not None:
+            self.journal.write(f"{seq},WRITTEN,{time.time_ns()}\n".encode())
+
+        if self.fsync_policy == 'always':
+            self.fsync()
+        else:
+            self.sync_if_due()
+
+        total_ns = time.perf_counter_ns() - start
+        self.write_latencies.append(write_ns)
+        self.total_latencies.append(total_ns)
+        if total_ns > self.latency_budget_ns:
+            self.over_budget += 1
+            logger.warning(f"Signal #{seq} write took {total_ns / 1e6:.2f}ms "
+                           f"(budget {self.latency_budget_ns / 1e6:.2f}ms, signal line {write_ns / 1e6:.3f}ms)")
+        return seq
+
+    def add_file(self, append_file):
+        """Fsync and close another AppendFile along with the signal files (the signal ledger)"""
+        self.files.append(append_file)
+
+    def fsync(self):
+        """Flush every file to stable storage"""
+        for f in self.files:
+            f.fsync()
+        self.last_fsync = time.monotonic()
+
+    def sync_if_due(self):
+        """fsync under the 'interval' policy once fsync_interval has passed"""
+        if self.fsync_policy == 'interval' and time.monotonic() - self.last_fsync >= self.fsync_interval:
+            self.fsync()
+
+    def latency_stats(self):
+        """Write latency percentiles in milliseconds (signal line and whole signal)"""
+        stats = {'count': len(self.total_latencies), 'over_budget': self.over_budget}
+        for name, samples in (('write', self.write_latencies), ('total', self.total_latencies)):
+            if samples:
+                p50, p99 = np.percentile(np.fromiter(samples, dtype=np.int64), [50, 99]) / 1e6
+                stats[f'{name}_p50_ms'] = float(p50)
+                stats[f'{name}_p99_ms'] = float(p99)
+                stats[f'{name}_max_ms'] = max(samples) / 1e6
+        return stats
+
+    def close(self):
+        """fsync (unless the policy is 'never') and close every handle"""
+        if self.fsync_policy != 'never':
+            self.fsync()
+        for f in self.files:
+            f.close()
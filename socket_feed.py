@@ -0,0 +1,183 @@
+import os
+import time
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import BAR_DATETIME_FORMAT, parse_bar_times
+
+logger = logging.getLogger(__name__)
+
+# Longest line accepted before the connection is dropped (a sender that never sends a newline)
+MAX_LINE = 4096
+
+READ_SIZE = 65536
+
+
+def parse_address(address):
+    """'host:port', 'tcp://host:port' or 'unix:///path' -> ('tcp', (host, port)) or ('unix', path)"""
+    if address.startswith('unix://'):
+        return 'unix', address[len('unix://'):]
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    host, _, port = address.rpartition(':')
+    if not port.isdigit():
+        raise ValueError(f"Feed address must be host:port or unix:///path, got {address!r}")
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+
+class FeedParser:
+    """Incremental parser for the socket feed line protocol
+
+        T,<MM/dd/yyyy HH:mm:ss>,<last>\\n                      tick
+        B,<MM/dd/yyyy HH:mm:ss>,<open>,<high>,<low>,<close>\\n  closed bar
+
+    Received bytes are appended to one bytearray that is reused for the life
+    of the connection; complete lines are consumed from its front and a
+    partial last line stays for the next read. Ticks come out as the same
+    (datetime_str, price) tuples LiveFeedReader produces, bars as
+    (time_ns, open, high, low, close) tuples ready for the bar window - the
+    times of each run of bars are parsed in one vectorized call.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.bad_lines = 0
+
+    def feed(self, data):
+        """Add received bytes - returns [('ticks', [...]) | ('bars', [...])] in arrival order"""
+        self.buffer += data
+        end = self.buffer.rfind(b'\n')
+        if end < 0:
+            if len(self.buffer) > MAX_LINE:
+                raise ValueError(f"Feed line longer than {MAX_LINE} bytes")
+            return []
+
+        lines = self.buffer[:end].split(b'\n')
+        del self.buffer[:end + 1]
+
+        events = []
+        ticks = []
+        bars = []
+        for line in lines:
+            parts = line.rstrip(b'\r').split(b',')
+            try:
+                if parts[0] == b'T' and len(parts) == 3:
+                    if bars:
+                        events.append(('bars', self.bar_rows(bars)))
+                        bars = []
+                    ticks.append((parts[1].decode('ascii'), float(parts[2])))
+                elif parts[0] == b'B' and len(parts) == 6:
+                    if ticks:
+                        events.append(('ticks', ticks))
+                        ticks = []
+                    bars.append((parts[1].decode('ascii'), float(parts[2]), float(parts[3]),
+                                 float(parts[4]), float(parts[5])))
+                elif line.strip():
+                    self.bad_lines += 1
+            except ValueError:
+                self.bad_lines += 1
+
+        if ticks:
+            events.append(('ticks', ticks))
+        if bars:
+            events.append(('bars', self.bar_rows(bars)))
+        return [(kind, payload) for kind, payload in events if payload]
+
+    def bar_rows(self, bars):
+        """(datetime_str, o, h, l, c) bars -> (time_ns, o, h, l, c), dropping unparseable times"""
+        strings = [bar[0] for bar in bars]
+        times = parse_bar_times(strings)
+        if times is None:
+            times = pd.to_datetime(strings, format=BAR_DATETIME_FORMAT, errors='coerce').to_numpy()
+        times_ns = times.astype('datetime64[ns]').view(np.int64).tolist()
+        rows = [(time_ns,) + bar[1:] for time_ns, bar in zip(times_ns, bars) if time_ns != np.iinfo(np.int64).min]
+        self.bad_lines += len(bars) - len(rows)
+        return rows
+
+
+class SocketFeed:
+    """TCP / Unix-socket listener that feeds ticks and bars to an AsyncRuntime instead of the CSV files
+
+    HistoricalData.csv is still read once at startup to build the zones;
+    after that every bar and tick comes from the socket (the sender must
+    send both). Messages go through the same zone logic as the CSV path.
+    Each connection waits on the runtime's bounded event queue, so a slow
+    zone task pushes back on the sender through TCP flow control.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.kind, self.target = parse_address(address)
+        self.server = None
+        self.connections = {}  # writer -> handler task
+        self.messages = 0
+
+    async def serve(self, runtime):
+        """Accept connections until the runtime stops"""
+        if self.kind == 'unix':
+            if os.path.exists(self.target):
+                os.unlink(self.target)  # stale socket from an earlier run
+            self.server = await asyncio.start_unix_server(lambda r, w: self.handle(runtime, r, w), self.target)
+        else:
+            host, port = self.target
+            self.server = await asyncio.start_server(lambda r, w: self.handle(runtime, r, w), host, port)
+        logger.info(f"Socket feed listening on {self.address}")
+
+        try:
+            await runtime.stopping.wait()
+        finally:
+            self.server.close()
+            # Closing a connection ends its handler; wait for what they already read to be queued
+            handlers = list(self.connections.values())
+            for writer in list(self.connections):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self.server.wait_closed()
+            if self.kind == 'unix' and os.path.exists(self.target):
+                os.unlink(self.target)
+
+    async def handle(self, runtime, reader, writer):
+        """Read one sender's stream and queue its ticks and bars for the zone task"""
+        bot = runtime.bot
+        peer = writer.get_extra_info('peername') or self.address
+        parser = FeedParser()
+        parse = parser.feed
+        if bot.metrics is not None:
+            parse = bot.metrics.timed('socket_parse', parse)
+
+        self.connections[writer] = asyncio.current_task()
+        logger.info(f"Feed connected: {peer}")
+        try:
+            while not runtime.stopping.is_set():
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                for kind, payload in parse(data):
+                    self.messages += len(payload)
+                    if kind == 'ticks':
+                        await self.queue_ticks(runtime, payload)
+                    else:
+                        # A run of bars is one event - the zone task adds them to the bar window in turn
+                        await runtime.put_event(('bar_rows', payload))
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Feed connection {peer} dropped: {e}")
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+            if parser.bad_lines:
+                logger.warning(f"Feed {peer}: skipped {parser.bad_lines} malformed lines")
+            logger.info(f"Feed disconnected: {peer}")
+
+    async def queue_ticks(self, runtime, ticks):
+        bot = runtime.bot
+        # Keep the bot's latest-tick view current (status display and summaries read it)
+        bot.live_feed.last_datetime, bot.live_feed.last_price = ticks[-1]
+        if bot.tick_archive is not None:
+            bot.tick_archive.append(ticks)
+        if bot.metrics is not None:
+            bot.last_tick_read_ns = time.perf_counter_ns()
+            bot.metrics.count('ticks', len(ticks))
+        await runtime.put_event(('ticks', ticks))
@@ -0,0 +1,256 @@
+import os
+import time
+import mmap
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STATE_MAGIC = b'FVGS'
+STATE_VERSION = 1
+
+# Higher-timeframe names the region has room for (the hourly zones are timeframe 0)
+MAX_TIMEFRAMES = 4
+
+# Fixed header at the start of the region - seq is the seqlock counter (odd while a write is in progress)
+STATE_HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', np.uint16),
+    ('running', np.uint8),              # 0 once the bot shut down cleanly
+    ('zones_in_cooldown', np.uint8),    # any hourly zone waiting for the next bar
+    ('capacity', np.uint32),            # zone rows the region holds
+    ('zone_count', np.uint32),          # rows valid in this version
+    ('seq', np.uint64),
+    ('pid', np.int64),
+    ('started_ns', np.int64),           # publisher start - changes when the bot restarts
+    ('published_ns', np.int64),         # wall clock of the last publish (epoch ns)
+    ('price', np.float64),              # NaN before the first tick
+    ('last_bar_ns', np.int64),          # close of the last processed bar (0 if none)
+    ('instrument', 'S16'),
+    ('timeframes', 'S8', (MAX_TIMEFRAMES,)),
+    ('timeframe_count', np.uint32),
+    ('zones_total', np.uint32),         # zones tracked - more than zone_count if the table overflowed
+    ('signals_sent', np.int64),
+    ('signals_suppressed', np.int64),
+    ('bars', np.int64),
+    ('publishes', np.int64),
+], align=True)
+
+# One row per unfilled zone - hourly first, then each higher timeframe
+STATE_ZONE_DTYPE = np.dtype([
+    ('timeframe', np.int8),             # 0 = hourly, n = header timeframes[n - 1]
+    ('type', np.int8),                  # BULLISH / BEARISH
+    ('trade_taken', np.bool_),          # in cooldown
+    ('price_was_outside', np.bool_),
+    ('bottom', np.float64),
+    ('top', np.float64),
+    ('gap_size', np.float64),
+    ('time', 'datetime64[ns]'),         # close of the bar that formed the zone (NaT if unknown)
+], align=True)
+
+# Zone rows start on a cache line
+ZONES_OFFSET = (STATE_HEADER_DTYPE.itemsize + 63) // 64 * 64
+
+ZONE_TYPES = {'bullish': 1, 'bearish': -1}
+ZONE_TYPE_NAMES = {code: name for name, code in ZONE_TYPES.items()}
+
+
+def region_size(capacity):
+    return ZONES_OFFSET + capacity * STATE_ZONE_DTYPE.itemsize
+
+
+def map_region(mm, capacity):
+    """(header, zones) NumPy views straight onto a mapped region"""
+    header = np.ndarray((), dtype=STATE_HEADER_DTYPE, buffer=mm, offset=0)
+    zones = np.ndarray((capacity,), dtype=STATE_ZONE_DTYPE, buffer=mm, offset=ZONES_OFFSET)
+    return header, zones
+
+
+class StatePublisher:
+    """Publishes zone table, price, cooldown state and counters into a memory-mapped file
+
+    A single writer updates the region in place under a seqlock: seq is made
+    odd, the fields and zone rows are written, then seq is made even again.
+    Readers (StateReader, in any process) copy what they need and retry if
+    seq was odd or moved - the writer never waits for them and never makes
+    a system call to publish, so a slow or stuck viewer cannot stall the
+    trading loop. Stores are plain memory writes in program order, which
+    x86 keeps; the counter is what readers validate against.
+
+    The file is reused in place when the bot restarts with the same
+    capacity (a viewer can keep it mapped) and replaced otherwise. More
+    zones than capacity are published closest-to-price first.
+    """
+
+    def __init__(self, path, capacity=1024):
+        self.path = path
+        self.capacity = capacity
+        self.mm = None
+        self.header = None
+        self.zones = None
+        self.open()
+
+    def open(self):
+        size = region_size(self.capacity)
+        if os.path.exists(self.path) and os.path.getsize(self.path) == size:
+            f = open(self.path, 'r+b')
+        else:
+            # New layout - build it beside the old file, then swap it in
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'wb') as tmp:
+                tmp.truncate(size)
+            os.replace(tmp_path, self.path)
+            f = open(self.path, 'r+b')
+        try:
+            self.mm = mmap.mmap(f.fileno(), size)
+        finally:
+            f.close()
+        self.header, self.zones = map_region(self.mm, self.capacity)
+
+        header = self.header
+        header['seq'] = header['seq'] | 1
+        header['magic'] = STATE_MAGIC
+        header['version'] = STATE_VERSION
+        header['capacity'] = self.capacity
+        header['zone_count'] = 0
+        header['zones_total'] = 0
+        header['pid'] = os.getpid()
+        header['started_ns'] = time.time_ns()
+        header['published_ns'] = 0
+        header['price'] = np.nan
+        header['publishes'] = 0
+        header['running'] = 1
+        header['seq'] = header['seq'] + 1
+
+    def publish(self, price, instrument, zones, timeframe_zones, counters, last_bar_ns=None):
+        """Write one consistent version of the bot's state
+
+        zones are the hourly zone objects, timeframe_zones (name, zones) per
+        higher timeframe; only unfilled zones are published. counters holds
+        signals_sent, signals_suppressed and bars.
+        """
+        rows = [(0, fvg) for fvg in zones if not fvg.filled]
+        in_cooldown = any(fvg.trade_taken for _, fvg in rows)
+        names = []
+        for number, (name, tf_zones) in enumerate(timeframe_zones[:MAX_TIMEFRAMES], start=1):
+            names.append(name)
+            rows += [(number, fvg) for fvg in tf_zones if not fvg.filled]
+
+        total = len(rows)
+        if total > self.capacity:
+            if price is not None:
+                rows.sort(key=lambda row: min(abs(row[1].bottom - price), abs(row[1].top - price)))
+            rows = rows[:self.capacity]
+        count = len(rows)
+
+        header = self.header
+        table = self.zones[:count]
+        header['seq'] = header['seq'] + 1  # odd - readers retry until the write completes
+
+        if count:
+            table['timeframe'] = [number for number, _ in rows]
+            table['type'] = [ZONE_TYPES[fvg.type] for _, fvg in rows]
+            table['trade_taken'] = [fvg.trade_taken for _, fvg in rows]
+            table['price_was_outside'] = [fvg.price_was_outside for _, fvg in rows]
+            table['bottom'] = [fvg.bottom for _, fvg in rows]
+            table['top'] = [fvg.top for _, fvg in rows]
+            table['gap_size'] = [fvg.gap_size for _, fvg in rows]
+            table['time'] = np.array([fvg.time_ns if fvg.time_ns is not None else np.iinfo(np.int64).min
+                                      for _, fvg in rows], dtype=np.int64).view('datetime64[ns]')
+        header['zone_count'] = count
+        header['zones_total'] = total
+        header['zones_in_cooldown'] = in_cooldown
+        header['price'] = np.nan if price is None else price
+        header['instrument'] = instrument.encode()[:16]
+        header['timeframes'] = [name.encode()[:8] for name in names] + [b''] * (MAX_TIMEFRAMES - len(names))
+        header['timeframe_count'] = len(names)
+        header['last_bar_ns'] = last_bar_ns or 0
+        header['signals_sent'] = counters.get('signals_sent', 0)
+        header['signals_suppressed'] = counters.get('signals_suppressed', 0)
+        header['bars'] = counters.get('bars', 0)
+        header['published_ns'] = time.time_ns()
+        header['publishes'] = header['publishes'] + 1
+
+        header['seq'] = header['seq'] + 1  # even - this version is complete
+
+    def close(self):
+        """Mark the region stopped and unmap it"""
+        if self.mm is None:
+            return
+        header = self.header
+        header['seq'] = header['seq'] + 1
+        header['running'] = 0
+        header['seq'] = header['seq'] + 1
+        self.header = self.zones = None
+        self.mm.flush()
+        self.mm.close()
+        self.mm = None
+
+
+class StateReader:
+    """Reads a StatePublisher region from another process - never blocks or signals the writer
+
+    read() copies the header and the valid zone rows straight out of the
+    mapping and returns them if the seqlock counter was even and unchanged
+    around the copy. The file is re-mapped when the publisher replaces it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mm = None
+        self.file_id = None
+        self.header = None
+        self.zones = None
+
+    def _map(self):
+        """Map the region if it is new or was replaced - returns False if there is nothing valid to read"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self.close()
+            return False
+        file_id = (stat.st_dev, stat.st_ino, stat.st_size)
+        if file_id == self.file_id and self.mm is not None:
+            return True
+
+        self.close()
+        if stat.st_size < ZONES_OFFSET:
+            return False
+        with open(self.path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), stat.st_size, access=mmap.ACCESS_READ)
+        header = np.ndarray((), dtype=STATE_HEADER_DTYPE, buffer=mm, offset=0)
+        capacity = int(header['capacity'])
+        valid = (header['magic'] == STATE_MAGIC and header['version'] == STATE_VERSION
+                 and region_size(capacity) == stat.st_size)
+        del header  # the map can't be closed while a view of it exists
+        if not valid:
+            mm.close()
+            return False
+        self.mm = mm
+        self.file_id = file_id
+        self.header, self.zones = map_region(mm, capacity)
+        return True
+
+    def read(self, retries=100):
+        """(header, zones) copies of one complete version, or None if there is none (yet)"""
+        if not self._map():
+            return None
+        header = self.header
+        for _ in range(retries):
+            seq = int(header['seq'])
+            if seq & 1:
+                time.sleep(0)  # mid-write - let the writer finish
+                continue
+            snapshot = header.copy()
+            zones = self.zones[:min(int(snapshot['zone_count']), len(self.zones))].copy()
+            if int(header['seq']) == seq:
+                return snapshot, zones
+        return None
+
+    def close(self):
+        if self.mm is not None:
+            self.header = self.zones = None
+            self.mm.close()
+            self.mm = None
+        self.file_id = None
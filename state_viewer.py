@@ -0,0 +1,131 @@
+"""Show a running bot's status from its shared state region - the same view as the bot's own display
+
+Usage:
+    python state_viewer.py [data/bot_state.bin] [--fps 4]
+    python state_viewer.py data/MES/bot_state.bin --once
+    python state_viewer.py data/bot_state.bin --json     # one JSON object, for monitors and alerting
+
+Reads the memory-mapped file the bot publishes at its display rate
+(state_publisher.py). The viewer never signals or waits on the bot - start,
+stop and restart either side at any time.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fvg_zone import ZoneView  # noqa: E402
+from state_publisher import ZONE_TYPE_NAMES, StateReader  # noqa: E402
+from status_view import status_lines  # noqa: E402
+from terminal_renderer import TerminalRenderer  # noqa: E402
+
+# Published longer ago than this (seconds) and the bot is shown as not updating
+STALE_SECONDS = 10.0
+
+
+def state_dict(state):
+    """A region read by StateReader as plain values"""
+    header, zones = state
+    names = ['1H'] + [name.decode() for name in header['timeframes'][:int(header['timeframe_count'])]]
+    price = float(header['price'])
+    return {
+        'instrument': header['instrument'].item().decode(),
+        'running': bool(header['running']),
+        'pid': int(header['pid']),
+        'published_ns': int(header['published_ns']),
+        'price': None if price != price else price,
+        'last_bar_ns': int(header['last_bar_ns']) or None,
+        'zones_in_cooldown': bool(header['zones_in_cooldown']),
+        'zones_total': int(header['zones_total']),
+        'signals_sent': int(header['signals_sent']),
+        'signals_suppressed': int(header['signals_suppressed']),
+        'bars': int(header['bars']),
+        'publishes': int(header['publishes']),
+        'zones': [{
+            'timeframe': names[int(zone['timeframe'])] if zone['timeframe'] < len(names) else str(zone['timeframe']),
+            'type': ZONE_TYPE_NAMES.get(int(zone['type']), '?'),
+            'bottom': float(zone['bottom']),
+            'top': float(zone['top']),
+            'gap_size': float(zone['gap_size']),
+            'trade_taken': bool(zone['trade_taken']),
+            'price_was_outside': bool(zone['price_was_outside']),
+        } for zone in zones],
+        'timeframes': names[1:],
+    }
+
+
+def status_snapshot(state):
+    """The status_snapshot() tuple the bot's display is drawn from"""
+    views = {name: [] for name in ['1H'] + state['timeframes']}
+    for zone in state['zones']:
+        views.setdefault(zone['timeframe'], []).append(
+            ZoneView(zone['type'], zone['bottom'], zone['top'], zone['gap_size']))
+    return (state['price'], views['1H'], state['zones_in_cooldown'], state['instrument'],
+            [(name, views[name]) for name in state['timeframes']])
+
+
+def frame_lines(state, path):
+    """The bot's status display plus a footer on how fresh the published state is"""
+    if state is None:
+        return [f"Waiting for a bot to publish to {path}..."]
+    if state['price'] is None:
+        lines = [f"        FVG TRADING BOT - {state['instrument']}", "=" * 60, "", "Waiting for the first price...",
+                 "=" * 60]
+    else:
+        lines = status_lines(status_snapshot(state))
+
+    age = (time.time_ns() - state['published_ns']) / 1e9
+    if not state['running']:
+        status = "Bot stopped"
+    elif age > STALE_SECONDS:
+        status = f"NOT UPDATING - last published {age:.0f}s ago"
+    else:
+        status = f"Published {age:.1f}s ago"
+    lines.append(f" {status} | pid {state['pid']} | Signals: {state['signals_sent']} sent, "
+                 f"{state['signals_suppressed']} suppressed | Bars: {state['bars']}")
+    if state['zones_total'] > len(state['zones']):
+        lines.append(f" Showing the {len(state['zones'])} zones closest to price of {state['zones_total']}")
+    return lines
+
+
+def read_state(reader):
+    state = reader.read()
+    return None if state is None else state_dict(state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', default='data/bot_state.bin', help='state file the bot publishes to')
+    parser.add_argument('--fps', type=float, default=4.0, help='screen refreshes per second')
+    parser.add_argument('--once', action='store_true', help='print one frame and exit')
+    parser.add_argument('--json', action='store_true', help='print the state as JSON and exit')
+    args = parser.parse_args()
+
+    reader = StateReader(args.path)
+    if args.once or args.json:
+        state = read_state(reader)
+        if args.json:
+            print(json.dumps(state))
+        else:
+            print('\n'.join(frame_lines(state, args.path)))
+        reader.close()
+        sys.exit(0 if state is not None else 1)
+
+    renderer = TerminalRenderer(lambda state: frame_lines(state, args.path), fps=args.fps)
+    renderer.start()
+    try:
+        while True:
+            renderer.update(read_state(reader))
+            time.sleep(1.0 / args.fps)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        renderer.stop()
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
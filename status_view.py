@@ -0,0 +1,127 @@
+from datetime import datetime
+
+
+def status_lines(snapshot):
+    """Build the status display, one string per screen line
+
+    snapshot is FVGATITradingBot.status_snapshot() - or the same tuple read
+    back from the shared state region by state_viewer.py.
+    """
+    current_price, active_fvgs, zones_in_cooldown, instrument, timeframe_zones = snapshot
+
+    # Check if any zones are in cooldown
+    system_status = "WAITING (next bar)" if zones_in_cooldown else "ENABLED"
+
+    # Build the entire display as a string buffer first
+    lines = []
+    lines.append(f"        FVG TRADING BOT - System: {system_status}")
+    lines.append("="*60)
+    lines.append("")
+
+    if active_fvgs:
+        # Add distance to each FVG and sort by distance
+        fvgs_with_distance = []
+        for fvg in active_fvgs:
+            # Calculate distance to entry point
+            # Positive = price must go UP, Negative = price must go DOWN
+            if fvg.type == 'bearish':
+                # For LONG zones: entry at BOTTOM
+                # Positive if price needs to rise to reach bottom
+                distance = fvg.bottom - current_price
+            else:  # bullish
+                # For SHORT zones: entry at TOP
+                # Negative if price needs to drop to reach top
+                distance = fvg.top - current_price
+
+            fvgs_with_distance.append({
+                'fvg': fvg,
+                'distance': distance
+            })
+
+        # Sort by absolute distance (closest first)
+        fvgs_with_distance.sort(key=lambda x: abs(x['distance']))
+
+        # Separate by type but keep distance ordering
+        bullish_sorted = [item for item in fvgs_with_distance if item['fvg'].type == 'bullish']
+        bearish_sorted = [item for item in fvgs_with_distance if item['fvg'].type == 'bearish']
+
+        # Display BEARISH gaps (reversed - furthest first, closest to center last)
+        lines.append("   BEARISH GAPS (LONG)     Gap Size     Distance       ")
+        lines.append("-"*60)
+        if bearish_sorted:
+            # Reverse the order so furthest gaps are at top, closest to center at bottom
+            for item in reversed(bearish_sorted):
+                fvg = item['fvg']
+                distance = item['distance']
+                # Show BOTTOM first for bearish zones (price approaches from below)
+                zone_range = f"{fvg.bottom:.2f} - {fvg.top:.2f}"
+                gap_size = f"{fvg.gap_size:.2f}pts"
+                # Show signed distance with arrows (↑ = price needs to go up, ↓ = price needs to go down)
+                if distance > 0:
+                    distance_str = f"↑ {distance:.2f}pts"
+                else:
+                    distance_str = f"↓ {abs(distance):.2f}pts"
+
+                # Check if price is currently in this zone
+                price_in_zone = (current_price >= fvg.bottom and current_price <= fvg.top)
+                zone_annotation = "In Zone" if price_in_zone else ""
+
+                lines.append(f"    {zone_range:<22} {gap_size:<12} {distance_str:<12}{zone_annotation}")
+        else:
+            lines.append("    No bearish gaps")
+
+        # Center line with time, instrument, and price
+        lines.append("")
+        time_str = datetime.now().strftime('%H:%M:%S')
+        center_line = f" {time_str} | Instrument: {instrument} | Current Price: {current_price:.2f}"
+        lines.append(center_line)
+        lines.append("")
+
+        # Display BULLISH gaps (top first - closest to price when looking for shorts)
+        if bullish_sorted:
+            for item in bullish_sorted:
+                fvg = item['fvg']
+                distance = item['distance']
+                # Show TOP first for bullish zones (price approaches from above)
+                zone_range = f"{fvg.top:.2f} - {fvg.bottom:.2f}"
+                gap_size = f"{fvg.gap_size:.2f}pts"
+                # Show signed distance with arrows (↑ = price needs to go up, ↓ = price needs to go down)
+                if distance > 0:
+                    distance_str = f"↑ {distance:.2f}pts"
+                else:
+                    distance_str = f"↓ {abs(distance):.2f}pts"
+
+                # Check if price is currently in this zone
+                price_in_zone = (current_price >= fvg.bottom and current_price <= fvg.top)
+                zone_annotation = "In Zone" if price_in_zone else ""
+
+                lines.append(f"    {zone_range:<22} {gap_size:<12} {distance_str:<12}{zone_annotation}")
+        else:
+            lines.append("    No bullish gaps")
+
+        lines.append("-"*60)
+        lines.append("  BULLISH GAPS (SHORT)     Gap Size     Distance       ")
+    else:
+        lines.append("")
+        lines.append("No active FVGs")
+
+    # One section per higher timeframe - closest zones first
+    for name, zones in timeframe_zones:
+        lines.append("="*60)
+        lines.append(f"   {name} GAPS                 Gap Size     Distance       ")
+        lines.append("-"*60)
+        if not zones:
+            lines.append(f"    No {name} gaps")
+        for fvg in sorted(zones, key=lambda zone: min(abs(zone.bottom - current_price), abs(zone.top - current_price))):
+            # Distance to the nearest edge (0 when price is inside)
+            if current_price < fvg.bottom:
+                distance_str = f"↑ {fvg.bottom - current_price:.2f}pts"
+            elif current_price > fvg.top:
+                distance_str = f"↓ {current_price - fvg.top:.2f}pts"
+            else:
+                distance_str = "In Zone"
+            zone_range = f"{fvg.bottom:.2f} - {fvg.top:.2f}"
+            lines.append(f"    {zone_range:<22} {f'{fvg.gap_size:.2f}pts':<12} {distance_str:<12}{fvg.type}")
+
+    lines.append("="*60)
+    return lines
@@ -0,0 +1,335 @@
+"""Multi-instrument supervisor - one bot per contract, sharded across worker processes
+
+Usage:
+    python supervisor.py MES MNQ M2K                    # data/MES/HistoricalData.csv, data/MNQ/... etc.
+    python supervisor.py --config instruments.json --workers 2
+"""
+import os
+import json
+import time
+import queue
+import signal
+import asyncio
+import logging
+import argparse
+import multiprocessing
+
+from terminal_renderer import TerminalRenderer
+
+logger = logging.getLogger(__name__)
+
+# Bot constructor options an instrument config may set
+BOT_OPTIONS = ('historical_path', 'live_feed_path', 'signals_path', 'trades_log_path', 'snapshot_path',
+               'journal_path', 'batch_ticks', 'watch_backend', 'fsync_policy', 'metrics_port', 'metrics_json_path',
+               'timeframes', 'tick_archive_path', 'rotate_bytes', 'live_bars', 'window_bars',
+               'ledger_path', 'signal_rules', 'state_path', 'session_close')
+
+# Per-instrument files, relative to the instrument's data_dir
+DEFAULT_FILES = {
+    'historical_path': 'HistoricalData.csv',
+    'live_feed_path': 'LiveFeed.csv',
+    'signals_path': 'trade_signals.csv',
+    'trades_log_path': 'trades_taken.csv',
+    'snapshot_path': 'zone_snapshot.npz',
+    'journal_path': 'signal_journal.csv',
+    'ledger_path': 'signal_ledger.bin',
+    'state_path': 'bot_state.bin',
+    'tick_archive_path': 'tick_archive',
+}
+
+# Written by the worker side, read by the supervisor
+OUTPUT_OPTIONS = ('signals_path', 'trades_log_path', 'snapshot_path', 'journal_path', 'ledger_path',
+                  'state_path', 'metrics_json_path')
+
+
+def resolve_config(entry, data_root='data'):
+    """Fill in per-instrument file paths - each instrument gets its own data_dir (default data/<instrument>)"""
+    if isinstance(entry, str):
+        entry = {'instrument': entry}
+    if not entry.get('instrument'):
+        raise ValueError(f"Instrument config needs an 'instrument': {entry}")
+
+    unknown = set(entry) - set(BOT_OPTIONS) - {'instrument', 'data_dir'}
+    if unknown:
+        raise ValueError(f"Unknown options for {entry['instrument']}: {', '.join(sorted(unknown))}")
+
+    config = dict(entry)
+    data_dir = config.pop('data_dir', os.path.join(data_root, config['instrument']))
+    for option, filename in DEFAULT_FILES.items():
+        config.setdefault(option, os.path.join(data_dir, filename))
+    return config
+
+
+def load_configs(path=None, instruments=(), data_root='data'):
+    """Instrument configs from a JSON file (a list, or {"instruments": [...]}) and/or bare instrument names"""
+    entries = []
+    if path:
+        with open(path) as f:
+            loaded = json.load(f)
+        entries.extend(loaded['instruments'] if isinstance(loaded, dict) else loaded)
+    entries.extend(instruments)
+
+    configs = [resolve_config(entry, data_root) for entry in entries]
+    names = [config['instrument'] for config in configs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Instruments configured more than once: {', '.join(duplicates)}")
+    return configs
+
+
+def shard_configs(configs, workers):
+    """Deal instruments round-robin onto at most `workers` shards"""
+    workers = max(1, min(workers, len(configs)))
+    shards = [[] for _ in range(workers)]
+    for i, config in enumerate(configs):
+        shards[i % workers].append(config)
+    return shards
+
+
+def run_shard(shard_id, configs, status_queue, stop_event, status_interval):
+    """Worker process - runs an asyncio runtime per instrument on one event loop until stop_event is set"""
+    # Ctrl+C reaches the whole process group - the supervisor decides when shards stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from async_runtime import AsyncRuntime
+    from fvg_bot import FVGATITradingBot
+
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(processName)s - %(levelname)s - %(message)s'))
+
+    runtimes = []
+    for config in configs:
+        options = {key: config[key] for key in BOT_OPTIONS if key in config}
+        bot = FVGATITradingBot(instrument=config['instrument'], headless=True, instrument_from_data=False, **options)
+        runtimes.append(AsyncRuntime(bot, handle_signals=False))
+
+    async def report():
+        supervisor = multiprocessing.parent_process()
+        while not stop_event.is_set() and supervisor.is_alive():
+            summaries = [runtime.bot.status_summary() for runtime in runtimes]
+            status_queue.put(('status', shard_id, os.getpid(), time.time(), summaries))
+            await asyncio.sleep(status_interval)
+        for runtime in runtimes:
+            runtime.stop()
+
+    async def main():
+        # A service manager may signal the whole process group - stop the same way as the supervisor would
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+        mains = [asyncio.create_task(runtime.main()) for runtime in runtimes]
+        reporter = asyncio.create_task(report())
+        await asyncio.gather(*mains, return_exceptions=True)
+        reporter.cancel()
+
+    started = []
+    try:
+        for runtime in runtimes:
+            runtime.bot.start()
+            started.append(runtime)
+        asyncio.run(main())
+    except Exception as e:
+        logger.error(f"Shard {shard_id} failed: {e}")
+        raise
+    finally:
+        for runtime in started:
+            runtime.close()
+
+
+def _interrupt(signum, frame):
+    """SIGTERM handler - shut down the same way as Ctrl+C"""
+    raise KeyboardInterrupt
+
+
+class Supervisor:
+    """Runs one bot per instrument, sharded across worker processes, with aggregate status and health
+
+    Each shard process owns its instruments' zone state outright and writes
+    their signals to the per-instrument files, so adding a contract never
+    slows the others down as long as there are cores for the shards. Shards
+    report a status summary every status_interval seconds; an instrument is
+    'stale' when its shard has not reported for stale_after seconds and
+    'down' while its shard is not running. A shard that exits unexpectedly
+    is restarted (at most once per restart_delay seconds). The aggregate
+    status is shown on screen and written to status_path.
+    """
+
+    def __init__(self, configs, workers=None, status_path='data/supervisor_status.json', status_interval=1.0,
+                 stale_after=10.0, restart_delay=10.0, headless=False):
+        if not configs:
+            raise ValueError("No instruments configured")
+        self.configs = configs
+        self.shards = shard_configs(configs, workers or os.cpu_count() or 1)
+        self.status_path = status_path
+        self.status_interval = status_interval
+        self.stale_after = stale_after
+        self.restart_delay = restart_delay
+
+        # spawn everywhere - same behaviour as on Windows, and no threads are inherited
+        self.context = multiprocessing.get_context('spawn')
+        self.status_queue = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = [None] * len(self.shards)
+        self.started_at = [0.0] * len(self.shards)
+
+        # instrument -> latest summary (plus shard, pid and report time)
+        self.latest = {config['instrument']: None for config in configs}
+        self.shard_of = {config['instrument']: i for i, shard in enumerate(self.shards) for config in shard}
+
+        self.headless = headless
+        self.renderer = TerminalRenderer(self.status_lines, headless=headless)
+
+    def start_shard(self, shard_id):
+        configs = self.shards[shard_id]
+        for config in configs:
+            for option in OUTPUT_OPTIONS:
+                if config.get(option):
+                    os.makedirs(os.path.dirname(os.path.abspath(config[option])), exist_ok=True)
+
+        name = f"shard-{shard_id}[{','.join(config['instrument'] for config in configs)}]"
+        process = self.context.Process(target=run_shard, name=name,
+                                       args=(shard_id, configs, self.status_queue, self.stop_event, self.status_interval))
+        process.start()
+        self.processes[shard_id] = process
+        self.started_at[shard_id] = time.monotonic()
+        logger.info(f"Started {name} (pid {process.pid})")
+
+    def collect(self, timeout):
+        """Take status reports off the queue (waits up to timeout for the first one)"""
+        try:
+            message = self.status_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while True:
+            kind, shard_id, pid, reported_at, summaries = message
+            for summary in summaries:
+                self.latest[summary['instrument']] = dict(summary, shard=shard_id, pid=pid, reported_at=reported_at)
+            try:
+                message = self.status_queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def check_shards(self):
+        """Restart shards that exited while the supervisor is running"""
+        for shard_id, process in enumerate(self.processes):
+            if process is None or process.is_alive():
+                continue
+            if time.monotonic() - self.started_at[shard_id] < self.restart_delay:
+                continue
+            logger.error(f"{process.name} exited with code {process.exitcode} - restarting")
+            self.start_shard(shard_id)
+
+    def health(self, instrument):
+        process = self.processes[self.shard_of[instrument]]
+        if process is None or not process.is_alive():
+            return 'down'
+        summary = self.latest[instrument]
+        if summary is None:
+            return 'starting'
+        if time.time() - summary['reported_at'] > self.stale_after:
+            return 'stale'
+        return 'ok'
+
+    def status(self):
+        """Aggregate status - one entry per instrument plus overall health"""
+        instruments = {}
+        for instrument, summary in self.latest.items():
+            entry = dict(summary or {'instrument': instrument})
+            entry['health'] = self.health(instrument)
+            instruments[instrument] = entry
+        healthy = all(entry['health'] == 'ok' for entry in instruments.values())
+        return {
+            'timestamp': time.time(),
+            'healthy': healthy,
+            'shards': len(self.shards),
+            'signals': sum(entry.get('signals', 0) for entry in instruments.values()),
+            'instruments': instruments,
+        }
+
+    def write_status(self, status):
+        if not self.status_path:
+            return
+        try:
+            tmp_path = f'{self.status_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(status, f, indent=2, default=str)
+            os.replace(tmp_path, self.status_path)
+        except Exception as e:
+            logger.error(f"Error writing supervisor status: {e}")
+
+    def status_lines(self, status):
+        """Aggregate status display, one string per screen line"""
+        lines = [f"        FVG SUPERVISOR - {len(status['instruments'])} instruments on {status['shards']} shards",
+                 "=" * 78,
+                 f"  {'Instrument':<11}{'Health':<10}{'Price':>10}{'Zones':>7}{'Cooldown':>10}{'Signals':>9}  Last Tick",
+                 "-" * 78]
+        for instrument, entry in status['instruments'].items():
+            price = f"{entry['price']:.2f}" if entry.get('price') is not None else '-'
+            lines.append(f"  {instrument:<11}{entry['health']:<10}{price:>10}{entry.get('active_zones', '-'):>7}"
+                         f"{entry.get('zones_in_cooldown', '-'):>10}{entry.get('signals', '-'):>9}  {entry.get('last_tick') or '-'}")
+        lines.append("=" * 78)
+        return lines
+
+    def run(self):
+        """Start every shard and supervise until Ctrl+C (or SIGTERM)"""
+        signal.signal(signal.SIGTERM, _interrupt)
+        logger.info(f"Supervising {len(self.configs)} instruments on {len(self.shards)} worker processes")
+        for shard_id in range(len(self.shards)):
+            self.start_shard(shard_id)
+        self.renderer.start()
+
+        try:
+            while True:
+                self.collect(timeout=self.status_interval)
+                self.check_shards()
+                status = self.status()
+                self.write_status(status)
+                self.renderer.update(status)
+        except KeyboardInterrupt:
+            self.renderer.stop()
+            logger.info("Stopping all shards...")
+        finally:
+            self.stop()
+
+    def stop(self, timeout=15.0):
+        """Let every shard finish its queued work and signal writes, then exit"""
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            if process is not None:
+                process.join(max(0.0, deadline - time.monotonic()))
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                logger.error(f"{process.name} did not stop in time - killing it")
+                process.kill()
+                process.join()
+        # Final reports sent during shutdown
+        self.collect(timeout=0)
+        self.write_status(self.status())
+        self.renderer.stop()
+        logger.info("Supervisor stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('instruments', nargs='*', help='instrument names using data/<instrument>/ files')
+    parser.add_argument('--config', help='JSON list of instrument configs')
+    parser.add_argument('--data-root', default='data', help='parent of the per-instrument data folders')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--status', default='data/supervisor_status.json', help='aggregate status file')
+    parser.add_argument('--headless', action='store_true', help='no status display')
+    args = parser.parse_args()
+
+    configs = load_configs(args.config, args.instruments, args.data_root)
+    if not configs:
+        parser.error('give instrument names or --config')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if os.name == 'nt' and not args.headless:
+        os.system('color')
+    Supervisor(configs, workers=args.workers, status_path=args.status, headless=args.headless).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Parameter sweep - backtests a grid of gap/distance/bracket settings on every core
+
+Usage:
+    python sweep.py                                      # default grid, all cores
+    python sweep.py --min-gap 3 4 5 6 --max-distance 150 250 400 --stop 6 8 10 12 --target 3 5 8
+    python sweep.py --ticks data/LiveFeed.csv --rank-by profit_factor --output data/sweep_results.csv
+    python sweep.py --signal-rules '{"repeat_seconds": 1800}'   # live bot's suppression rules
+
+The bars and ticks are parsed once and written to .npy files that every
+worker memory-maps read-only, so the OS page cache holds a single copy no
+matter how many workers run. Zone signals only depend on the minimum gap and
+the retention distance, so each worker task replays one (min_gap,
+max_distance) pair and then prices every stop/target bracket on the same
+signals.
+"""
+import os
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from backtest import Backtester, read_tick_file, summarize, synthetic_ticks
+
+logger = logging.getLogger(__name__)
+
+# Arrays shared with the workers
+SHARED_ARRAYS = ('bar_times', 'high', 'low', 'tick_times', 'tick_prices')
+
+# Per-process view of the shared arrays (set by attach_arrays in each worker)
+_shared = {}
+
+
+def share_arrays(arrays, directory):
+    """Write arrays to .npy files in directory - returns {name: path}"""
+    paths = {}
+    for name in SHARED_ARRAYS:
+        path = os.path.join(directory, f'{name}.npy')
+        np.save(path, np.ascontiguousarray(arrays[name]))
+        paths[name] = path
+    return paths
+
+
+def attach_arrays(paths):
+    """Worker initializer - memory-map the shared arrays and build the bars frame once"""
+    arrays = {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+    _shared['tick_times'] = arrays['tick_times']
+    _shared['tick_prices'] = arrays['tick_prices']
+    # Columns stay backed by the memory maps (no per-worker copy)
+    _shared['bars'] = pd.DataFrame({
+        'DateTime': arrays['bar_times'].view('datetime64[ns]'),
+        'High': arrays['high'],
+        'Low': arrays['low'],
+    }, copy=False)
+
+
+def run_group(min_gap, max_distance, brackets, quantity, point_value, slippage_points=0.0, signal_rules=None):
+    """Backtest one (min_gap, max_distance) pair across every (stop, target) bracket"""
+    bars = _shared['bars']
+    tick_times = _shared['tick_times']
+    tick_prices = _shared['tick_prices']
+
+    signals = Backtester(min_gap=min_gap, max_distance=max_distance,
+                         signal_rules=signal_rules).find_signals(bars, tick_times, tick_prices)
+
+    rows = []
+    for stop_points, target_points in brackets:
+        backtester = Backtester(min_gap=min_gap, max_distance=max_distance, stop_points=stop_points,
+                                target_points=target_points, quantity=quantity, point_value=point_value,
+                                slippage_points=slippage_points)
+        trades = backtester.apply_brackets(signals, tick_times, tick_prices)
+        row = {'min_gap': min_gap, 'max_distance': max_distance, 'stop': stop_points, 'target': target_points}
+        row.update(summarize(trades, len(signals)))
+        rows.append(row)
+    return rows
+
+
+def rank_results(rows, rank_by='total_pnl'):
+    """Results table sorted best first (drawdown ranks ascending, everything else descending)"""
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    ascending = rank_by == 'max_drawdown'
+    results = results.sort_values([rank_by, 'total_pnl'], ascending=[ascending, False], kind='stable')
+    results.insert(0, 'rank', np.arange(1, len(results) + 1))
+    return results.reset_index(drop=True)
+
+
+def run_sweep(bars, tick_times, tick_prices, min_gaps, max_distances, stops, targets,
+              quantity=12, point_value=5.0, workers=None, rank_by='total_pnl', slippage_points=0.0, signal_rules=None):
+    """Evaluate the full parameter grid across a process pool - returns the ranked table"""
+    brackets = list(itertools.product(stops, targets))
+    groups = list(itertools.product(min_gaps, max_distances))
+    workers = workers or os.cpu_count() or 1
+
+    arrays = {
+        'bar_times': bars['DateTime'].to_numpy().astype('datetime64[ns]').astype(np.int64),
+        'high': bars['High'].to_numpy(dtype=np.float64),
+        'low': bars['Low'].to_numpy(dtype=np.float64),
+        'tick_times': np.asarray(tick_times, dtype=np.int64),
+        'tick_prices': np.asarray(tick_prices, dtype=np.float64),
+    }
+
+    logger.info(f"Sweeping {len(groups) * len(brackets)} combinations "
+                f"({len(groups)} zone replays x {len(brackets)} brackets) on {workers} workers")
+
+    rows = []
+    directory = tempfile.mkdtemp(prefix='fvg_sweep_')
+    try:
+        paths = share_arrays(arrays, directory)
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_arrays, initargs=(paths,)) as pool:
+            futures = {pool.submit(run_group, min_gap, max_distance, brackets, quantity, point_value,
+                                   slippage_points, signal_rules):
+                       (min_gap, max_distance) for min_gap, max_distance in groups}
+            for done, future in enumerate(as_completed(futures), 1):
+                min_gap, max_distance = futures[future]
+                try:
+                    rows.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Sweep failed for min_gap={min_gap} max_distance={max_distance}: {e}")
+                    continue
+                logger.info(f"[{done}/{len(groups)}] min_gap={min_gap} max_distance={max_distance} done")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return rank_results(rows, rank_by)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel parameter sweep of the FVG retest strategy')
+    parser.add_argument('--historical', default='data/HistoricalData.csv')
+    parser.add_argument('--ticks', help='LiveFeed.csv style tick file (default: synthetic ticks from OHLC)')
+    parser.add_argument('--min-gap', type=float, nargs='+', default=[3.0, 4.0, 5.0, 6.0, 8.0])
+    parser.add_argument('--max-distance', type=float, nargs='+', default=[150.0, 250.0, 400.0])
+    parser.add_argument('--stop', type=float, nargs='+', default=[6.0, 8.0, 10.0, 12.0])
+    parser.add_argument('--target', type=float, nargs='+', default=[3.0, 5.0, 8.0, 10.0])
+    parser.add_argument('--slippage', type=float, default=0.0, help='points a stop fills past its level')
+    parser.add_argument('--quantity', type=int, default=12)
+    parser.add_argument('--point-value', type=float, default=5.0, help='dollars per point (MES = 5)')
+    parser.add_argument('--signal-rules', type=json.loads, help='JSON signal ledger rules (default: the bot\'s)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--rank-by', default='total_pnl',
+                        choices=['total_pnl', 'profit_factor', 'win_rate', 'total_points', 'max_drawdown'])
+    parser.add_argument('--top', type=int, default=10, help='rows to print')
+    parser.add_argument('--output', default='data/sweep_results.csv')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = BarStore(args.historical, use_cache=True)
+    store.refresh()
+    if store.bar_count < 3:
+        logger.error(f"Not enough bars in {args.historical}")
+        return
+
+    if args.ticks:
+        tick_times, tick_prices = read_tick_file(args.ticks)
+    else:
+        tick_times, tick_prices = synthetic_ticks(store.df)
+
+    results = run_sweep(store.df, tick_times, tick_prices, args.min_gap, args.max_distance, args.stop, args.target,
+                        quantity=args.quantity, point_value=args.point_value, workers=args.workers,
+                        rank_by=args.rank_by, slippage_points=args.slippage, signal_rules=args.signal_rules)
+    if results.empty:
+        logger.error("Sweep produced no results")
+        return
+
+    results.to_csv(args.output, index=False)
+    logger.info(f"Ranked results written to {args.output}")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(results.head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
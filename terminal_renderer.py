@@ -0,0 +1,133 @@
+import sys
+import time
+import logging
+import threading
+
+# ANSI escape sequences
+CLEAR_SCREEN = '\033[2J\033[H'
+CLEAR_LINE = '\033[K'
+CLEAR_BELOW = '\033[J'
+HIDE_CURSOR = '\033[?25l'
+SHOW_CURSOR = '\033[?25h'
+
+
+def move_to(row):
+    """Cursor to the start of a 1-based screen row"""
+    return f'\033[{row};1H'
+
+
+class _RepaintOnLog(logging.Handler):
+    """Forces a full repaint after any log record scrolls the terminal"""
+
+    def __init__(self, renderer):
+        super().__init__()
+        self.renderer = renderer
+
+    def emit(self, record):
+        self.renderer.invalidate()
+
+
+class TerminalRenderer:
+    """Draws status frames from its own thread, rewriting only the lines that changed
+
+    The trading loop hands over state with update(), which only stores a
+    reference and never waits on the terminal. The render thread turns the
+    latest state into lines with frame_fn, at most fps times per second, and
+    writes just the changed lines using ANSI cursor addressing. Log output
+    scrolls the screen, so any log record (and every full_redraw_interval
+    seconds) triggers a full repaint. With headless=True nothing is started
+    and update() is a no-op.
+    """
+
+    def __init__(self, frame_fn, fps=4.0, stream=None, headless=False, full_redraw_interval=10.0):
+        self.frame_fn = frame_fn
+        self.frame_interval = 1.0 / fps
+        self.stream = stream or sys.stdout
+        self.headless = headless
+        self.full_redraw_interval = full_redraw_interval
+
+        self.state = None
+        self.state_changed = threading.Event()
+        self.stopping = False
+        self.thread = None
+        self.log_handler = None
+
+        self.previous = []
+        self.needs_repaint = True
+        self.last_repaint = 0.0
+        self.frames = 0
+
+    def start(self):
+        """Start the render thread (no-op when headless)"""
+        if self.headless or self.thread is not None:
+            return
+        self.log_handler = _RepaintOnLog(self)
+        logging.getLogger().addHandler(self.log_handler)
+        self.stream.write(HIDE_CURSOR)
+        self.stream.flush()
+        self.thread = threading.Thread(target=self._run, name='terminal-renderer', daemon=True)
+        self.thread.start()
+
+    def update(self, state):
+        """Hand the latest state to the render thread - never blocks"""
+        if self.headless:
+            return
+        self.state = state
+        self.state_changed.set()
+
+    def invalidate(self):
+        """Repaint the whole screen on the next frame"""
+        self.needs_repaint = True
+
+    def stop(self):
+        """Stop the render thread and restore the cursor"""
+        if self.thread is None:
+            return
+        self.stopping = True
+        self.state_changed.set()
+        self.thread.join(timeout=2.0)
+        self.thread = None
+        logging.getLogger().removeHandler(self.log_handler)
+        self.stream.write(SHOW_CURSOR + '\n')
+        self.stream.flush()
+
+    def _run(self):
+        while not self.stopping:
+            self.state_changed.wait()
+            if self.stopping:
+                break
+            self.state_changed.clear()
+
+            started = time.monotonic()
+            try:
+                self.render(self.frame_fn(self.state))
+            except Exception as e:
+                # Never let a display problem take the thread down silently
+                self.stream.write(f'\n[renderer] {e}\n')
+                self.invalidate()
+
+            # Cap the frame rate - later updates are coalesced into the next frame
+            remaining = self.frame_interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def render(self, lines):
+        """Write a frame, touching only lines that differ from the previous one"""
+        now = time.monotonic()
+        if self.needs_repaint or now - self.last_repaint >= self.full_redraw_interval:
+            self.needs_repaint = False
+            self.last_repaint = now
+            out = [CLEAR_SCREEN, '\n'.join(lines)]
+        else:
+            out = []
+            for row, line in enumerate(lines):
+                if row >= len(self.previous) or self.previous[row] != line:
+                    out.append(f'{move_to(row + 1)}{line}{CLEAR_LINE}')
+            if len(lines) < len(self.previous):
+                out.append(f'{move_to(len(lines) + 1)}{CLEAR_BELOW}')
+
+        self.previous = lines
+        self.frames += 1
+        if out:
+            self.stream.write(''.join(out))
+            self.stream.flush()
@@ -0,0 +1,49 @@
+import os
+import sys
+import logging
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import fvg_bot  # noqa: E402
+from synthetic_data import BAR_DATETIME_FORMAT  # noqa: E402
+
+
+def write_bars(path, bars, mode='w'):
+    """Write bars in the HistoricalData.csv layout (header only when creating the file)"""
+    with open(path, mode) as f:
+        if mode == 'w':
+            f.write('DateTime,Open,High,Low,Close\n')
+        for row in bars.itertuples():
+            f.write(f'{row.DateTime.strftime(BAR_DATETIME_FORMAT)},{row.Open},{row.High},{row.Low},{row.Close}\n')
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    """The bot logs every zone and signal at INFO"""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def make_bot(tmp_path):
+    """Headless bot on files in tmp_path/name - no snapshot, journal, ledger file, archive or higher timeframes"""
+    def make(bars, name='bot', **options):
+        directory = tmp_path / name
+        directory.mkdir()
+        historical = directory / 'HistoricalData.csv'
+        live_feed = directory / 'LiveFeed.csv'
+        write_bars(historical, bars)
+        live_feed.write_text('DateTime,Last\n')
+        settings = dict(historical_path=str(historical), live_feed_path=str(live_feed),
+                        signals_path=str(directory / 'trade_signals.csv'),
+                        trades_log_path=str(directory / 'trades_taken.csv'), journal_path=None,
+                        snapshot_path=None, state_path=None, ledger_path=None, tick_archive_path=None,
+                        live_bars=False, headless=True, timeframes=None, watch_backend=None)
+        settings.update(options)
+        return fvg_bot.FVGATITradingBot(**settings)
+    return make
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import Backtester, synthetic_ticks
+from conftest import write_bars
+from synthetic_data import BAR_DATETIME_FORMAT, synthetic_bars
+
+
+def replay_bot(bot, bars, tick_times, tick_prices):
+    """Feed bars and the ticks after each close through the bot's file path, like a live session"""
+    bot.load_historical_fvgs()
+    bot.live_feed.has_polled = True
+    bounds = np.searchsorted(tick_times, bars['DateTime'].to_numpy().astype('datetime64[ns]').astype(np.int64),
+                             side='right')
+    bounds = np.append(bounds, len(tick_times))
+    for i in range(2, len(bars)):
+        if i > 2:
+            write_bars(bot.historical_path, bars.iloc[i:i + 1], mode='a')
+        bot.bar_store.refresh()
+        bot.process_historical_bars()
+        with open(bot.live_feed_path, 'a') as f:
+            for k in range(bounds[i], bounds[i + 1]):
+                f.write(f'{pd.Timestamp(tick_times[k]).strftime(BAR_DATETIME_FORMAT)},{tick_prices[k]:.2f}\n')
+        ticks = bot.read_new_ticks()
+        if ticks:
+            bot.process_tick_batch(ticks)
+            bot.clean_old_fvgs(i, bot.live_feed.last_price)
+
+
+def sent_signals(bot):
+    """(time, direction, entry price) of every signal in the bot's trades log"""
+    log = pd.read_csv(bot.trades_log_path)
+    times = pd.to_datetime(log['DateTime'], format=BAR_DATETIME_FORMAT)
+    return list(zip(times, log['Direction'], log['Entry_Price'].round(2)))
+
+
+def backtest_signals(signals):
+    """The same triples from a find_signals table (entry at the zone boundary, like the bot)"""
+    entry = np.where(signals['direction'] == 'LONG', signals['zone_bottom'], signals['zone_top'])
+    return list(zip(signals['signal_time'], signals['direction'], np.round(entry, 2)))
+
+
+@pytest.mark.parametrize('rules', [
+    {},                                                   # the bot's defaults
+    {'once_per_bar': False, 'repeat_seconds': 0},         # every rule off
+    {'repeat_seconds': 7200},                             # suppresses re-entries on the next bars
+    {'repeat_seconds': 3600, 'max_per_hour': 1},          # suppresses across zones
+])
+def test_backtest_matches_bot_signals(make_bot, rules):
+    bars = synthetic_bars(400, seed=3)
+    tick_times, tick_prices = synthetic_ticks(bars)
+    signals = Backtester(signal_rules=rules).find_signals(bars, tick_times, tick_prices)
+
+    bot = make_bot(bars.iloc[:3], signal_rules=rules)
+    replay_bot(bot, bars, tick_times, tick_prices)
+
+    assert len(signals)
+    assert sent_signals(bot) == backtest_signals(signals)
+
+
+@pytest.mark.parametrize('rules, expected', [
+    ({'repeat_seconds': 0}, [1, 3]),
+    # The re-entry 60 minutes after the first signal is suppressed - no cooldown, so the next one signals
+    ({'repeat_seconds': 3660}, [1, 5]),
+])
+def test_suppressed_entry_leaves_zone_armed(make_bot, rules, expected):
+    # Bars 0 and 2 leave a bullish zone at 1000-1010 that the later bars stay above
+    times = pd.date_range('2024-01-02 10:00', periods=5, freq='h')
+    bars = pd.DataFrame({'DateTime': times,
+                         'Open': [995.0, 998.0, 1012.0, 1015.0, 1015.0],
+                         'High': [1000.0, 1015.0, 1020.0, 1025.0, 1025.0],
+                         'Low': [990.0, 998.0, 1010.0, 1011.0, 1011.0],
+                         'Close': [998.0, 1014.0, 1018.0, 1015.0, 1015.0]})
+    minute = 60 * 10**9
+    tick_times = np.array([times[3].value + minute, times[3].value + 2 * minute]
+                          + [times[4].value + k * minute for k in range(1, 5)], dtype=np.int64)
+    tick_prices = np.array([1012.0, 1005.0, 1012.0, 1005.0, 1012.0, 1005.0])
+
+    signals = Backtester(signal_rules=rules).find_signals(bars, tick_times, tick_prices)
+    assert signals['tick'].tolist() == expected
+
+    bot = make_bot(bars.iloc[:3], signal_rules=rules)
+    replay_bot(bot, bars, tick_times, tick_prices)
+    assert sent_signals(bot) == backtest_signals(signals)
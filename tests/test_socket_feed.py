@@ -0,0 +1,195 @@
+import os
+import shutil
+import asyncio
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import feed_replay
+from async_runtime import AsyncRuntime
+from conftest import ROOT
+from socket_feed import MAX_LINE, FeedParser, SocketFeed
+from synthetic_data import BAR_DATETIME_FORMAT
+
+HISTORICAL = os.path.join(ROOT, 'data', 'HistoricalData.csv')
+LIVE_FEED = os.path.join(ROOT, 'data', 'LiveFeed.csv')
+
+# Bars the bots start with are read from the file; the rest and every tick are replayed
+REPLAYED_BARS = 300
+
+
+def test_parser_joins_lines_split_across_reads():
+    parser = FeedParser()
+    assert parser.feed(b'T,11/15/2025 10:38:32,67') == []
+    assert parser.feed(b'30.50\nT,11/15/2025 10:38:33') == [('ticks', [('11/15/2025 10:38:32', 6730.5)])]
+    events = parser.feed(b',6731.00\r\nB,10/30/2025 14:00:00,6898.00,6898.00,6875.25,6877.25\nB,10/30/2025 15:0')
+    assert events == [('ticks', [('11/15/2025 10:38:33', 6731.0)]),
+                      ('bars', [(pd.Timestamp('2025-10-30 14:00:00').value, 6898.0, 6898.0, 6875.25, 6877.25)])]
+    # The partial bar waits for the rest of its line
+    assert bytes(parser.buffer) == b'B,10/30/2025 15:0'
+    assert parser.feed(b'0:00,1,2,0.5,1.5\n') == [('bars', [(pd.Timestamp('2025-10-30 15:00:00').value,
+                                                            1.0, 2.0, 0.5, 1.5)])]
+    assert parser.bad_lines == 0
+
+
+def test_parser_keeps_tick_and_bar_runs_in_order():
+    parser = FeedParser()
+    events = parser.feed(b'T,01/02/2024 10:00:00,1\nT,01/02/2024 10:00:01,2\n'
+                         b'B,01/02/2024 10:00:00,1,2,1,2\nT,01/02/2024 10:00:02,3\n')
+    assert [kind for kind, _ in events] == ['ticks', 'bars', 'ticks']
+    assert [len(payload) for _, payload in events] == [2, 1, 1]
+
+
+def test_parser_skips_malformed_lines():
+    parser = FeedParser()
+    events = parser.feed(b'T,01/02/2024 10:00:00\n'                 # missing price
+                         b'T,01/02/2024 10:00:00,abc\n'             # price not a number
+                         b'X,01/02/2024 10:00:00,1\n'               # unknown message
+                         b'B,01/02/2024 10:00:00,1,2,1\n'           # missing close
+                         b'B,not a time,1,2,1,2\n'                  # bar time not parseable
+                         b'\n'                                      # blank lines are ignored
+                         b'T,01/02/2024 10:00:01,5000.25\n')
+    assert events == [('ticks', [('01/02/2024 10:00:01', 5000.25)])]
+    assert parser.bad_lines == 5
+
+
+def test_parser_rejects_a_line_without_end():
+    parser = FeedParser()
+    with pytest.raises(ValueError):
+        parser.feed(b'T,' + b'1' * MAX_LINE)
+
+
+def read_bars():
+    bars = pd.read_csv(HISTORICAL)
+    bars['DateTime'] = pd.to_datetime(bars['DateTime'], format=BAR_DATETIME_FORMAT)
+    return bars
+
+
+def zone_state(bot):
+    return sorted((fvg.type, fvg.bottom, fvg.top, fvg.time_ns, fvg.filled, fvg.trade_taken, fvg.price_was_outside)
+                  for fvg in bot.active_fvgs)
+
+
+def run_socket_bot(bot, address, events):
+    """Run the bot on a socket feed and replay events into it with feed_replay
+
+    Returns the events it queued and the zone state after each one was processed.
+    """
+    feed = SocketFeed(address)
+    runtime = AsyncRuntime(bot, handle_signals=False, socket_feed=feed)
+    queued = []
+    states = []
+    put_event = runtime.put_event
+    process_bar_rows = bot.process_bar_rows
+    evaluate_ticks = runtime.evaluate_ticks
+
+    async def record(event):
+        queued.append(event)
+        await put_event(event)
+    runtime.put_event = record
+
+    def bar_rows_then_state(rows, current_price):
+        process_bar_rows(rows, current_price)
+        states.append(zone_state(bot))
+    bot.process_bar_rows = bar_rows_then_state
+
+    def ticks_then_state(ticks):
+        evaluate_ticks(ticks)
+        states.append(zone_state(bot))
+    runtime.evaluate_ticks = ticks_then_state
+
+    def send(target):
+        sock = feed_replay.connect(target, timeout=5.0)
+        try:
+            feed_replay.replay(sock, events)
+        finally:
+            sock.close()
+
+    async def session():
+        main = asyncio.create_task(runtime.main())
+        while feed.server is None or not feed.server.is_serving():
+            await asyncio.sleep(0.01)
+        target = address if feed.kind == 'unix' else f'127.0.0.1:{feed.server.sockets[0].getsockname()[1]}'
+        await asyncio.get_running_loop().run_in_executor(None, send, target)
+        # Every line parsed and the connection closed - then the shutdown drains the queues
+        while feed.messages < len(events) or feed.connections:
+            await asyncio.sleep(0.01)
+        runtime.stop()
+        await main
+
+    bot.start()
+    try:
+        asyncio.run(asyncio.wait_for(session(), 60))
+    finally:
+        runtime.close()
+    return queued, states
+
+
+def run_csv_bot(bot, queued):
+    """Write the same events to the bot's CSV files and run them through the file path, batch by batch
+
+    Returns the zone state after each event, like run_socket_bot.
+    """
+    bot.start()
+    bot.live_feed.has_polled = True
+    states = []
+    current_price = None
+    for kind, payload in queued:
+        if kind == 'bar_rows':
+            # NinjaTrader appends one bar per hour
+            for time_ns, open_, high, low, close in payload:
+                with open(bot.historical_path, 'a') as f:
+                    f.write(f'{pd.Timestamp(time_ns).strftime(BAR_DATETIME_FORMAT)},{open_},{high},{low},{close}\n')
+                bot.process_historical_bars()
+            states.append(zone_state(bot))
+            if current_price is None:
+                continue
+            ticks = [(None, current_price)]
+        else:
+            with open(bot.live_feed_path, 'a') as f:
+                f.writelines(f'{tick_datetime},{price}\n' for tick_datetime, price in payload)
+            ticks = bot.read_new_ticks()
+            assert ticks == payload
+            current_price = ticks[-1][1]
+        # Same batches as the socket run - the distance cleanup runs per batch
+        bot.process_live_ticks(ticks)
+        bot.clean_old_fvgs(bot.bar_window.total - 1, current_price)
+        states.append(zone_state(bot))
+    bot.shutdown()
+    return states
+
+
+@pytest.mark.parametrize('transport', ['unix', 'tcp'])
+def test_socket_replay_matches_csv_run(make_bot, transport):
+    bars = read_bars()
+    start_bars = bars.iloc[:-REPLAYED_BARS]
+    after = datetime.strptime(start_bars['DateTime'].iat[-1].strftime(BAR_DATETIME_FORMAT), BAR_DATETIME_FORMAT)
+    events = feed_replay.read_events(LIVE_FEED, HISTORICAL, after)
+
+    socket_dir = tempfile.mkdtemp(prefix='fvg')  # Unix socket paths are limited to ~100 bytes
+    try:
+        address = f'unix://{socket_dir}/feed.sock' if transport == 'unix' else '127.0.0.1:0'
+        socket_bot = make_bot(start_bars, name='socket')
+        queued, socket_states = run_socket_bot(socket_bot, address, events)
+    finally:
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+    # Every line arrived, in order, however the stream was split into reads
+    assert sum(len(rows) for kind, rows in queued if kind == 'bar_rows') == REPLAYED_BARS
+    ticks = [tick for kind, payload in queued if kind == 'ticks' for tick in payload]
+    assert len(ticks) == len(events) - REPLAYED_BARS
+    assert ticks[-1] == ('11/15/2025 10:45:02', 6870.5)
+
+    csv_bot = make_bot(start_bars, name='csv')
+    csv_states = run_csv_bot(csv_bot, queued)
+
+    assert any(socket_states)
+    assert socket_states == csv_states
+    with open(socket_bot.trades_log_path) as f:
+        socket_signals = f.read()
+    with open(csv_bot.trades_log_path) as f:
+        csv_signals = f.read()
+    assert socket_signals.count('\n') > 1
+    assert socket_signals == csv_signals
@@ -0,0 +1,65 @@
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from tick_archive import (SEGMENT_HEADER_V1, SEGMENT_MAGIC, TickArchive, read_segment, read_segment_header,
+                          write_segment)
+
+
+def test_segment_round_trip_keeps_out_of_order_times(tmp_path):
+    path = str(tmp_path / 'ticks.seg')
+    seconds = np.array([1000, 995, 1010, 990, 1010], dtype=np.int64)
+    cents = np.array([500000, 500025, 499975, 500000, 500100], dtype=np.int64)
+    write_segment(path, seconds, cents)
+
+    read_seconds, read_cents = read_segment(path)
+    assert read_seconds.tolist() == seconds.tolist()
+    assert read_cents.tolist() == cents.tolist()
+    # The index range is the earliest and latest tick, not the first and last
+    assert read_segment_header(path) == (5, 990, 1010)
+
+
+def test_version_1_segment_still_reads(tmp_path):
+    path = str(tmp_path / 'old.seg')
+    seconds = np.array([1000, 1000, 1005, 1030], dtype=np.int64)
+    cents = np.array([500000, 500025, 500050, 500000], dtype=np.int64)
+    payload = zlib.compress(np.concatenate((np.diff(seconds, prepend=seconds[0]),
+                                            np.diff(cents, prepend=0))).astype('<i8').tobytes())
+    with open(path, 'wb') as f:
+        f.write(SEGMENT_HEADER_V1.pack(SEGMENT_MAGIC, 1, len(seconds), 1000, 1030, len(payload)))
+        f.write(payload)
+
+    read_seconds, read_cents = read_segment(path)
+    assert read_seconds.tolist() == seconds.tolist()
+    assert read_cents.tolist() == cents.tolist()
+    assert read_segment_header(path) == (4, 1000, 1030)
+
+
+def test_archive_clock_set_back_across_partitions(tmp_path):
+    # The clock steps back over midnight and forward again in one flush
+    archive = TickArchive(str(tmp_path / 'archive'), flush_interval=1e9)
+    ticks = [('01/02/2024 23:59:50', 5000.0), ('01/03/2024 00:00:10', 5000.25),
+             ('01/02/2024 23:59:55', 5000.5), ('01/03/2024 00:00:20', 5000.75),
+             ('01/02/2024 23:59:58', 5001.0)]
+    archive.append(ticks)
+    archive.flush()
+
+    # One segment per day, each covering its own ticks in arrival order
+    assert [(first, last, count) for first, last, count, _ in archive.segments] == [
+        (1704239990, 1704239998, 3), (1704240010, 1704240020, 2)]
+    first_day = read_segment(os.path.join(archive.directory, archive.segments[0][3]))
+    assert first_day[0].tolist() == [1704239990, 1704239995, 1704239998]
+    assert first_day[1].tolist() == [500000, 500050, 500100]
+
+    # A repeated hour (DST fall-back) within a day reads back exactly
+    archive.append([('01/03/2024 01:30:00', 5002.0), ('01/03/2024 01:59:59', 5002.25),
+                    ('01/03/2024 01:00:00', 5002.5), ('01/03/2024 01:30:00', 5002.75)])
+    archive.flush()
+    reopened = TickArchive(archive.directory)
+    ticks = reopened.read_range('01/03/2024 01:00:00', '01/03/2024 02:00:00')
+    assert ticks['DateTime'].tolist() == pd.to_datetime(['2024-01-03 01:00:00', '2024-01-03 01:30:00',
+                                                         '2024-01-03 01:30:00', '2024-01-03 01:59:59']).tolist()
+    assert ticks['Last'].tolist() == [5002.5, 5002.0, 5002.75, 5002.25]
+    assert reopened.last_time() == pd.Timestamp('2024-01-03 01:59:59')
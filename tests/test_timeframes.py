@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_data import session_bar_times, synthetic_bars
+from timeframes import SESSION_CLOSE, TimeframeZones, find_session_close, parse_session_close
+
+HOUR_NS = 3600 * 10**9
+
+
+def test_session_close_found_in_data():
+    times = session_bar_times(500).to_numpy().astype('datetime64[ns]').view(np.int64)
+    assert find_session_close(times) == pd.Timedelta(hours=16)
+    # The same session exported by an Eastern Time install
+    assert find_session_close(times + HOUR_NS) == pd.Timedelta(hours=17)
+    # Round-the-clock bars have no break
+    assert find_session_close(np.arange(100) * HOUR_NS) == SESSION_CLOSE
+
+
+def test_parse_session_close():
+    assert parse_session_close('17:00') == pd.Timedelta(hours=17)
+    assert parse_session_close('16:30:00') == pd.Timedelta(hours=16, minutes=30)
+    with pytest.raises(ValueError):
+        parse_session_close('25:00')
+
+
+@pytest.mark.parametrize('shift_hours', [0, 1])
+def test_daily_bars_follow_the_data_time_zone(shift_hours):
+    bars = synthetic_bars(600)
+    shifted = bars.assign(DateTime=bars['DateTime'] + pd.Timedelta(hours=shift_hours))
+
+    reference = TimeframeZones('1D', '1D', min_gap=20.0)
+    reference.seed(bars)
+    daily = TimeframeZones('1D', '1D', min_gap=20.0)
+    daily.seed(shifted)
+
+    # Same sessions, with the daily bars ending at the shifted close
+    assert daily.resampler.anchor == pd.Timedelta(hours=16 + shift_hours)
+    assert daily.resampler.closed_count == reference.resampler.closed_count
+    assert ([bar[1:] for bar in daily.resampler.closed] == [bar[1:] for bar in reference.resampler.closed])
+    assert [(fvg.bottom, fvg.top) for fvg in daily.zones] == [(fvg.bottom, fvg.top) for fvg in reference.zones]
+
+
+def test_session_close_option(make_bot):
+    bars = synthetic_bars(200)
+    bot = make_bot(bars, timeframes={'4H': {'period': '4h', 'min_gap': 10.0},
+                                     '1D': {'period': '1D', 'min_gap': 20.0, 'anchor': '18:00'}},
+                   session_close='17:00')
+    bot.load_historical_fvgs()
+    # The option applies to every timeframe that does not set its own anchor
+    assert [timeframe.resampler.anchor for timeframe in bot.timeframes] == [pd.Timedelta(hours=17),
+                                                                             pd.Timedelta(hours=18)]
@@ -0,0 +1,416 @@
+"""Compressed, time-partitioned archive of LiveFeed ticks
+
+Usage:
+    python tick_archive.py data/tick_archive --start "11/15/2025 10:00:00" --end "11/15/2025 11:00:00" --csv out.csv
+    python tick_archive.py data/tick_archive --import data/LiveFeed.csv
+"""
+import os
+import json
+import zlib
+import time
+import struct
+import logging
+import argparse
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TICK_DATETIME_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+SEGMENT_MAGIC = b'FVGT'
+SEGMENT_VERSION = 2
+# magic, version, tick count, first tick's time (the decode base), earliest / latest tick time
+# (epoch seconds), payload bytes - the first tick is not the earliest when the clock steps back
+SEGMENT_HEADER = struct.Struct('<4sHIqqqI')
+# Version 1 had no separate decode base: ticks were in time order, so the earliest was the first
+SEGMENT_HEADER_V1 = struct.Struct('<4sHIqqI')
+SEGMENT_SUFFIX = '.seg'
+
+INDEX_NAME = 'index.csv'
+INDEX_HEADER = 'segment,first_time,last_time,ticks\n'
+STATE_NAME = 'state.json'
+
+
+class TickTimes:
+    """'MM/dd/yyyy HH:mm:ss' -> epoch seconds, parsing each date once (LiveFeed times are naive local time)"""
+
+    def __init__(self):
+        self.days = {}
+
+    def __call__(self, value):
+        day = self.days.get(value[:10])
+        if day is None:
+            if len(self.days) > 1024:
+                self.days.clear()
+            day = int(datetime.strptime(value[:10], '%m/%d/%Y').replace(tzinfo=timezone.utc).timestamp())
+            self.days[value[:10]] = day
+        return day + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+
+
+def to_seconds(value):
+    """Epoch seconds from a datetime, Timestamp or 'MM/dd/yyyy HH:mm:ss' string"""
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, TICK_DATETIME_FORMAT)
+        except ValueError:
+            value = pd.Timestamp(value)
+    return int(pd.Timestamp(value).value // 10**9)
+
+
+def write_segment(path, seconds, cents):
+    """Write ticks as one segment file: header, then zlib-compressed time and price deltas"""
+    payload = zlib.compress(np.concatenate((
+        np.diff(seconds, prepend=seconds[0]),  # seconds after the first tick
+        np.diff(cents, prepend=0),             # first price, then price changes
+    )).astype('<i8').tobytes(), 6)
+    header = SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(seconds), int(seconds[0]),
+                                 int(seconds.min()), int(seconds.max()), len(payload))
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def unpack_segment_header(data):
+    """(tick count, decode base, earliest, latest, payload bytes, header size) of a segment, or None"""
+    if len(data) < SEGMENT_HEADER_V1.size:
+        return None
+    magic, version = struct.unpack_from('<4sH', data)
+    if magic != SEGMENT_MAGIC:
+        return None
+    if version == SEGMENT_VERSION and len(data) >= SEGMENT_HEADER.size:
+        _, _, count, base, earliest, latest, size = SEGMENT_HEADER.unpack_from(data)
+        return count, base, earliest, latest, size, SEGMENT_HEADER.size
+    if version == 1:
+        _, _, count, earliest, latest, size = SEGMENT_HEADER_V1.unpack_from(data)
+        return count, earliest, earliest, latest, size, SEGMENT_HEADER_V1.size
+    return None
+
+
+def read_segment_header(path):
+    """(tick count, earliest time, latest time) of a segment, or None if it is not a readable segment"""
+    try:
+        with open(path, 'rb') as f:
+            header = unpack_segment_header(f.read(SEGMENT_HEADER.size))
+    except OSError:
+        return None
+    if header is None:
+        return None
+    count, _, earliest, latest, _, _ = header
+    return count, earliest, latest
+
+
+def read_segment(path):
+    """Decode a segment - returns (epoch seconds, price in cents) int64 arrays in arrival order"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    header = unpack_segment_header(data)
+    if header is None:
+        raise ValueError(f"Not a tick segment: {path}")
+    count, base, _, _, size, offset = header
+    deltas = np.frombuffer(zlib.decompress(data[offset:offset + size]), dtype='<i8')
+    return base + np.cumsum(deltas[:count]), np.cumsum(deltas[count:])
+
+
+class TickArchive:
+    """Every consumed LiveFeed tick, in compressed segments partitioned by time
+
+    Ticks are buffered in memory and flushed as a segment every flush_ticks
+    ticks or flush_interval seconds. A segment never spans two partitions
+    (days by default) and lives in a folder per day; once a partition is
+    over, its segments are merged into one. index.csv holds one line per
+    segment (file, first and last tick time, tick count), so a time range
+    is read by decompressing only the segments that overlap it.
+
+    state.json records the LiveFeed read position covering everything
+    flushed; the reader resumes from it after a restart, so ticks written
+    while the bot was stopped are archived and none are archived twice.
+    """
+
+    def __init__(self, directory, partition='1D', flush_ticks=10000, flush_interval=60.0):
+        self.directory = directory
+        self.partition_s = int(pd.Timedelta(partition).total_seconds())
+        self.flush_ticks = flush_ticks
+        self.flush_interval = flush_interval
+
+        self.tick_seconds = TickTimes()
+        self.pending_seconds = []
+        self.pending_cents = []
+        self.last_flush = time.monotonic()
+
+        # LiveFeed read position covering everything flushed / everything appended
+        self.checkpoint = None
+        self.pending_checkpoint = None
+
+        self.segments = []  # (first_time, last_time, ticks, relative path), sorted by first_time
+        self.next_segment = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Read the index and state, re-indexing segments written after the last index update"""
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        indexed = {}
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                next(f, None)
+                for line in f:
+                    parts = line.strip().split(',')
+                    if len(parts) == 4:
+                        indexed[parts[0]] = (int(parts[1]), int(parts[2]), int(parts[3]), parts[0])
+
+        # Finish a compaction that was indexed but not yet renamed into place
+        for relative in list(indexed):
+            path = os.path.join(self.directory, relative)
+            if not os.path.exists(path):
+                if os.path.exists(f'{path}.tmp'):
+                    os.replace(f'{path}.tmp', path)
+                else:
+                    logger.warning(f"Tick segment {relative} is missing")
+                    del indexed[relative]
+
+        # A crash can leave a flushed segment not yet indexed (newer than every indexed one,
+        # kept) or segments a compaction already replaced (older, removed)
+        newest_indexed = max((self._segment_number(name) for name in indexed), default=-1)
+        found = dict(indexed)
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                if name.endswith(f'{SEGMENT_SUFFIX}.tmp'):
+                    os.remove(path)
+                if not name.endswith(SEGMENT_SUFFIX) or relative in indexed:
+                    continue
+                header = read_segment_header(path)
+                if header is not None and self._segment_number(relative) > newest_indexed:
+                    count, first, last = header
+                    found[relative] = (first, last, count, relative)
+                    logger.info(f"Re-indexed tick segment {relative}")
+                else:
+                    os.remove(path)
+
+        self.segments = sorted(found.values())
+        self.next_segment = max((self._segment_number(entry[3]) + 1 for entry in self.segments), default=0)
+        if set(found) != set(indexed):
+            self._write_index()
+
+        state_path = os.path.join(self.directory, STATE_NAME)
+        if os.path.exists(state_path):
+            try:
+                with open(state_path) as f:
+                    self.checkpoint = json.load(f).get('checkpoint')
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading tick archive state: {e}")
+
+    @staticmethod
+    def _segment_number(relative):
+        try:
+            return int(relative.rsplit('_', 1)[1][:-len(SEGMENT_SUFFIX)])
+        except (IndexError, ValueError):
+            return 0
+
+    def _write_index(self):
+        tmp_path = os.path.join(self.directory, f'{INDEX_NAME}.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(INDEX_HEADER)
+            f.writelines(f'{name},{first},{last},{count}\n' for first, last, count, name in self.segments)
+        os.replace(tmp_path, os.path.join(self.directory, INDEX_NAME))
+
+    def _write_state(self):
+        tmp_path = os.path.join(self.directory, f'{STATE_NAME}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'checkpoint': self.checkpoint}, f)
+        os.replace(tmp_path, os.path.join(self.directory, STATE_NAME))
+
+    @property
+    def tick_count(self):
+        return sum(entry[2] for entry in self.segments) + len(self.pending_seconds)
+
+    def last_time(self):
+        """Time of the newest archived tick (flushed or not), or None"""
+        seconds = [entry[1] for entry in self.segments]
+        if self.pending_seconds:
+            seconds.append(max(self.pending_seconds))
+        return pd.Timestamp(max(seconds) * 10**9) if seconds else None
+
+    def append(self, ticks, checkpoint=None):
+        """Queue (datetime_str, price) ticks; checkpoint is the reader position just after them"""
+        parse = self.tick_seconds
+        for tick_datetime, price in ticks:
+            try:
+                self.pending_seconds.append(parse(tick_datetime))
+            except (TypeError, ValueError):
+                continue
+            self.pending_cents.append(round(price * 100))
+        if checkpoint is not None:
+            self.pending_checkpoint = checkpoint
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        if (len(self.pending_seconds) >= self.flush_ticks
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered ticks as segments (one per partition), then record the read position"""
+        self.last_flush = time.monotonic()
+        if self.pending_seconds:
+            seconds = np.array(self.pending_seconds, dtype=np.int64)
+            cents = np.array(self.pending_cents, dtype=np.int64)
+            partitions = seconds // self.partition_s
+            # One segment per partition - a clock set back (the repeated hour at a DST
+            # fall-back) can cross back into an earlier partition, so group rather than
+            # split at changes; the sort is stable, so each keeps the arrival order
+            order = np.argsort(partitions, kind='stable')
+            seconds, cents, partitions = seconds[order], cents[order], partitions[order]
+            bounds = np.flatnonzero(np.diff(partitions)) + 1
+            for run_seconds, run_cents in zip(np.split(seconds, bounds), np.split(cents, bounds)):
+                # Segment before index - an unindexed segment is picked up again on load
+                self._add_segment(run_seconds, run_cents, publish=True)
+            self._write_index()
+            self.pending_seconds = []
+            self.pending_cents = []
+            self._compact_closed_partitions(int(partitions[-1]))
+
+        if self.pending_checkpoint is not None and self.pending_checkpoint != self.checkpoint:
+            self.checkpoint = self.pending_checkpoint
+            self._write_state()
+
+    def _partition_folder(self, partition):
+        start = datetime.fromtimestamp(partition * self.partition_s, tz=timezone.utc)
+        return start.strftime('%Y-%m-%d')
+
+    def _add_segment(self, seconds, cents, publish):
+        """Write a segment as .tmp and add it to the index - publish renames it into place"""
+        partition = int(seconds[0]) // self.partition_s
+        start = datetime.fromtimestamp(partition * self.partition_s, tz=timezone.utc)
+        relative = f"{self._partition_folder(partition)}/ticks_{start:%Y%m%d_%H%M}_{self.next_segment:06d}{SEGMENT_SUFFIX}"
+        self.next_segment += 1
+        path = os.path.join(self.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_segment(f'{path}.tmp', seconds, cents)
+        if publish:
+            os.replace(f'{path}.tmp', path)
+
+        entry = (int(seconds.min()), int(seconds.max()), len(seconds), relative)
+        self.segments.insert(bisect_right(self.segments, entry), entry)
+        return path
+
+    def _compact_closed_partitions(self, current_partition):
+        """Merge the segments of every finished partition into one"""
+        by_partition = {}
+        for entry in self.segments:
+            partition = entry[0] // self.partition_s
+            if partition < current_partition:
+                by_partition.setdefault(partition, []).append(entry)
+        for partition, entries in by_partition.items():
+            if len(entries) > 1:
+                self._compact(entries)
+
+    def _compact(self, entries):
+        try:
+            decoded = [read_segment(os.path.join(self.directory, entry[3])) for entry in entries]
+            # Time order - stable, so ticks within one second keep their arrival order
+            seconds = np.concatenate([part[0] for part in decoded])
+            cents = np.concatenate([part[1] for part in decoded])
+            order = np.argsort(seconds, kind='stable')
+            for entry in entries:
+                self.segments.remove(entry)
+            # Index before rename: a crash then either finishes the rename or drops the leftovers on load
+            path = self._add_segment(seconds[order], cents[order], publish=False)
+            self._write_index()
+            os.replace(f'{path}.tmp', path)
+            for entry in entries:
+                os.remove(os.path.join(self.directory, entry[3]))
+            logger.info(f"Compacted {len(entries)} tick segments into one ({len(seconds)} ticks)")
+        except Exception as e:
+            logger.error(f"Error compacting tick segments: {e}")
+
+    def read_range(self, start=None, end=None):
+        """Ticks with start <= time < end as a DataFrame (DateTime, Last), including unflushed ones"""
+        start_s = to_seconds(start) if start is not None else None
+        end_s = to_seconds(end) if end is not None else None
+
+        seconds = []
+        cents = []
+        for first, last, _, name in self.segments:
+            if (end_s is not None and first >= end_s) or (start_s is not None and last < start_s):
+                continue
+            segment_seconds, segment_cents = read_segment(os.path.join(self.directory, name))
+            seconds.append(segment_seconds)
+            cents.append(segment_cents)
+        if self.pending_seconds:
+            seconds.append(np.array(self.pending_seconds, dtype=np.int64))
+            cents.append(np.array(self.pending_cents, dtype=np.int64))
+
+        seconds = np.concatenate(seconds) if seconds else np.empty(0, dtype=np.int64)
+        cents = np.concatenate(cents) if cents else np.empty(0, dtype=np.int64)
+        keep = np.ones(len(seconds), dtype=bool)
+        if start_s is not None:
+            keep &= seconds >= start_s
+        if end_s is not None:
+            keep &= seconds < end_s
+        seconds = seconds[keep]
+        cents = cents[keep]
+        order = np.argsort(seconds, kind='stable')
+        return pd.DataFrame({
+            'DateTime': (seconds[order] * 10**9).astype('datetime64[ns]'),
+            'Last': cents[order] / 100.0,
+        })
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing tick archive: {e}")
+
+
+def import_csv(archive, path):
+    """Archive every tick of a LiveFeed.csv - returns the number of ticks added"""
+    ticks = []
+    with open(path, 'rb') as f:
+        for raw in f:
+            parts = raw.strip().split(b',')
+            if len(parts) < 2 or parts[0] == b'DateTime':
+                continue
+            try:
+                ticks.append((parts[0].decode('ascii'), float(parts[1])))
+            except ValueError:
+                continue
+    archive.append(ticks)
+    archive.flush()
+    return len(ticks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help='tick archive folder')
+    parser.add_argument('--start', help='first tick time (MM/dd/yyyy HH:mm:ss)')
+    parser.add_argument('--end', help='end time, exclusive (MM/dd/yyyy HH:mm:ss)')
+    parser.add_argument('--csv', help='write the ticks in the LiveFeed.csv format to this file')
+    parser.add_argument('--import', dest='import_path', help='archive every tick of a LiveFeed.csv')
+    args = parser.parse_args()
+
+    archive = TickArchive(args.directory)
+    if args.import_path:
+        print(f"Archived {import_csv(archive, args.import_path)} ticks from {args.import_path}")
+        return
+
+    started = time.perf_counter()
+    ticks = archive.read_range(args.start, args.end)
+    elapsed = time.perf_counter() - started
+    print(f"{len(ticks)} ticks from {len(archive.segments)} segments in {elapsed * 1000:.1f}ms")
+    if len(ticks):
+        print(f"  {ticks['DateTime'].iat[0]} to {ticks['DateTime'].iat[-1]}, "
+              f"{ticks['Last'].min():.2f} - {ticks['Last'].max():.2f}")
+    if args.csv:
+        ticks.to_csv(args.csv, index=False, float_format='%.2f', date_format=TICK_DATETIME_FORMAT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+from collections import deque
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fvg_detection import detect_fvgs, first_fill_indices, resolve_overlaps, select_fvgs
+from fvg_zone import FVGZone, ZoneView, zones_from_detected
+from zone_index import ZoneIndex
+
+logger = logging.getLogger(__name__)
+
+# HistoricalData bars are stamped with their close time in the NinjaTrader install's
+# local time, and higher-timeframe bars are anchored to the daily session close in
+# that time. Unless one is given, the close is found in the data (the bar before the
+# daily break); the CME close in CT is the fallback when the data shows no break
+SESSION_CLOSE = pd.Timedelta(hours=16)
+
+DAY_NS = pd.Timedelta(days=1).value
+
+# Higher-timeframe zone sets the bot tracks alongside the hourly zones
+HIGHER_TIMEFRAMES = {
+    '4H': {'period': '4h', 'min_gap': 10.0, 'max_distance': 500.0},
+    '1D': {'period': '1D', 'min_gap': 20.0, 'max_distance': 1000.0},
+}
+
+
+def bar_times_ns(datetimes):
+    """Epoch-ns int64 array from a DateTime column"""
+    return pd.to_datetime(datetimes).to_numpy().astype('datetime64[ns]').astype(np.int64)
+
+
+def parse_session_close(value):
+    """Time of day as a Timedelta from 'HH:MM', 'HH:MM:SS' or a Timedelta"""
+    if isinstance(value, str) and value.count(':') == 1:
+        value = f'{value}:00'
+    close = pd.Timedelta(value)
+    if not pd.Timedelta(0) <= close < pd.Timedelta(days=1):
+        raise ValueError(f"Session close must be a time of day, got {value!r}")
+    return close
+
+
+def find_session_close(times_ns, default=SESSION_CLOSE):
+    """Time of day of the daily session close in hourly bar close times - default if there is no break
+
+    The close is the bar time most often followed by a longer gap than the
+    usual bar spacing (the daily break, and the weekend after Friday's close).
+    """
+    times_ns = np.asarray(times_ns, dtype=np.int64)
+    if len(times_ns) < 3:
+        return default
+    gaps = np.diff(times_ns)
+    before_break = times_ns[:-1][gaps > np.median(gaps)]
+    if not len(before_break):
+        return default
+    closes, counts = np.unique(before_break % DAY_NS, return_counts=True)
+    return pd.Timedelta(int(closes[counts.argmax()]))
+
+
+class BarResampler:
+    """Folds closed hourly bars into higher-timeframe bars one at a time
+
+    Each higher-timeframe bar covers (end - period, end], with ends on the
+    session close grid. A bar closes when an hourly bar lands on its end, or
+    when the first hourly bar of a later bucket arrives (holidays and early
+    closes). Only the running OHLC of the open bar and the last three closed
+    bars are kept, so add() is O(1) however long the bot runs.
+    """
+
+    def __init__(self, period, anchor=SESSION_CLOSE):
+        self.period_ns = pd.Timedelta(period).value
+        self.set_anchor(anchor)
+        self.last_time_ns = None
+        self.bar = None  # [end_ns, open, high, low, close] of the bar being built
+        self.closed = deque(maxlen=3)  # (end_ns, open, high, low, close), oldest first
+        self.closed_count = 0
+
+    def set_anchor(self, anchor):
+        """Move the bar grid to end on anchor (a time of day) - before any bar is folded in"""
+        self.anchor = pd.Timedelta(anchor)
+        self.anchor_ns = self.anchor.value % self.period_ns
+
+    def bucket_end(self, time_ns):
+        """Close time of the bucket an hourly bar closing at time_ns belongs to (ints or arrays)"""
+        return self.anchor_ns - ((self.anchor_ns - time_ns) // self.period_ns) * self.period_ns
+
+    def add(self, time_ns, open_, high, low, close):
+        """Fold one hourly bar in - returns the higher-timeframe bars it closed (0, 1 or 2)"""
+        if self.last_time_ns is not None and time_ns <= self.last_time_ns:
+            return []  # already folded (startup seed, re-read of the same bar)
+        self.last_time_ns = time_ns
+
+        closed = []
+        end = self.bucket_end(time_ns)
+        bar = self.bar
+        if bar is not None and bar[0] != end:
+            # First bar of a later bucket - the open bar ended early
+            closed.append(self._close())
+            bar = None
+
+        if bar is None:
+            self.bar = [end, open_, high, low, close]
+        else:
+            if high > bar[2]:
+                bar[2] = high
+            if low < bar[3]:
+                bar[3] = low
+            bar[4] = close
+
+        if time_ns == end:
+            closed.append(self._close())
+        return closed
+
+    def _close(self):
+        closed = tuple(self.bar)
+        self.bar = None
+        self.closed.append(closed)
+        self.closed_count += 1
+        return closed
+
+    def seed(self, times_ns, opens, highs, lows, closes):
+        """Resample a whole history at once (startup) - returns the closed bars as arrays
+
+        Leaves the resampler exactly as if every bar had gone through add().
+        """
+        times_ns = np.asarray(times_ns, dtype=np.int64)
+        empty = np.empty(0)
+        if not len(times_ns):
+            return np.empty(0, dtype=np.int64), empty, empty, empty, empty
+
+        ends = self.bucket_end(times_ns)
+        starts = np.flatnonzero(np.r_[True, ends[1:] != ends[:-1]])
+        lasts = np.r_[starts[1:] - 1, len(times_ns) - 1]
+
+        bar_ends = ends[starts]
+        bar_open = np.asarray(opens, dtype=np.float64)[starts]
+        bar_high = np.maximum.reduceat(np.asarray(highs, dtype=np.float64), starts)
+        bar_low = np.minimum.reduceat(np.asarray(lows, dtype=np.float64), starts)
+        bar_close = np.asarray(closes, dtype=np.float64)[lasts]
+
+        # Every bucket but the last was closed by its successor; the last only if it reached its end
+        closed_count = len(starts) if times_ns[-1] == bar_ends[-1] else len(starts) - 1
+        if closed_count < len(starts):
+            self.bar = [int(bar_ends[-1]), float(bar_open[-1]), float(bar_high[-1]),
+                        float(bar_low[-1]), float(bar_close[-1])]
+        else:
+            self.bar = None
+
+        self.closed.clear()
+        for i in range(max(closed_count - 3, 0), closed_count):
+            self.closed.append((int(bar_ends[i]), float(bar_open[i]), float(bar_high[i]),
+                                float(bar_low[i]), float(bar_close[i])))
+        self.closed_count = closed_count
+        self.last_time_ns = int(times_ns[-1])
+        return bar_ends, bar_open, bar_high, bar_low, bar_close
+
+
+class TimeframeZones:
+    """FVG zones of one higher timeframe, detected on resampled hourly bars
+
+    Mirrors the hourly zone set - same three-candle rule with its own min_gap,
+    overlapping zones keep the smaller one, zones fill when price touches the
+    far edge and are dropped past max_distance - but only tracks and displays
+    zones; entries are still taken from hourly zones only. With anchor None
+    the bar grid is anchored to the session close found in the history
+    passed to seed().
+    """
+
+    def __init__(self, name, period, min_gap, max_distance=None, anchor=None):
+        self.name = name
+        self.anchor = None if anchor is None else parse_session_close(anchor)
+        self.resampler = BarResampler(period, SESSION_CLOSE if anchor is None else self.anchor)
+        self.min_gap = min_gap
+        self.max_distance = max_distance
+        self.zones = []
+        self.zone_index = ZoneIndex()
+        self.filled_since_cleanup = 0
+
+    def seed(self, df, current_price=None):
+        """Resample the full history once and load its unfilled zones (startup)"""
+        times = bar_times_ns(df['DateTime'])
+        if self.anchor is None:
+            self.resampler.set_anchor(find_session_close(times))
+        bar_ends, _, high, low, _ = self.resampler.seed(
+            times, df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())
+        closed_count = self.resampler.closed_count
+
+        # Gaps come from closed bars only; the open bar still counts toward fills
+        detected = detect_fvgs(high[:closed_count], low[:closed_count], min_gap=self.min_gap)
+        unfilled = np.flatnonzero(first_fill_indices(detected, high, low) < 0)
+        survivors = resolve_overlaps(detected, unfilled)
+
+        self.zones = []
+        self.zone_index.clear()
+        self.filled_since_cleanup = 0
+        for fvg in zones_from_detected(select_fvgs(detected, survivors), bar_ends.view('datetime64[ns]')):
+            self.track(fvg)
+        if current_price is not None:
+            self.cleanup(current_price)
+        logger.info(f"Loaded {len(self.zones)} active {self.name} FVGs from {closed_count} {self.name} bars "
+                    f"(ending {str(self.resampler.anchor)[-8:-3]})")
+
+    def add_bar(self, time_ns, open_, high, low, close):
+        """Fold one new hourly bar in, detect gaps on any bar it closes, then check fills - O(1) per bar"""
+        for _ in self.resampler.add(time_ns, open_, high, low, close):
+            self.find_new_fvg()
+        self.check_fills(low, high)
+
+    def find_new_fvg(self):
+        """Three-candle check on the last three closed bars"""
+        closed = self.resampler.closed
+        if len(closed) < 3:
+            return
+        (_, _, high1, low1, _), _, (end3, _, high3, low3, _) = closed
+        index = self.resampler.closed_count - 1
+
+        if low3 > high1 and low3 - high1 >= self.min_gap:
+            fvg = FVGZone('bullish', top=low3, bottom=high1, gap_size=low3 - high1, index=index)
+        elif high3 < low1 and low1 - high3 >= self.min_gap:
+            fvg = FVGZone('bearish', top=low1, bottom=high3, gap_size=low1 - high3, index=index)
+        else:
+            return
+        fvg.time_ns = end3
+        logger.info(f"NEW {self.name} {fvg.type.upper()} FVG: Gap {fvg.gap_size:.2f}pts ({fvg.bottom:.2f} to {fvg.top:.2f})")
+
+        if not self.is_duplicate_zone(fvg):
+            self.track(fvg)
+
+    def is_duplicate_zone(self, new_fvg):
+        """Same rule as the hourly zones - keep the smaller of overlapping same-type zones"""
+        overlapping = [fvg for fvg in self.zone_index.overlapping(new_fvg.bottom, new_fvg.top)
+                       if fvg.type == new_fvg.type and fvg.bottom < new_fvg.top and new_fvg.bottom < fvg.top]
+        if any(fvg.gap_size <= new_fvg.gap_size for fvg in overlapping):
+            return True
+        for fvg in overlapping:
+            self.mark_filled(fvg)  # replaced - dropped on the next cleanup
+        return False
+
+    def track(self, fvg):
+        self.zones.append(fvg)
+        self.zone_index.add(fvg)
+
+    def mark_filled(self, fvg):
+        fvg.filled = True
+        self.zone_index.remove(fvg)
+        self.filled_since_cleanup += 1
+
+    def check_fills(self, low, high):
+        """Fill zones price traded through between low and high (a bar or a tick batch)"""
+        for fvg in self.zone_index.bullish_at_or_above(low):
+            self.mark_filled(fvg)
+            logger.info(f"{self.name} BULLISH FVG FILLED: Low {low:.2f} touched bottom {fvg.bottom:.2f}")
+        for fvg in self.zone_index.bearish_at_or_below(high):
+            self.mark_filled(fvg)
+            logger.info(f"{self.name} BEARISH FVG FILLED: High {high:.2f} touched top {fvg.top:.2f}")
+
+    def cleanup(self, current_price):
+        """Drop filled zones and zones more than max_distance from price"""
+        far_fvgs = []
+        if self.max_distance is not None:
+            far_fvgs = self.zone_index.farther_than(current_price, self.max_distance)
+        if not far_fvgs and not self.filled_since_cleanup:
+            return
+
+        far_ids = {id(fvg) for fvg in far_fvgs}
+        for fvg in far_fvgs:
+            self.zone_index.remove(fvg)
+        self.zones = [fvg for fvg in self.zones if not fvg.filled and id(fvg) not in far_ids]
+        self.filled_since_cleanup = 0
+
+    def views(self):
+        """Display copies of the unfilled zones"""
+        return [ZoneView(fvg.type, fvg.bottom, fvg.top, fvg.gap_size) for fvg in self.zones if not fvg.filled]
@@ -0,0 +1,171 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+class ZoneIndex:
+    """Price-sorted index of unfilled FVG zones, split by type
+
+    Zones of one type never overlap (is_duplicate_zone keeps the smaller of
+    any overlapping pair), so sorting by bottom also sorts by top and every
+    price query below is a bisect plus a walk over the zones it returns.
+    Filled zones must be removed from the index.
+    """
+
+    def __init__(self):
+        # Per type: parallel lists sorted by bottom
+        self.bottoms = {'bullish': [], 'bearish': []}
+        self.tops = {'bullish': [], 'bearish': []}
+        self.zones = {'bullish': [], 'bearish': []}
+
+        # Zones price was inside of at the last retest check, keyed by id()
+        self.inside = {}
+
+    def __len__(self):
+        return len(self.zones['bullish']) + len(self.zones['bearish'])
+
+    def clear(self):
+        """Remove every zone from the index"""
+        for zone_type in self.zones:
+            self.bottoms[zone_type].clear()
+            self.tops[zone_type].clear()
+            self.zones[zone_type].clear()
+        self.inside.clear()
+
+    def add(self, fvg):
+        """Index an unfilled zone"""
+        zone_type = fvg.type
+        pos = bisect_right(self.bottoms[zone_type], fvg.bottom)
+        self.bottoms[zone_type].insert(pos, fvg.bottom)
+        self.tops[zone_type].insert(pos, fvg.top)
+        self.zones[zone_type].insert(pos, fvg)
+
+        # Zones created with price already inside must be watched for the exit
+        if not fvg.price_was_outside:
+            self.inside[id(fvg)] = fvg
+
+    def remove(self, fvg):
+        """Drop a zone from the index (no-op if it is not indexed)"""
+        zone_type = fvg.type
+        bottoms = self.bottoms[zone_type]
+        zones = self.zones[zone_type]
+        pos = bisect_left(bottoms, fvg.bottom)
+        while pos < len(zones) and bottoms[pos] == fvg.bottom:
+            if zones[pos] is fvg:
+                del bottoms[pos]
+                del self.tops[zone_type][pos]
+                del zones[pos]
+                break
+            pos += 1
+        self.inside.pop(id(fvg), None)
+
+    def containing(self, price):
+        """Zones with bottom <= price <= top"""
+        return self.overlapping(price, price)
+
+    def overlapping(self, low, high):
+        """Zones that intersect the price range [low, high]"""
+        found = []
+        for zone_type in ('bullish', 'bearish'):
+            bottoms = self.bottoms[zone_type]
+            zones = self.zones[zone_type]
+            pos = bisect_left(self.tops[zone_type], low)
+            while pos < len(zones) and bottoms[pos] <= high:
+                found.append(zones[pos])
+                pos += 1
+        return found
+
+    def batch_candidates(self, low, high):
+        """Zones whose state can change during ticks spanning [low, high]"""
+        candidates = {}
+        for fvg in self.overlapping(low, high):
+            candidates[id(fvg)] = fvg
+        for fvg in self.bearish_at_or_below(high):
+            candidates[id(fvg)] = fvg
+        for fvg in self.bullish_at_or_above(low):
+            candidates[id(fvg)] = fvg
+        # Zones price was inside of will see the exit even if no tick touches them
+        candidates.update(self.inside)
+        return list(candidates.values())
+
+    def bearish_at_or_below(self, price):
+        """Bearish zones with top <= price (filled by a move up to price)"""
+        return self.zones['bearish'][:bisect_right(self.tops['bearish'], price)]
+
+    def bullish_at_or_above(self, price):
+        """Bullish zones with bottom >= price (filled by a move down to price)"""
+        return self.zones['bullish'][bisect_left(self.bottoms['bullish'], price):]
+
+    def farther_than(self, price, distance):
+        """Zones whose nearest edge is more than `distance` points from price"""
+        found = []
+        for zone_type in ('bullish', 'bearish'):
+            zones = self.zones[zone_type]
+            # Entirely below or entirely above the window
+            found.extend(zones[:bisect_left(self.tops[zone_type], price - distance)])
+            found.extend(zones[bisect_right(self.bottoms[zone_type], price + distance):])
+
+        # Zones wider than the window on both sides of price
+        for fvg in self.containing(price):
+            if fvg.bottom < price - distance and fvg.top > price + distance:
+                found.append(fvg)
+        return found
+
+    def exited(self, in_zone):
+        """Stop watching zones price has left - returns them"""
+        in_zone_ids = {id(fvg) for fvg in in_zone}
+        left = [fvg for key, fvg in self.inside.items() if key not in in_zone_ids]
+        for fvg in left:
+            del self.inside[id(fvg)]
+        return left
+
+
+def scan_tick_batch(prices, bottoms, tops, is_bearish, was_outside, trade_taken, entries_enabled=True):
+    """Replay a batch of ticks against a set of zones in one vectorized pass
+
+    Zones are independent within a batch (cooldowns only reset on new bars),
+    so each zone's first fill tick and first entry tick can be computed from
+    a zones x ticks matrix. Per tick the live loop checks fills before
+    entries, so a zone filled on tick t cannot be entered on tick t.
+
+    Returns (fill_tick, entry_tick, price_was_outside) per zone; ticks are
+    len(prices) when the event does not happen.
+    """
+    prices = np.asarray(prices, dtype=np.float64)[None, :]
+    bottoms = np.asarray(bottoms, dtype=np.float64)[:, None]
+    tops = np.asarray(tops, dtype=np.float64)[:, None]
+    is_bearish = np.asarray(is_bearish, dtype=bool)
+    was_outside = np.asarray(was_outside, dtype=bool)
+    trade_taken = np.asarray(trade_taken, dtype=bool)
+    tick_count = prices.shape[1]
+    ticks = np.arange(tick_count)[None, :]
+
+    # Bearish zones fill at/above the top, bullish zones at/below the bottom
+    fill_hits = np.where(is_bearish[:, None], prices >= tops, prices <= bottoms)
+    fill_tick = np.where(fill_hits.any(axis=1), fill_hits.argmax(axis=1), tick_count)
+
+    in_zone = (prices >= bottoms) & (prices <= tops)
+
+    # Entry state before each tick: initial flag, then "outside on the previous tick"
+    prev_outside = np.empty_like(in_zone)
+    prev_outside[:, 0] = was_outside
+    prev_outside[:, 1:] = ~in_zone[:, :-1]
+
+    entry_hits = in_zone & prev_outside & (ticks < fill_tick[:, None])
+    entry_hits &= ~trade_taken[:, None]
+    if not entries_enabled:
+        entry_hits[:] = False
+    entry_tick = np.where(entry_hits.any(axis=1), entry_hits.argmax(axis=1), tick_count)
+
+    # Flag after the batch: unchanged for cooled-down zones (or when entries
+    # are disabled), False after an entry, else whether the last tick seen
+    # before any fill was outside the zone
+    last_tick = np.minimum(fill_tick, tick_count) - 1
+    rows = np.flatnonzero(last_tick >= 0)
+    outside_after = was_outside.copy()
+    outside_after[rows] = ~in_zone[rows, last_tick[rows]]
+    frozen = trade_taken if entries_enabled else np.ones_like(trade_taken)
+    outside_after = np.where(frozen, was_outside, outside_after)
+    outside_after[entry_tick < tick_count] = False
+
+    return fill_tick, entry_tick, outside_after
@@ -0,0 +1,49 @@
+import os
+import json
+import logging
+
+import numpy as np
+
+from bar_cache import history_fingerprint
+from fvg_zone import ZONE_DTYPE
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path, zones_table, meta):
+    """Atomically write a zone table plus metadata to an .npz snapshot"""
+    meta = dict(meta, version=SNAPSHOT_VERSION)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, zones=zones_table, meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """Read a snapshot - returns (zones_table, meta) or None if missing/unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            zones_table = data['zones']
+    except Exception as e:
+        logger.error(f"Error reading zone snapshot {path}: {e}")
+        return None
+
+    if meta.get('version') != SNAPSHOT_VERSION or zones_table.dtype != ZONE_DTYPE:
+        logger.info(f"Ignoring zone snapshot with an old format: {path}")
+        return None
+    return zones_table, meta
+
+
+def snapshot_matches(meta, history_path):
+    """True if the history file still starts with the bytes the snapshot was taken on"""
+    fingerprint = meta.get('fingerprint')
+    if not fingerprint or not os.path.exists(history_path):
+        return False
+    if os.path.getsize(history_path) < fingerprint['size']:
+        return False
+    return history_fingerprint(history_path, fingerprint['size']) == fingerprint